@@ -1,24 +1,53 @@
-from hmac import new
 import json
 import math
 import os
 from datetime import datetime, timezone, timedelta, date
 from pathlib import Path
-from urllib import response
-from uuid import uuid4
 import logging
 from collections import defaultdict
 from pathlib import Path
-from github import Github
 from typing import Optional, List
 
 from utils import load_user_data
 from utils.manage_data_update_time import get_now_date
-from utils.dvpr_affliation import get_community_developers
-from get_data.get_user_info import get_user_info
-from config import GITHUB_TOKEN
+from utils.data_store import load_time_index, date_to_epoch
+from utils.first_contributions import load_first_contributions
+from utils.actors import ACTOR_BOT, load_actor_table
 
 DATA_DIR = "data"
+DAY_SECONDS = 24 * 3600
+
+# 首次响应：PR 有 review 时以第一条 review 为准，否则看评论；机器人（paddle-bot、CLAassistant 等，见 utils.actors）不算响应
+PR_RESPONSE_COLUMNS = [('review_by', 'review_ts'), ('comment_by', 'comment_ts')]
+ISSUE_RESPONSE_COLUMNS = [('comment_by', 'comment_ts')]
+
+def first_response_ts(record, columns, actors):
+    """
+    按 columns 顺序找第一条非机器人评论/review的时间；没有人回复时为关闭时间
+    """
+    for column, ts_column in columns:
+        events = record.get(column, [])
+        event_ts = record.get(ts_column, [])
+        for i, (comment_author, comment_time) in enumerate(events):
+            if not comment_author or not comment_time:
+                continue
+            if actors.flags(comment_author) & ACTOR_BOT:
+                continue
+            return event_ts[i]
+    return record['closed_ts']
+
+def format_new_rule(rule):
+    """
+    当天发布的规则的展示文本
+    """
+    category = rule.get("category", "其他")
+    rule_type = rule.get("rule type", "未分类")
+    detailed_code = rule.get("detailed code") or "_general"
+    rule_desc = rule.get("rule description", "")
+    rule_content = rule.get("content") or ""
+    if detailed_code == "_general":
+        return f"{category} - {rule_type} : {rule_desc}。{rule_content}"
+    return f"{category} - {rule_type} - {detailed_code} : {rule_desc}。{rule_content}"
     
 class GovernanceAnalyzer:
     """
@@ -85,10 +114,7 @@ class GovernanceAnalyzer:
             rule_content = rule.get("content") or ""
 
             if time_ == self.input_date.strftime("%Y-%m-%d"):
-                if detailed_code == "_general":
-                    self.new_rule.append(f"{category} - {rule_type} : {rule_desc}。{rule_content}")
-                else:
-                    self.new_rule.append(f"{category} - {rule_type} - {detailed_code} : {rule_desc}。{rule_content}")
+                self.new_rule.append(format_new_rule(rule))
 
             rules_tree[category][rule_type][detailed_code].append(f"{rule_desc}。{rule_content} -- 发布时间：{time_}")
 
@@ -125,92 +151,44 @@ class GovernanceAnalyzer:
                 "issue_response_time_after": 0
             }
         }
-        owner, repo_name = self.repo.split('/')
         try:
-            with open(f"{DATA_DIR}/paddle_prs/{owner}_{repo_name}_prs.json", 'r', encoding='utf-8') as f:
-                prs = json.load(f)
-            with open(f"{DATA_DIR}/paddle_issues/{owner}_{repo_name}_issues.json", 'r', encoding='utf-8') as f:
-                issues = json.load(f)
+            pr_index = load_time_index("prs", self.repo)
+            issue_index = load_time_index("issues", self.repo)
         except FileNotFoundError:
             return res  # 数据缺失时直接返回 0
+        actors = load_actor_table()
 
-        # 初始化时间段
-        recent_start = self.before
-        recent_end = self.input_date
-        later_start = self.input_date
-        later_end = self.after
-
-        # 各时间段的响应时间列表
-        pr_response_recent, pr_response_later = [], []
-        pr_close_recent, pr_close_later = [], []
-        issue_response_recent, issue_response_later = [], []
-
-        def is_in_range(dt, start, end):
-            return start <= dt.date() <= end
+        # 初始化时间段（按天包含两端，转为左闭右开的epoch秒区间）
+        recent_start = date_to_epoch(self.before)
+        recent_end = date_to_epoch(self.input_date) + DAY_SECONDS
+        later_start = date_to_epoch(self.input_date)
+        later_end = date_to_epoch(self.after) + DAY_SECONDS
 
-        for pr in prs:
-            if not pr['closed_at']:
-                continue
-
-            created_at = datetime.fromisoformat(pr['created_at'].replace('Z', '+00:00'))
-            closed_at = datetime.fromisoformat(pr['closed_at'].replace('Z', '+00:00'))
+        # 两个窗口在 input_date 当天重叠，当天的记录归入前一个窗口
+        later_start = max(later_start, recent_end)
 
-            # 初始化响应时间为关闭时间（万一没人回复）
-            first_response_at = closed_at
-
-            # PR 评论
-            comments = pr.get('comment_by', [])
-            for comment_author, comment_time in comments:
-                if not comment_author or not comment_time:
-                    continue
-                if 'paddle-bot' in comment_author.lower() or 'CLAassistant' in comment_author:
+        def pr_times(start, end):
+            response_times, close_times = [], []
+            for pr in pr_index.slice(start, end):
+                if not pr['closed_at']:
                     continue
-                first_response_at = datetime.fromisoformat(comment_time.replace('Z', '+00:00'))
-                break
-            # review_by
-            review_comments = pr.get('review_by', [])
-            for comment_author, comment_time in review_comments:
-                if not comment_author or not comment_time:
-                    continue
-                if 'paddle-bot' in comment_author.lower():
-                    continue
-                first_response_at = datetime.fromisoformat(comment_time.replace('Z', '+00:00'))
-                break
-
-            response_time = (first_response_at - created_at).total_seconds() / 3600
-            close_time = (closed_at - created_at).total_seconds() / 3600
-
-            if is_in_range(created_at, recent_start, recent_end):
-                pr_response_recent.append(response_time)
-                pr_close_recent.append(close_time)
-            elif is_in_range(created_at, later_start, later_end):
-                pr_response_later.append(response_time)
-                pr_close_later.append(close_time)
+                created_at = pr['created_ts']
+                response_times.append((first_response_ts(pr, PR_RESPONSE_COLUMNS, actors) - created_at) / 3600)
+                close_times.append((pr['closed_ts'] - created_at) / 3600)
+            return response_times, close_times
+
+        def issue_times(start, end):
+            return [
+                (first_response_ts(issue, ISSUE_RESPONSE_COLUMNS, actors) - issue['created_ts']) / 3600
+                for issue in issue_index.slice(start, end)
+                if 'error' not in issue and issue['closed_at']
+            ]
 
-        # ISSUE 分析
-        for issue in issues:
-            if 'error' in issue or not issue['closed_at']:
-                continue
-
-            created_at = datetime.fromisoformat(issue['created_at'].replace('Z', '+00:00'))
-            closed_at = datetime.fromisoformat(issue['closed_at'].replace('Z', '+00:00'))
-            first_response_at = closed_at
-
-            comments = issue.get('comment_by', [])
-            for comment_author, comment_time in comments:
-                if not comment_author or not comment_time:
-                    continue
-                if 'paddle-bot' in comment_author.lower():
-                    continue
-                first_response_at = datetime.fromisoformat(comment_time.replace('Z', '+00:00'))
-                break
-
-            response_time = (first_response_at - created_at).total_seconds() / 3600
-
-            if is_in_range(created_at, recent_start, recent_end):
-                issue_response_recent.append(response_time)
-            elif is_in_range(created_at, later_start, later_end):
-                issue_response_later.append(response_time)
+        # 各时间段的响应时间列表
+        pr_response_recent, pr_close_recent = pr_times(recent_start, recent_end)
+        pr_response_later, pr_close_later = pr_times(later_start, later_end)
+        issue_response_recent = issue_times(recent_start, recent_end)
+        issue_response_later = issue_times(later_start, later_end)
 
         # 中位数计算函数
         def median_or_zero(data):
@@ -261,22 +239,15 @@ class GovernanceAnalyzer:
             }
         }
     
-        owner, repo_name = self.repo.split('/')
-        # 获取社区开发者
-        with open(f"{DATA_DIR}/paddle_commits/{owner}_{repo_name}_commits.json", "r", encoding="utf-8") as f:
-            commits = json.load(f)
-        community_developers = get_community_developers(commits)
+        # 作者首次提交 PR 的时间和社区开发者分类，由数据更新流程增量维护
+        first_contributions = load_first_contributions(self.repo)
+        actors = load_actor_table()
         
         # 统计社区开发者的pr数量
-        with open(f"{DATA_DIR}/paddle_prs/{owner}_{repo_name}_prs.json", 'r', encoding='utf-8') as f:
-            prs = json.load(f)
-            # 保存作者首次提交 PR 的时间
-        author_first_pr_time = {}
-        for pr in prs:
-            author = pr.get('user')
-            created_at = datetime.fromisoformat(pr['created_at'].replace('Z', '+00:00'))
-            if author not in author_first_pr_time or created_at < author_first_pr_time[author]:
-                author_first_pr_time[author] = created_at
+        pr_index = load_time_index("prs", self.repo)
+        before_ts = date_to_epoch(self.before)
+        input_ts = date_to_epoch(self.input_date)
+        after_ts = date_to_epoch(self.after)
         # 初始化统计数据
         def init_stats():
             return {
@@ -291,31 +262,23 @@ class GovernanceAnalyzer:
             "before": init_stats(),
             "after": init_stats()
         }
-        # 遍历 PR，分时间段统计
-        for pr in prs:
-            created_at = datetime.fromisoformat(pr['created_at'].replace('Z', '+00:00'))
-            pr_date = created_at.date()
-            author = pr.get('user')
-            merged = pr.get('merged', False)
-            first_pr_date = author_first_pr_time[author].date()
-            # 判断 PR 所属时间段
-            if self.before <= pr_date < self.input_date:
-                key = "before"
-            elif self.input_date <= pr_date < self.after:
-                key = "after"
-            else:
-                continue  # 不属于我们关心的时间段
-            stats[key]["total_prs"] += 1
-            # 判断该作者是否是当前窗口中的新贡献者
-            if ((key == "before" and self.before <= first_pr_date < self.input_date) or
-                (key == "after" and self.input_date <= first_pr_date < self.after)):
-                stats[key]["newcomer_authors"].add(author)
+        # 按时间段取 PR 切片分别统计
+        for key, start, end in (("before", before_ts, input_ts), ("after", input_ts, after_ts)):
+            # 首次 PR 在当前窗口中的作者即新贡献者（不含机器人）
+            newcomer_authors = actors.humans(first_contributions.newcomers("pr", start, end))
+            stats[key]["newcomer_authors"] = newcomer_authors
+            # 判断是否为社区开发者
+            stats[key]["newcomer_affiliations"] = {
+                author for author in newcomer_authors if first_contributions.is_community_developer(author)
+            }
+            window_prs = pr_index.slice(start, end)
+            stats[key]["total_prs"] = len(window_prs)
+            for pr in window_prs:
+                if pr.get('user') not in newcomer_authors:
+                    continue
                 stats[key]["newcomer_pr_cnt"] += 1
-                if merged:
+                if pr.get('merged', False):
                     stats[key]["newcomer_merged_pr_cnt"] += 1
-                # 判断是否为社区开发者
-                if author.strip().lower() in community_developers:
-                    stats[key]["newcomer_affiliations"].add(author)
         # 汇总结果
         for key in ["before", "after"]:
             stat = stats[key]
@@ -0,0 +1,361 @@
+import heapq
+import json
+import os
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from utils.manage_data_update_time import get_now_date
+from utils.data_store import load_time_index, date_to_epoch
+from utils.first_contributions import load_first_contributions
+from utils.actors import ACTOR_BOT, load_actor_table
+from collaboration.governance_analyzer import (
+    DATA_DIR,
+    DAY_SECONDS,
+    ISSUE_RESPONSE_COLUMNS,
+    PR_RESPONSE_COLUMNS,
+    GovernanceAnalyzer,
+    first_response_ts,
+    format_new_rule,
+)
+
+WINDOW_DAYS = 90
+REPO = "PaddlePaddle/Paddle"
+
+
+class SlidingMedian:
+    """
+    支持插入和删除的中位数：两个堆（较小一半的大顶堆、较大一半的小顶堆）+ 延迟删除
+    """
+    def __init__(self):
+        self.low = []  # 取负数实现大顶堆
+        self.high = []
+        self.delayed = Counter()
+        self.low_size = 0
+        self.high_size = 0
+
+    def _prune(self, heap, sign):
+        # 弹出堆顶已被删除的元素
+        while heap and self.delayed[sign * heap[0]]:
+            self.delayed[sign * heap[0]] -= 1
+            heapq.heappop(heap)
+
+    def _balance(self):
+        if self.low_size > self.high_size + 1:
+            heapq.heappush(self.high, -heapq.heappop(self.low))
+            self.low_size -= 1
+            self.high_size += 1
+            self._prune(self.low, -1)
+        elif self.low_size < self.high_size:
+            heapq.heappush(self.low, -heapq.heappop(self.high))
+            self.high_size -= 1
+            self.low_size += 1
+            self._prune(self.high, 1)
+
+    def add(self, value):
+        if not self.low or value <= -self.low[0]:
+            heapq.heappush(self.low, -value)
+            self.low_size += 1
+        else:
+            heapq.heappush(self.high, value)
+            self.high_size += 1
+        self._balance()
+
+    def remove(self, value):
+        """
+        删除一个已插入的值
+        """
+        self.delayed[value] += 1
+        if value <= -self.low[0]:
+            self.low_size -= 1
+            if value == -self.low[0]:
+                self._prune(self.low, -1)
+        else:
+            self.high_size -= 1
+            if value == self.high[0]:
+                self._prune(self.high, 1)
+        self._balance()
+
+    def median(self):
+        """
+        与 analyze_response_time 中的 median_or_zero 一致：空时为0，保留一位小数
+        """
+        size = self.low_size + self.high_size
+        if size == 0:
+            return 0
+        if size % 2:
+            return round(-self.low[0], 1)
+        return round((-self.low[0] + self.high[0]) / 2, 1)
+
+
+class WindowSweep:
+    """
+    在按时间排序的记录上滑动的窗口，窗口的起止时间只能单调不减；
+    记录进入、离开窗口时调用 on_add / on_remove，每条记录最多进出一次
+    """
+    def __init__(self, index, on_add, on_remove):
+        self.index = index
+        self.on_add = on_add
+        self.on_remove = on_remove
+        self.lo = 0
+        self.hi = 0
+
+    def move(self, start, end):
+        lo, hi = self.index.bounds(start, end)
+        records = self.index.records
+        # 先扩展右端再收缩左端，保证被删除的记录一定已经加入
+        while self.hi < hi:
+            self.on_add(records[self.hi])
+            self.hi += 1
+        while self.lo < lo:
+            self.on_remove(records[self.lo])
+            self.lo += 1
+        return hi - lo
+
+
+def median_sweep(index, values):
+    """
+    values: 记录id -> 值（不参与统计的记录不在其中），返回窗口内值的中位数滑动窗口
+    """
+    medians = {}
+
+    def make(key):
+        median = SlidingMedian()
+
+        def on_add(record):
+            value = values.get(id(record), {}).get(key)
+            if value is not None:
+                median.add(value)
+
+        def on_remove(record):
+            value = values.get(id(record), {}).get(key)
+            if value is not None:
+                median.remove(value)
+
+        medians[key] = median
+        return WindowSweep(index, on_add, on_remove)
+
+    return medians, make
+
+
+class NewcomerWindow:
+    """
+    新贡献者窗口 [start, end)：作者首次PR时间在窗口内，则其窗口内的PR计为新贡献者PR（机器人除外）
+    窗口左端越过作者首次PR时，该作者整体移出
+    """
+    def __init__(self, pr_index, first_contributions, actors):
+        self.first_contributions = first_contributions
+        self.actors = actors
+        self.start = None
+        self.authors = {}  # 作者 -> [pr数, 合并pr数]
+        self.pr_cnt = 0
+        self.merged_cnt = 0
+        self.affiliations = 0
+        self.sweep = WindowSweep(pr_index, self.on_add, self.on_remove)
+
+    def on_add(self, pr):
+        author = pr.get('user')
+        # 已注销的作者（user 为空）和不在首次贡献表中的作者不计为新贡献者，与 GovernanceAnalyzer 一致
+        if not author or self.actors.flags(author) & ACTOR_BOT:
+            return
+        first_time = self.first_contributions.first_time("pr", author)
+        if first_time is None or first_time < self.start:
+            return
+        if author not in self.authors:
+            self.authors[author] = [0, 0]
+            if self.first_contributions.is_community_developer(author):
+                self.affiliations += 1
+        merged = 1 if pr.get('merged', False) else 0
+        self.authors[author][0] += 1
+        self.authors[author][1] += merged
+        self.pr_cnt += 1
+        self.merged_cnt += merged
+
+    def on_remove(self, pr):
+        # 离开窗口的PR早于新的左端，其作者的首次PR也一定早于左端
+        author = pr.get('user')
+        if not author:
+            return
+        counts = self.authors.pop(author, None)
+        if counts is None:
+            return
+        self.pr_cnt -= counts[0]
+        self.merged_cnt -= counts[1]
+        if self.first_contributions.is_community_developer(author):
+            self.affiliations -= 1
+
+    def move(self, start, end):
+        self.start = start
+        total_prs = self.sweep.move(start, end)
+        newcomer_cnt = len(self.authors)
+        return {
+            "community_newcomer_cnt": newcomer_cnt,
+            "community_newcomer_pr_cnt": self.pr_cnt,
+            "community_newcomer_pr_cnt_ratio": round(self.pr_cnt / total_prs, 4) if total_prs > 0 else 0.0,
+            "community_newcomer_pr_merged_cnt": self.merged_cnt,
+            "community_newcomer_pr_merged_cnt_ratio": round(self.merged_cnt / self.pr_cnt, 4) if self.pr_cnt > 0 else 0.0,
+            "community_newcomer_affiliation_ratio": round(self.affiliations / newcomer_cnt, 4) if newcomer_cnt > 0 else 0.0,
+        }
+
+
+def load_rules():
+    file_path = os.path.join(DATA_DIR, "paddle-rules.json")
+    if not os.path.exists(file_path):
+        raise FileNotFoundError("找不到文件 paddle-rules.json。")
+    with open(file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def rule_dates(rules):
+    """
+    所有规则的发布日期（去重、升序）
+    """
+    return sorted({datetime.fromisoformat(rule.get("time")).date() for rule in rules})
+
+
+def date_series(start_date: date, end_date: date, step_days: int) -> list[date]:
+    """
+    [start_date, end_date] 内每隔 step_days 天的日期
+    """
+    if step_days <= 0:
+        raise ValueError("step_days 必须为正整数")
+    if start_date > end_date:
+        raise ValueError("起始日期不能晚于结束日期")
+    return [start_date + timedelta(days=i) for i in range(0, (end_date - start_date).days + 1, step_days)]
+
+
+def analyze_governance_timeline(dates: Optional[list[date]] = None) -> dict:
+    """
+    一次有序扫描计算多个日期前后各90天的响应时间中位数和新贡献者情况，
+    结果与对每个日期单独调用 GovernanceAnalyzer 相同；dates 为空时使用所有规则的发布日期
+    """
+    rules = load_rules()
+    if not dates:
+        dates = rule_dates(rules)
+    ordered = sorted(set(dates))
+
+    pr_index = load_time_index("prs", REPO)
+    issue_index = load_time_index("issues", REPO)
+    actors = load_actor_table()
+
+    # 每条记录的响应/关闭时间只计算一次
+    pr_values = {}
+    for pr in pr_index.records:
+        if pr['closed_at']:
+            pr_values[id(pr)] = {
+                "response": (first_response_ts(pr, PR_RESPONSE_COLUMNS, actors) - pr['created_ts']) / 3600,
+                "close": (pr['closed_ts'] - pr['created_ts']) / 3600,
+            }
+    issue_values = {}
+    for issue in issue_index.records:
+        if 'error' not in issue and issue['closed_at']:
+            issue_values[id(issue)] = {
+                "response": (first_response_ts(issue, ISSUE_RESPONSE_COLUMNS, actors) - issue['created_ts']) / 3600,
+            }
+
+    # before窗口 [d-90, d]，after窗口 (d, d+90]，每个窗口每个指标一个滑动中位数
+    sweeps = {}
+    medians = {}
+    for window in ("before", "after"):
+        pr_medians, make_pr = median_sweep(pr_index, pr_values)
+        issue_medians, make_issue = median_sweep(issue_index, issue_values)
+        sweeps[window] = [make_pr("response"), make_pr("close"), make_issue("response")]
+        medians[window] = (pr_medians, issue_medians)
+
+    # 新贡献者：作者首次PR时间和社区开发者分类取自首次贡献表
+    first_contributions = load_first_contributions(REPO)
+    newcomers = {
+        window: NewcomerWindow(pr_index, first_contributions, actors)
+        for window in ("before", "after")
+    }
+
+    rules_by_date = {}
+    for rule in rules:
+        rules_by_date.setdefault(datetime.fromisoformat(rule.get("time")).date(), []).append(format_new_rule(rule))
+
+    results = {}
+    for input_date in ordered:
+        before_ts = date_to_epoch(input_date - timedelta(days=WINDOW_DAYS))
+        input_ts = date_to_epoch(input_date)
+        after_ts = date_to_epoch(input_date + timedelta(days=WINDOW_DAYS))
+        # 与 analyze_response_time 相同：按天包含两端，input_date 当天归入 before
+        response_windows = {
+            "before": (before_ts, input_ts + DAY_SECONDS),
+            "after": (input_ts + DAY_SECONDS, after_ts + DAY_SECONDS),
+        }
+        response_time = {}
+        for window, (start, end) in response_windows.items():
+            for sweep in sweeps[window]:
+                sweep.move(start, end)
+            pr_medians, issue_medians = medians[window]
+            response_time[window] = {
+                f"pr_response_time_{window}": pr_medians["response"].median(),
+                f"pr_close_time_{window}": pr_medians["close"].median(),
+                f"issue_response_time_{window}": issue_medians["response"].median(),
+            }
+
+        community_windows = {"before": (before_ts, input_ts), "after": (input_ts, after_ts)}
+        community_developer_activity = {}
+        for window, (start, end) in community_windows.items():
+            stats = newcomers[window].move(start, end)
+            community_developer_activity[window] = {f"{key}_{window}": value for key, value in stats.items()}
+
+        results[input_date] = {
+            "input_date": input_date.isoformat(),
+            "new_rule": rules_by_date.get(input_date, []),
+            "scores": {
+                "response_time": response_time,
+                "community_developer_activity": community_developer_activity,
+            },
+        }
+
+    return {
+        "date": get_now_date(),
+        "timeline": [results[d] for d in dates],
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.time()
+    timeline = analyze_governance_timeline()["timeline"]
+    sweep_time = time.time() - start
+    print(f"{len(timeline)} 个规则日期，一次扫描耗时 {sweep_time:.2f} s")
+
+    # 对照：逐个日期单独分析
+    start = time.time()
+    for item in timeline:
+        analyzer = GovernanceAnalyzer(date.fromisoformat(item["input_date"]))
+        scores = {
+            "response_time": analyzer.analyze_response_time(),
+            "community_developer_activity": analyzer.analyze_community_developer_activity(),
+        }
+        assert scores == item["scores"], item["input_date"]
+    print(f"逐个日期分析耗时 {time.time() - start:.2f} s，结果一致")
+
+    # 对照：部分PR作者为空（已注销）或不在首次贡献表中时，新贡献者窗口与逐窗口统计一致
+    from utils.data_store import TimeIndex
+    from utils.first_contributions import FirstContributions, merge_first_times
+
+    prs = [dict(pr, user=None) if i % 50 == 0 else pr for i, pr in enumerate(load_time_index("prs", REPO).records)]
+    first = {}
+    merge_first_times(first, "pr", prs)
+    first["pr"] = {login: ts for i, (login, ts) in enumerate(first["pr"].items()) if i % 7}
+    first_contributions = FirstContributions({
+        "first": first,
+        "community_developers": sorted(load_first_contributions(REPO).community_developers),
+    })
+    pr_index = TimeIndex(prs)
+    actors = load_actor_table()
+    window = NewcomerWindow(pr_index, first_contributions, actors)
+    for input_date in rule_dates(load_rules()):
+        start = date_to_epoch(input_date - timedelta(days=WINDOW_DAYS))
+        end = date_to_epoch(input_date)
+        stats = window.move(start, end)
+        newcomer_authors = actors.humans(first_contributions.newcomers("pr", start, end))
+        window_prs = [pr for pr in pr_index.slice(start, end) if pr.get('user') in newcomer_authors]
+        assert stats["community_newcomer_cnt"] == len(newcomer_authors), input_date
+        assert stats["community_newcomer_pr_cnt"] == len(window_prs), input_date
+        assert stats["community_newcomer_pr_merged_cnt"] == sum(1 for pr in window_prs if pr.get('merged', False)), input_date
+    print("空作者、缺失作者的新贡献者统计一致")
@@ -1,41 +1,87 @@
 import os
 import json
 import re
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
 import numpy as np
-import pandas as pd
 import joblib
 
-from utils.cmt_msg_processor import process_commit_messages, BertEmbedding
+from utils.cmt_msg_processor import process_commit_messages, load_bert, bert_encode, bert_features
 # from utils.content_processor import get_commit_type
 
-def get_features(commits: list[dict]) -> np.ndarray:
-    """ 
-    提取commit message特征，构造预测数据集
-    """
-    # 提取消息文本
-    messages = [commit['message'] for commit in commits]
-    files = []
-    for commit in commits:
-        files_now = [file['filename'] for file in commit.get('files', [])]
-        files.append(files_now)
+# 预处理占位符 -> 模型使用的特殊 token
+PLACEHOLDER_TOKENS = {
+    '<enter>': '$enter',
+    '<tab>': '$tab',
+    '<url>': '$url',
+    '<version>': '$versionNumber',
+    '<pr_link>': '$pullRequestLink>',
+    '<issue_link >': '$issueLink',
+    '<otherCommit_link>': '$otherCommitLink',
+    '<method_name>': '$methodName',
+    '<file_name>': '$fileName',
+    '<iden>': '$token',
+}
+PLACEHOLDER_PATTERN = re.compile('|'.join(re.escape(k) for k in PLACEHOLDER_TOKENS))
 
-    # 预处理文本（格式还原、占位符替换等）
+def preprocess_chunk(chunk: tuple[list[str], list[list[str]]]) -> list[str]:
+    """
+    在子进程中预处理一批commit message（格式还原、占位符替换等），并替换为特殊 token
+    """
+    messages, files = chunk
     p_messages = process_commit_messages(messages, files)
+    # 一次扫描完成所有占位符替换，结果与依次调用 str.replace 相同
+    return [PLACEHOLDER_PATTERN.sub(lambda m: PLACEHOLDER_TOKENS[m.group(0)], message) for message in p_messages]
 
-    # 构造 DataFrame
-    df = pd.DataFrame(p_messages)
-    df.columns = ['new_message1']
+def split_chunks(commits: list[dict], chunk_size: int):
+    """
+    将commit按chunk_size切分为 (messages, files) 批次
+    """
+    for i in range(0, len(commits), chunk_size):
+        chunk = commits[i:i + chunk_size]
+        messages = [commit['message'] for commit in chunk]
+        files = [[file['filename'] for file in commit.get('files', [])] for commit in chunk]
+        yield messages, files
+
+def get_features(commits: list[dict], chunk_size: int = 256, max_workers: Optional[int] = None) -> np.ndarray:
+    """ 
+    提取commit message特征，构造预测数据集
+    预处理在进程池中分批并行执行，分词线程与模型推理组成生产者/消费者流水线
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # 先提交预处理任务，保证子进程在加载模型之前创建
+        p_chunks = executor.map(preprocess_chunk, split_chunks(commits, chunk_size))
+        tokenizer, model = load_bert()
 
-    # 用特殊 token 替换原始 id/tokens
-    df['new_message1'] = df['new_message1'].apply(lambda x: x.replace('<enter>', '$enter').replace('<tab>', '$tab') \
-        .replace('<url>', '$url').replace('<version>', '$versionNumber').replace('<pr_link>', '$pullRequestLink>') \
-        .replace('<issue_link >', '$issueLink').replace('<otherCommit_link>', '$otherCommitLink') \
-        .replace("<method_name>", "$methodName").replace("<file_name>", "$fileName").replace("<iden>", "$token"))
+        # 生产者：按顺序取回预处理结果并分词，放入有界队列
+        encoded = queue.Queue(maxsize=2)
+        def produce():
+            try:
+                for p_messages in p_chunks:
+                    encoded.put(bert_encode(tokenizer, p_messages))
+            except Exception as e:
+                encoded.put(e)
+                return
+            encoded.put(None)
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
 
-    # 提取BERT特征
-    features = BertEmbedding(df)
+        # 消费者：当前批次推理时，下一批次已在分词
+        features = []
+        while True:
+            item = encoded.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            features.append(bert_features(model, *item))
+        producer.join()
 
-    return features
+    if not features:
+        return np.empty((0, model.config.hidden_size), dtype=np.float32)
+    return np.concatenate(features)
 
 def get_commit_msg_type(commits: list[dict]) -> list[dict]:
     """ 
@@ -10,11 +10,14 @@ import json
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import subprocess
+import re
 import logging
 from typing import *
-from github import Github, GithubException
+from github import Github
 
 from utils.request_github import request_github
+from utils.git_mirror import ensure_mirror, run_git
+from utils.manage_data_update_time import get_commit_heads
 from config import GITHUB_TOKEN
 
 GITHUB_GRAPHQL_ENDPOINT = "https://api.github.com/graphql"
@@ -24,94 +27,98 @@ token_list = [
     GITHUB_TOKEN,
 ]
 
-def load_commit_objects(file_path):
+# 邮箱到GitHub login的缓存，None表示该邮箱没有关联的GitHub账号
+EMAIL_LOGINS_FILE = "data/email_logins.json"
+# GitHub的noreply邮箱，如 12345+login@users.noreply.github.com
+NOREPLY_PATTERN = re.compile(r'^(?:\d+\+)?([A-Za-z0-9-]+)@users\.noreply\.github\.com$')
+
+# git log 单次遍历的输出格式：每个commit以\x1e开头，头部字段以\0分隔，之后是 -z 格式的 --raw 和 --numstat
+LOG_FIELDS = ["sha", "created_at", "author", "author_email", "committer", "committer_email", "message"]
+LOG_FORMAT = "%x1e" + "%x00".join(["%H", "%aI", "%an", "%ae", "%cn", "%ce", "%B"]) + "%x00"
+
+# git --raw 状态码到GitHub REST API文件状态的映射
+FILE_STATUS = {
+    'A': 'added',
+    'M': 'modified',
+    'D': 'removed',
+    'R': 'renamed',
+    'C': 'copied',
+    'T': 'changed',
+}
+
+def parse_commit_record(repo_full_name: str, record: str) -> dict:
     """
-    将git log获取的commit基本信息转换为json
+    解析单个commit记录
+    --raw 给出文件状态和重命名前后的路径，--numstat 给出增删行数，两者按相同的文件顺序输出
     """
-    commits = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            if line.strip():
-                # 将每一行的JSON对象加载为Python字典
-                line = line.strip().rstrip(',')
-                commit = json.loads(line)
-                commits.append(commit)
-    return commits
-
-def extract_modified_filename(change_str):
-    """
-    修改文件名的文件保留新的文件名
-    如'demo/components/{pir_translate.py => pir_program_test.py}'
-    """
-    start = change_str.find('=>') + 3  # Skip '=> ' to get to the new filename
-    end = change_str.find('}', start)
-
-    new_filename = change_str[start:end].strip()
-
-    base_path = change_str[:change_str.find('{')].strip()
-    return f"{base_path}{new_filename}"
-
-def parse_commit_logs1(file_path):
-    """
-    解析git log --name-status获取的commit信息
-    """
-    commit_data = {}
-    current_sha = None
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line.startswith("STARTOFTHECOMMIT"):
-                current_sha = line.split(": ")[1]
-                commit_data[current_sha] = {'files': []}
-            else:
-                if line:
-                    parts = line.split()
-                    if len(parts) == 2:
-                        status, filename = parts[0], parts[1]
-                        if status == 'A':
-                            status = 'added'
-                        elif status == 'M':
-                            status = 'modified'
-                        else:
-                            status = 'removed'
-                        commit_data[current_sha]['files'].append({
-                            'filename': filename,
-                            'status': status,
-                        })
-                    elif len(parts) == 3:
-                        status, filename = parts[0], parts[2]
-                        commit_data[current_sha]['files'].append({
-                            'filename': filename,
-                            'status': 'modified',
-                        })
-    return commit_data
-
-def parse_commit_logs2(file_path):
+    tokens = record.split('\0')
+    commit = {'repo': repo_full_name}
+    commit.update(zip(LOG_FIELDS, tokens))
+    commit['created_at'] = datetime.fromisoformat(commit['created_at']).astimezone(timezone.utc).isoformat()
+    commit['message'] = commit['message'].rstrip('\n')
+
+    files = []
+    stat_index = 0
+    i = len(LOG_FIELDS)
+    while i < len(tokens):
+        token = tokens[i].lstrip('\n')
+        i += 1
+        if not token:
+            continue
+        if token.startswith(':'):
+            # :100644 100644 <old_blob> <new_blob> R083\0旧路径\0新路径
+            status = token.rsplit(' ', 1)[1]
+            file = {'filename': tokens[i], 'status': FILE_STATUS.get(status[0], 'modified')}
+            i += 1
+            if status[0] in 'RC':
+                file['previous_filename'] = file['filename']
+                file['filename'] = tokens[i]
+                i += 1
+            files.append(file)
+        else:
+            # <增加行数>\t<删除行数>\t<路径>，重命名时路径为空，后面跟着旧路径和新路径；二进制文件行数为'-'
+            additions, deletions, filename = token.split('\t', 2)
+            if not filename:
+                i += 2
+            additions = int(additions) if additions.isdigit() else 0
+            deletions = int(deletions) if deletions.isdigit() else 0
+            if stat_index < len(files):
+                files[stat_index].update({
+                    'additions': additions,
+                    'deletions': deletions,
+                    'changes': additions + deletions,
+                })
+            stat_index += 1
+    commit['files'] = files
+    return commit
+
+def iter_repo_commits(git_dir, repo_full_name: str, revs: list[str], extra_args: list[str] = None) -> Iterator[dict]:
     """
-    解析git log --numstat获取的commit信息
+    单次 git log 遍历，流式返回结构化的commit记录
+    revs 为 git log 的版本范围，如 ["HEAD"]、["<last_sha>..HEAD"]；合并commit按第一个父节点计算文件变更（与REST API一致）
     """
-    commit_data = {}
-    current_sha = None
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if line.startswith("STARTOFTHECOMMIT"):
-                current_sha = line.split(": ")[1]
-                commit_data[current_sha] = {'files': []}
-            else:
-                if line:
-                    parts = line.split()
-                    # print(line)
-                    additions = int(parts[0]) if parts[0].isdigit() else 0
-                    deletions = int(parts[1]) if parts[1].isdigit() else 0
-                    # filename = extract_modified_filename(parts[2]) if "=>" in parts[2] else parts[2]
-                    commit_data[current_sha]['files'].append({
-                        # 'filename': filename,
-                        'additions': additions,
-                        'deletions': deletions,
-                        'changes': additions + deletions
-                        })
-    return commit_data
+    cmd = [
+        "git", "log", "-z", "--raw", "--numstat", "-M", "--no-abbrev",
+        "--diff-merges=first-parent", f"--format={LOG_FORMAT}",
+        *(extra_args or []), *revs, "--",
+    ]
+    with subprocess.Popen(cmd, cwd=git_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          text=True, encoding="utf-8", errors="ignore") as proc:
+        pending = []
+        for chunk in iter(lambda: proc.stdout.read(1 << 16), ''):
+            parts = chunk.split('\x1e')
+            pending.append(parts[0])
+            for part in parts[1:]:
+                record = ''.join(pending)
+                if record:
+                    yield parse_commit_record(repo_full_name, record)
+                pending = [part]
+        record = ''.join(pending)
+        if record:
+            yield parse_commit_record(repo_full_name, record)
+        stderr = proc.stderr.read()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
 
 # def get_login_for_commit(gh, repo_full_name, sha):
 #     """
@@ -154,72 +161,16 @@ def parse_commit_logs2(file_path):
 
 #     return updated_list
 
-def get_repo_commits(repo_full_name):
+def get_repo_commits(repo_full_name, since_sha=None):
     """ 
-    使用Shell脚本获取指定仓库的所有commit
-    该方法使用git log命令获取commit信息，并将其转换为JSON格式。
+    在本地镜像（utils.git_mirror）上单次遍历git log，获取指定仓库的commit
+    since_sha 不为空时只处理该sha之后的新commit（增量更新），否则获取全部历史
     适用于需要处理大量仓库的情况，速度较快。
     """
     logger.info(f"Processing repository: {repo_full_name}")
-
-    # 定义Shell脚本的内容，使用传入的仓库名称
-    shell_script = f"""
-    FULL_NAME="{repo_full_name}"
-    REPO_URL="https://github.com/$FULL_NAME.git"
-    FILE_NAME=$(echo $FULL_NAME | tr '/' '_')
-    
-    # 指定目录，clone repo
-    DEST_DIR="./tmp_repo"
-    mkdir -p $DEST_DIR
-    CLONE_PATH="$DEST_DIR/$FILE_NAME"
-    git clone $REPO_URL $CLONE_PATH
-
-    # 获取commit日志
-    cd $CLONE_PATH
-    git log --pretty=format:'{{"repo": "{repo_full_name}", "sha": "%H", "created_at": "%ad", "author": "%an", "author_email": "%ae", "committer": "%cn", "message": "%f"}},' --date=iso | sed "$ s/,$//" > ../${{FILE_NAME}}_commits.json
-    git log --name-status --pretty=format:'STARTOFTHECOMMIT: %H'> ../${{FILE_NAME}}_commits1.log
-    git log --numstat --pretty=format:'STARTOFTHECOMMIT: %H'> ../${{FILE_NAME}}_commits2.log
-
-    # 返回当前目录
-    cd ../.. 
-    """
-
-    # 执行Shell命令
-    try:
-        subprocess.run(shell_script, shell=True, check=True, capture_output=True, text=True)
-        # print("Execution completed.")
-    except subprocess.CalledProcessError as e:
-        print(f"An error occurred: {e.stderr}")
-
-    commits_file = f"tmp_repo/{repo_full_name.replace('/', '_')}_commits.json"
-    commits1_file = f"tmp_repo/{repo_full_name.replace('/', '_')}_commits1.log"
-    commits2_file = f"tmp_repo/{repo_full_name.replace('/', '_')}_commits2.log"
-    commits = load_commit_objects(commits_file)
-    commit_details_1 = parse_commit_logs1(commits1_file)
-    commit_details_2 = parse_commit_logs2(commits2_file)
-
-    # 合并信息
-    commit_list = []
-    for commit in commits:
-        sha = commit['sha']
-        files_1 = commit_details_1.get(sha, {}).get('files', [])
-        files_2 = commit_details_2.get(sha, {}).get('files', [])
-
-        for i in range(len(files_1)):
-            file_1 = files_1[i]
-            file_2 = files_2[i] if i < len(files_2) else {}
-            file_1.update(file_2)
-
-        commit['files'] = files_1
-        commit_list.append(commit)
-    
-    # 用pygithub获取commit的author和committer的login，替换当前可能不准确的author和committer
-    # commit_list = update_logins(repo_full_name, commit_list)
-
-    # 删除tmp_repo目录
-    subprocess.run(f"rm -rf tmp_repo", shell=True, check=True)
-    # print(f"Merged data for {repo_owner_repo} into {output_filename}")
-    return commit_list
+    git_dir = ensure_mirror(repo_full_name)
+    revs = [f"{since_sha}..HEAD"] if since_sha else ["HEAD"]
+    return list(iter_repo_commits(git_dir, repo_full_name, revs))
 
 def get_repo_commits_gh(gh, repo_full_name):
     """
@@ -293,105 +244,137 @@ def get_commit_files(token: str, repo_full_name: str, commit_sha: str) -> list[d
 
     return file_list
 
-def update_repo_commits(token: str, repo_full_name: str, since: str, until: str) -> list[dict]:
+def load_email_logins() -> dict:
     """
-    用rest api获取指定仓库的commit信息
+    加载邮箱到login的缓存
     """
-    gh = Github(token)
-    owner, name = repo_full_name.split("/")
+    if not os.path.exists(EMAIL_LOGINS_FILE):
+        return {}
+    with open(EMAIL_LOGINS_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_email_logins(email_logins: dict) -> None:
+    with open(EMAIL_LOGINS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(email_logins, f, indent=4, ensure_ascii=False)
+
+def parse_noreply_login(email: str) -> Optional[str]:
+    """
+    从GitHub的noreply邮箱中直接解析出login，无法解析时返回None
+    """
+    if email == "noreply@github.com":
+        return "web-flow"  # 网页端操作（如squash merge）的committer
+    match = NOREPLY_PATTERN.match(email or "")
+    return match.group(1) if match else None
+
+def resolve_logins(token: str, repo_full_name: str, commits: list[dict], email_logins: dict) -> None:
+    """
+    将commit的作者和提交者邮箱解析为GitHub login
+    先查缓存和noreply邮箱，剩余的未知邮箱每个只调用一次API（取该邮箱的任一commit查询）
+    """
+    unknown = {}  # email -> (sha, 'author' | 'committer')
+    for commit in commits:
+        for role in ('author', 'committer'):
+            email = commit.get(f'{role}_email')
+            if not email or email in email_logins or email in unknown:
+                continue
+            login = parse_noreply_login(email)
+            if login:
+                email_logins[email] = login
+            else:
+                unknown[email] = (commit['sha'], role)
+
+    if unknown:
+        gh = Github(token)
+        repo = request_github(
+            gh, lambda r: gh.get_repo(r),
+            (repo_full_name, )
+        )
+
+        def fetch_login(email, sha, role):
+            commit_obj = request_github(gh, lambda s: repo.get_commit(s), (sha, ))
+            user = getattr(commit_obj, role, None) if commit_obj else None
+            return email, user.login if user else None
+
+        if repo:
+            with ThreadPoolExecutor(max_workers=9) as executor:
+                futures = [executor.submit(fetch_login, email, sha, role) for email, (sha, role) in unknown.items()]
+                for future in tqdm(as_completed(futures), total=len(futures), desc=f"Resolving logins for {repo_full_name}", dynamic_ncols=True):
+                    email, login = future.result()
+                    email_logins[email] = login
+
+def get_target_branches(git_dir) -> list[str]:
+    """
+    需要统计的分支：develop 和默认分支，都不存在时使用第一个分支
+    """
+    branches = run_git(["for-each-ref", "--format=%(refname:short)", "refs/heads"], git_dir).split()
+    default_branch = run_git(["symbolic-ref", "--short", "HEAD"], git_dir).strip()
+    target_branches = [b for b in dict.fromkeys(["develop", default_branch]) if b in branches]
+    if not target_branches and branches:
+        target_branches = branches[:1]
+    return target_branches
 
+def update_repo_commits(token: str, repo_full_name: str, since: str, until: str, known_commits: list[dict] = None) -> tuple[list[dict], dict]:
+    """
+    从本地镜像增量获取指定仓库的commit信息，文件变更和行数统计都在本地计算，API只用于解析login
+    只处理上次入库的sha（get_commit_heads）之后、until之前的新commit；known_commits为已入库的commit，用于预填充邮箱到login的缓存
+    返回commit列表和各分支本次入库的head，head需要在commit保存后用update_commit_heads记录
+    """
     since_dt = datetime.fromisoformat(since).replace(tzinfo=timezone.utc)
     until_dt = datetime.fromisoformat(until).replace(tzinfo=timezone.utc)
 
     logger.info(f"Fetching commits for repository: {repo_full_name} from {since_dt} to {until_dt}")
-    repo = request_github(
-        gh, lambda r: gh.get_repo(r),
-        (repo_full_name, )
-    )
-    if not repo:
-        return []
-
-    branches = request_github(gh, lambda: repo.get_branches())
     try:
-        branches = list(branches)  # 将 PaginatedList 转换为普通列表
-    except GithubException as e:
-        logger.warning(f"Failed to fetch branches for repo {repo_full_name}: {e}")
-        return []
-    if not branches:
-        logger.warning(f"Cannot load branches for repo: {repo_full_name}")
-        return []
-    default_branch = repo.default_branch  # e.g., 'main' or 'master'
-    available_branch_names = {branch.name for branch in branches}
-    target_branches: set[str] = set()
-    if "develop" in available_branch_names:
-        target_branches.add("develop")
-    if default_branch in available_branch_names:
-        target_branches.add(default_branch)
-
-    # 如果没有 develop 和 default，都找最后一个 branch fallback
-    if not target_branches and branches:
-        target_branches.add(branches[0].name)
+        git_dir = ensure_mirror(repo_full_name)
+    except subprocess.CalledProcessError as e:
+        logger.warning(f"Failed to update mirror of repo {repo_full_name}: {e.stderr}")
+        return [], {}
 
+    target_branches = get_target_branches(git_dir)
+    if not target_branches:
+        logger.warning(f"Cannot load branches for repo: {repo_full_name}")
+        return [], {}
     print(f"Target branches for repo {repo_full_name}: {target_branches}")
 
-    results = []
-    
+    # git rev-list 范围：各分支截至until的head，排除上次已入库的sha及其祖先
+    heads = {}
     for branch in target_branches:
-        commits = request_github(
-            gh, lambda since, until: repo.get_commits(since=since, until=until, sha=branch),
-            (since_dt, until_dt)
-        )
-
-        if not commits:
-            continue
+        head = run_git(["rev-list", "-1", f"--until={until_dt.isoformat()}", branch], git_dir).strip()
+        if head:
+            heads[branch] = head
+    excludes = []
+    for sha in set(get_commit_heads(repo_full_name).values()):
         try:
-            commits = list(commits)
-        except GithubException as e:
-            logger.warning(f"GitHub error when listing commits for {repo_full_name}: "
-                        f"{getattr(e, 'data', {}).get('message', str(e))}")
+            run_git(["cat-file", "-e", f"{sha}^{{commit}}"], git_dir)
+            excludes.append(f"^{sha}")
+        except subprocess.CalledProcessError:
+            logger.warning(f"Last ingested commit {sha} not found in {repo_full_name}, skipped")
+    if not heads:
+        return [], {}
+
+    results = list(iter_repo_commits(
+        git_dir, repo_full_name, list(dict.fromkeys(heads.values())) + excludes,
+        [f"--since={since_dt.isoformat()}", f"--until={until_dt.isoformat()}"],
+    ))
+
+    # 邮箱解析为login：author保存login，author_name保存git中的作者名
+    email_logins = load_email_logins()
+    for commit in known_commits or []:
+        email = commit.get('author_email')
+        if not email:
             continue
-        except Exception as e:
-            logger.exception(f"Unexpected error converting commits to list for {repo_full_name}: {e}")
-            continue
-
-        # 使用多线程获取每个commit的详细信息
-        def fetch_commit_details(commit):
-            try:
-                commit_info = {
-                    'repo': repo_full_name,
-                    'sha': commit.sha,
-                    'message': commit.commit.message,
-                    'created_at': commit.commit.author.date.isoformat(),
-                    'author': commit.author.login if commit.author else None,
-                    'author_email': commit.commit.author.email if commit.commit and commit.commit.author else None,
-                    'committer': commit.committer.login if commit.committer else None,
-                }
-                try:
-                    commit_files = commit.files
-                    commit_info['files'] = [{
-                        'filename': f.filename,
-                        'status': f.status,
-                        'additions': f.additions,
-                        'deletions': f.deletions,
-                        'changes': f.changes
-                    } for f in commit_files] if commit_files else []
-                except Exception:
-                    commit_info['files'] = []
-                return commit_info
-            except Exception as e:
-                logger.error(f"Error processing commit {commit.sha} in repository {repo_full_name}: {e}")
-                return {
-                    'repo': repo_full_name,
-                    'sha': commit.sha,
-                    'error': str(e)
-                }
-        with ThreadPoolExecutor(max_workers=9) as executor:
-            future_to_commit = {executor.submit(fetch_commit_details, commit): commit for commit in commits}
-            for future in tqdm(as_completed(future_to_commit), total=len(future_to_commit), desc=f"Fetching commit details from {repo_full_name}", dynamic_ncols=True):
-                commit_info = future.result()
-                results.append(commit_info)
-
-    return results
+        # 只用确认过的login补充缓存：新流程的记录（有 author_name）author 为login，
+        # 旧的 git log 回填记录 author 为git作者名，只能从noreply邮箱解析
+        login = commit.get('author') if 'author_name' in commit else parse_noreply_login(email)
+        if login:
+            email_logins.setdefault(email, login)
+    resolve_logins(token, repo_full_name, results, email_logins)
+    save_email_logins(email_logins)
+    for commit in results:
+        commit['author_name'] = commit['author']
+        commit['author'] = email_logins.get(commit['author_email'])
+        commit['committer'] = email_logins.get(commit.pop('committer_email'))
+
+    return results, heads
 
 if __name__ == "__main__":
 
@@ -417,6 +400,6 @@ if __name__ == "__main__":
     #         json.dump(commits, f, indent=4)
 
     # 更新指定repo的commit
-    res = update_repo_commits(token_list[0], "PaddlePaddle/Paddle", "2025-10-03", "2025-10-11")
+    res, _ = update_repo_commits(token_list[0], "PaddlePaddle/Paddle", "2025-10-03", "2025-10-11")
     with open("cache/test_commits.json", "w", newline="", encoding="utf-8") as f:
         json.dump(res, f, indent=4, ensure_ascii=False)
\ No newline at end of file
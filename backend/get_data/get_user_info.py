@@ -15,10 +15,10 @@ token_list = [
 
 def get_user_info(gh, username):
     """
-    获取指定用户的基本信息
+    获取指定用户的基本信息；用户不存在时抛出 ValueError，其他请求错误（如超出速率限制）重试后直接抛出
     """
     logger.info(f"Fetching user info for {username}")
-    dvpr = request_github(gh, gh.get_user, (username,))
+    dvpr = request_github(gh, gh.get_user, (username,), raise_errors=True)
     if not dvpr:
         logger.error(f"User {username} not found.")
         raise ValueError(f"Github 用户不存在，请重新输入")
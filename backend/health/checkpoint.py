@@ -0,0 +1,66 @@
+import json
+import os
+import shutil
+
+
+def write_json_atomic(path, data):
+    """先写临时文件再替换，避免中断时留下半个文件"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class PageState:
+    """
+    单个分页任务的断点：保存游标和已累计的计数，每处理完一页调用一次 save
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def get(self, key, default=None):
+        return self.state.get(key, default)
+
+    def save(self, **state):
+        self.state.update(state)
+        write_json_atomic(self.path, self.state)
+
+
+class Checkpoint:
+    """
+    健康度量流水线的检查点目录 temp_data/{owner}_{repo}/
+    - {stage}.json：已完成阶段的输出，重新运行时直接读取
+    - {key}.page.json：进行中的分页任务的游标
+    - run.json：运行参数，参数变化时旧的检查点作废
+    """
+
+    def __init__(self, directory, run_args):
+        self.directory = directory
+        run_file = os.path.join(directory, "run.json")
+        if os.path.exists(run_file):
+            with open(run_file, "r", encoding="utf-8") as f:
+                if json.load(f) != run_args:
+                    shutil.rmtree(directory)
+        os.makedirs(directory, exist_ok=True)
+        write_json_atomic(run_file, run_args)
+
+    def load_output(self, stage):
+        path = os.path.join(self.directory, f"{stage}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_output(self, stage, output):
+        write_json_atomic(os.path.join(self.directory, f"{stage}.json"), output)
+
+    def page_state(self, key):
+        return PageState(os.path.join(self.directory, f"{key}.page.json"))
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
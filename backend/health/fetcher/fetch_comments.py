@@ -7,20 +7,21 @@ from tqdm import tqdm
 from urllib3.util.retry import Retry
 
 
-def fetch_total_count_and_comments(node_type, token, owner, repo, days=None):
+def fetch_comment_windows(node_type, token, owner, repo, windows=(None,), page_state=None):
     """
+    单次分页同时统计多个时间窗口内的 issue/PR 数量和评论数
     node_type: "issues" 或 "pullRequests"
-    days: 统计这些天内的数据
+    windows: 天数列表，None 表示全部时间；只统计近期窗口时，createdAt 早于最大窗口后提前结束分页
+    page_state: 分页断点（health.checkpoint.PageState），传入时从上次中断的页继续
+    返回 (totalCount, {window: (数量, 评论数)})
     """
 
     url = "https://api.github.com/graphql"
     headers = {"Authorization": f"Bearer {token}"}
 
-    if days:
-        date_since = datetime.now(timezone.utc) - timedelta(days=days)
-        since_iso = date_since.isoformat() + "Z"
-    else:
-        since_iso = None
+    now = datetime.now(timezone.utc)
+    window_since = [now - timedelta(days=days) if days else None for days in windows]
+    earliest = None if None in window_since else min(window_since)
 
     # 配置 Session + 重试
     session = requests.Session()
@@ -28,11 +29,13 @@ def fetch_total_count_and_comments(node_type, token, owner, repo, days=None):
     adapter = HTTPAdapter(max_retries=retries)
     session.mount("https://", adapter)
 
-    total_count = 0
-    comments_count = 0
-    has_next_page = True
-    cursor = None
-    recent_count = 0
+    state = page_state.state if page_state else {}
+    total_count = state.get("total_count", 0)
+    node_counts = state.get("node_counts", [0] * len(windows))
+    comment_counts = state.get("comment_counts", [0] * len(windows))
+    has_next_page = state.get("has_next_page", True)
+    cursor = state.get("cursor")
+    processed = state.get("processed", 0)
 
     pbar = tqdm(
         desc=f"Fetching {node_type}",
@@ -40,6 +43,9 @@ def fetch_total_count_and_comments(node_type, token, owner, repo, days=None):
         bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]",
         dynamic_ncols=True,
     )
+    if total_count:
+        pbar.total = total_count
+        pbar.update(processed)
 
     while has_next_page:
         query = f"""
@@ -92,21 +98,46 @@ def fetch_total_count_and_comments(node_type, token, owner, repo, days=None):
         has_next_page = page_info.get("hasNextPage", False)
 
         for node in nodes:
-            if days:
-                created = datetime.fromisoformat(
-                    node["createdAt"].replace("Z", "+00:00")
-                )
-                if created < date_since:
-                    has_next_page = False
-                    break
-            recent_count += 1
-            comments_count += node["comments"]["totalCount"]
+            created = datetime.fromisoformat(node["createdAt"].replace("Z", "+00:00"))
+            # 按创建时间倒序，早于所有窗口后不再需要后续的页
+            if earliest and created < earliest:
+                has_next_page = False
+                break
+            comments = node["comments"]["totalCount"]
+            for i, since in enumerate(window_since):
+                if since is None or created >= since:
+                    node_counts[i] += 1
+                    comment_counts[i] += comments
+            processed += 1
             pbar.update(1)
 
         cursor = page_info.get("endCursor", None)
+        if page_state:
+            page_state.save(
+                cursor=cursor,
+                has_next_page=has_next_page,
+                total_count=total_count,
+                node_counts=node_counts,
+                comment_counts=comment_counts,
+                processed=processed,
+            )
 
     pbar.close()
-    return total_count, comments_count
+    return total_count, {
+        days: (node_counts[i], comment_counts[i]) for i, days in enumerate(windows)
+    }
+
+
+def fetch_total_count_and_comments(node_type, token, owner, repo, days=None, page_state=None):
+    """
+    node_type: "issues" 或 "pullRequests"
+    days: 统计这些天内的数据
+    需要同时统计多个时间窗口时使用 fetch_comment_windows，只分页一次
+    """
+    total_count, counts = fetch_comment_windows(
+        node_type, token, owner, repo, [days], page_state
+    )
+    return total_count, counts[days][1]
 
 
 if __name__ == "__main__":
@@ -125,16 +156,14 @@ if __name__ == "__main__":
 
     print(f"开始收集{owner}/{repo}的comment数量")
 
-    issue_total, issue_comments = fetch_total_count_and_comments(
-        "issues", token, owner, repo, 90
+    issue_total, issue_counts = fetch_comment_windows(
+        "issues", token, owner, repo, [None, 90]
     )
-    print(f"Issues:{issue_total},Issue Comments:{issue_comments}")
+    print(f"Issues:{issue_total},Issue Comments:{issue_counts[None][1]},近90天:{issue_counts[90][1]}")
 
-    pr_total, pr_comments = fetch_total_count_and_comments(
-        "pullRequests", token, owner, repo, 90
+    pr_total, pr_counts = fetch_comment_windows(
+        "pullRequests", token, owner, repo, [None, 90]
     )
-    print(f"PRs:{pr_total},PR Comments:{pr_comments}")
+    print(f"PRs:{pr_total},PR Comments:{pr_counts[None][1]},近90天:{pr_counts[90][1]}")
 
-    print(f"Issues:{issue_total},Issue Comments:{issue_comments}")
-    print(f"PRs:{pr_total},PR Comments:{pr_comments}")
-    print(f"所有评论总数: {issue_comments + pr_comments}")
+    print(f"所有评论总数: {issue_counts[None][1] + pr_counts[None][1]}")
@@ -1,127 +1,81 @@
 from datetime import datetime, timedelta, timezone
-import json
-import os
 import subprocess
-import tempfile
-import time
 
-
-def clone_repo(owner, repo):
+from utils.git_mirror import ensure_mirror
+
+
+def fetch_commit_stats(owner, repo, windows=(90,), fetch=True):
+    """
+    在本地镜像（只需提交元数据，使用blobless镜像）上单次流式遍历 git log，同时计算多个时间窗口的
+    commit数、贡献者数、新贡献者数和留存贡献者数；镜像只在第一次时克隆，之后增量fetch
+    windows: 近期窗口的天数列表
+    返回 {
+        "commits": {None: 总数, days: 近期数},
+        "contributors": {None: 总数, days: 近期数},
+        "new contributors": {days: 近期才开始贡献的人数},
+        "retention contributors": {days: 近期之前和近期都有贡献的人数},
+        "contributors before": {days: 近期之前有贡献的人数},
+    }
+    """
     repo_url = f"git@github.com:{owner}/{repo}.git"
-    with tempfile.TemporaryDirectory() as tmpdir:
-        target_dir = os.path.join(tmpdir, f"{owner}_{repo}")
-        subprocess.run(["git", "clone", repo_url, target_dir], check=True)
-
-        # 构造 git log 命令
-        cmd = [
-            "git",
-            "log",
-            "--pretty=format:%H|%ad|%an|%cn|%f",
-            "--date=iso",
-        ]
-
-        # 执行命令，指定 UTF-8 编码，忽略非法字符
-        result = subprocess.run(
-            cmd,
-            cwd=target_dir,
-            capture_output=True,
-            text=True,
-            encoding="utf-8",
-            errors="ignore",
-            check=True,
-        )
-
-        # 解析输出并构建 JSON
-        commits = []
-        for line in result.stdout.splitlines():
-            sha, created_at, author, committer, message = line.split("|", 4)
-            commits.append(
-                {
-                    "repo": f"{owner}/{repo}",
-                    "sha": sha,
-                    "created_at": created_at,
-                    "author": author,
-                    "committer": committer,
-                    "message": message,
-                }
-            )
-
-        # 保存到文件
-        file_name = f"./commit_jsons/{owner}/{repo}_commits.json"
-        os.makedirs(os.path.dirname(file_name), exist_ok=True)
-        with open(file_name, "w", encoding="utf-8") as f:
-            json.dump(commits, f, ensure_ascii=False, indent=2)
-
-
-def fetch_commit_count(owner, repo, days=None):
-
-    file_name = f"./commit_jsons/{owner}/{repo}_commits.json"
-    with open(file_name, "r", encoding="utf-8") as f:
-        commits = json.load(f)
-
-    if days:
-        date_since = datetime.now(timezone.utc) - timedelta(days=days)
-
-        recent_commits = [
-            c
-            for c in commits
-            if datetime.strptime(c["created_at"], "%Y-%m-%d %H:%M:%S %z") >= date_since
-        ]
-        return len(recent_commits)
-
-    else:
-        return len(commits)
-
-
-def fetch_total_contributors(owner, repo, days=None):
-    file_name = f"./commit_jsons/{owner}/{repo}_commits.json"
-    with open(file_name, "r", encoding="utf-8") as f:
-        commits = json.load(f)
-        all_authors = set()
-        recent_authors = set()
-    if days:
-        date_since = datetime.now(timezone.utc) - timedelta(days=days)
-    else:
-        date_since = None
-
-    for c in commits:
-        author = c["author"]
-        all_authors.add(author)
-        created_at = datetime.strptime(c["created_at"], "%Y-%m-%d %H:%M:%S %z")
-        if created_at >= date_since:
-            recent_authors.add(author)
-
-    return len(all_authors), len(recent_authors)
-
-
-def fetch_active_contributor(owner, repo, days):
-    file_name = f"./commit_jsons/{owner}/{repo}_commits.json"
-    date_since = datetime.now(timezone.utc) - timedelta(days=days)
-    with open(file_name, "r", encoding="utf-8") as f:
-        commits = json.load(f)
-
-    all_authors_before = set()
-    all_authors_recent = set()
-
-    for c in commits:
-        author = c["author"]
-        created_at = datetime.fromisoformat(c["created_at"].replace(" +0000", "+00:00"))
-
-        if created_at >= date_since:
-            all_authors_recent.add(author)
-        else:
-            all_authors_before.add(author)
-
-    # 近三个月才开始贡献的人
-    new_contributors = all_authors_recent - all_authors_before
-
-    # 三个月前做过贡献，但近三个月没有贡献的人
-    # inactive_contributors = all_authors_before - all_authors_recent
-
-    # 持续在贡献的人
-    retention_contributors = all_authors_before & all_authors_recent
-
-    return len(new_contributors), len(retention_contributors), len(all_authors_before)
+    git_dir = ensure_mirror(f"{owner}/{repo}", partial=True, url=repo_url, fetch=fetch)
+
+    now = datetime.now(timezone.utc).timestamp()
+    window_since = [now - timedelta(days=days).total_seconds() for days in windows]
+
+    total_commits = 0
+    recent_commits = [0] * len(windows)
+    first_commit = {}  # author -> 最早的commit时间戳
+    last_commit = {}  # author -> 最近的commit时间戳
+
+    # %at为unix时间戳，无需逐条解析日期
+    cmd = ["git", "log", "--format=%at %an", "HEAD"]
+    with subprocess.Popen(
+        cmd,
+        cwd=git_dir,
+        stdout=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="ignore",
+    ) as proc:
+        for line in proc.stdout:
+            timestamp, _, author = line.rstrip("\n").partition(" ")
+            timestamp = int(timestamp)
+            total_commits += 1
+            for i, since in enumerate(window_since):
+                if timestamp >= since:
+                    recent_commits[i] += 1
+            if timestamp < first_commit.get(author, timestamp + 1):
+                first_commit[author] = timestamp
+            if timestamp > last_commit.get(author, timestamp - 1):
+                last_commit[author] = timestamp
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+    stats = {
+        "commits": {None: total_commits},
+        "contributors": {None: len(first_commit)},
+        "new contributors": {},
+        "retention contributors": {},
+        "contributors before": {},
+    }
+    for i, days in enumerate(windows):
+        since = window_since[i]
+        recent, new, before = 0, 0, 0
+        for author, first in first_commit.items():
+            if last_commit[author] >= since:
+                recent += 1
+                if first >= since:
+                    new += 1
+            if first < since:
+                before += 1
+        stats["commits"][days] = recent_commits[i]
+        stats["contributors"][days] = recent
+        stats["new contributors"][days] = new
+        # 近期之前做过贡献，且近期仍在贡献的人
+        stats["retention contributors"][days] = recent - new
+        stats["contributors before"][days] = before
+    return stats
 
 
 if __name__ == "__main__":
@@ -133,11 +87,7 @@ if __name__ == "__main__":
     owner = os.getenv("GITHUB_OWNER")
     repo = os.getenv("GITHUB_REPO")
 
-    clone_repo(owner, repo)
-    total = fetch_commit_count(owner, repo)
-    recent = fetch_commit_count(owner, repo, 90)
-
-    print(f"总commit:{total},近期commit:{recent}")
-
-    total, recent = fetch_total_contributors(owner, repo, 90)
-    print(f"总contributors:{total},近期contributors:{recent}")
+    stats = fetch_commit_stats(owner, repo, [30, 90])
+    for days in (30, 90):
+        print(f"总commit:{stats['commits'][None]},近{days}天commit:{stats['commits'][days]}")
+        print(f"总contributors:{stats['contributors'][None]},近{days}天contributors:{stats['contributors'][days]}")
@@ -48,5 +48,5 @@ if __name__ == "__main__":
     owner = os.getenv("GITHUB_OWNER")
     repo = os.getenv("GITHUB_REPO")
     token = os.getenv("GITHUB_TOKEN")
-    total = fetch_total_core_contributors(token, owner)
+    total = fetch_total_core_contributors(owner)
     print(f"Core contributors:{total}")
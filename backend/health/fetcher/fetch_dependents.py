@@ -1,12 +1,48 @@
 import os
 import re
-import tempfile
 
 from bs4 import BeautifulSoup
 import requests
 
+# 请求超时时间（秒）
+DEPENDENTS_TIMEOUT = 10
+# 设置后从该目录读取 {owner}_{repo}.html，不请求GitHub，用于离线测试和基准测试
+FIXTURE_DIR = os.getenv("DEPENDENTS_HTML_FIXTURE_DIR")
+
+REPOSITORIES_PATTERN = re.compile(r"([\d,]+)\s+Repositories")
+PACKAGES_PATTERN = re.compile(r"([\d,]+)\s+Packages")
+
+
+def parse_dependents_html(html):
+    """
+    从 network/dependents 页面中解析被依赖的仓库数和包数
+    """
+    soup = BeautifulSoup(html, "lxml")
+    counts = {}
+
+    for a in soup.select("a.btn-link"):
+        try:
+            text = a.get_text(" ", strip=True)
+            # Repositories 数量
+            m_repo = REPOSITORIES_PATTERN.search(text)
+            if m_repo:
+                counts["repositories"] = int(m_repo.group(1).replace(",", ""))
+            # Packages 数量
+            m_pkg = PACKAGES_PATTERN.search(text)
+            if m_pkg:
+                counts["packages"] = int(m_pkg.group(1).replace(",", ""))
+        except Exception as e:
+            print(f"解析时出错: {e}")
+            continue
+
+    return counts
+
+
+def fetch_dependents_from_html(owner, repo, timeout=DEPENDENTS_TIMEOUT):
+    if FIXTURE_DIR:
+        with open(os.path.join(FIXTURE_DIR, f"{owner}_{repo}.html"), "r", encoding="utf-8") as f:
+            return parse_dependents_html(f.read())
 
-def fetch_dependents_from_html(owner, repo):
     url = f"https://github.com/{owner}/{repo}/network/dependents"
     headers = {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -15,43 +51,29 @@ def fetch_dependents_from_html(owner, repo):
     }
 
     # 请求页面
-    r = requests.get(url, headers=headers)
+    r = requests.get(url, headers=headers, timeout=timeout)
     if r.status_code != 200:
         raise Exception(f"请求失败: {r.status_code}")
 
-    # 保存 HTML
-    with tempfile.NamedTemporaryFile(
-        "w", encoding="utf-8", delete=True, suffix=".html"
-    ) as tmp_file:
-        tmp_file.write(r.text)
-        file_path = tmp_file.name
-        print(f"页面已保存到: {file_path}")
-
-        # 解析 HTML 提取数量
-        soup = BeautifulSoup(r.text, "lxml")
-        counts = {}
-
-        for a in soup.select("a.btn-link"):
-            try:
-                text = a.get_text(" ", strip=True)
-                # Repositories 数量
-                m_repo = re.search(r"([\d,]+)\s+Repositories", text)
-                if m_repo:
-                    counts["repositories"] = int(m_repo.group(1).replace(",", ""))
-                # Packages 数量
-                m_pkg = re.search(r"([\d,]+)\s+Packages", text)
-                if m_pkg:
-                    counts["packages"] = int(m_pkg.group(1).replace(",", ""))
-            except Exception as e:
-                print(f"解析时出错: {e}")
-                continue
-
-        return counts
+    return parse_dependents_html(r.text)
 
 
 if __name__ == "__main__":
+    import sys
+    import time
+
     from dotenv import load_dotenv
 
+    # 传入本地HTML文件时只做解析的基准测试：python -m health.fetcher.fetch_dependents page.html
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r", encoding="utf-8") as f:
+            html = f.read()
+        start = time.time()
+        for _ in range(100):
+            counts = parse_dependents_html(html)
+        print(f"{counts}，平均解析耗时 {(time.time() - start) * 10:.2f} ms")
+        sys.exit()
+
     load_dotenv()
     owner = os.getenv("GITHUB_OWNER")
     repo = os.getenv("GITHUB_REPO")
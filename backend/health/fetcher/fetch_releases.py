@@ -1,3 +1,4 @@
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta, timezone
 from utils.manage_data_update_time import get_now_date
 from config import GITHUB_TOKEN
@@ -5,8 +6,31 @@ from config import GITHUB_TOKEN
 import requests
 
 
-def fetch_total_releases(owner, repo, days=None):
-    all_releases = []
+def to_timestamp(created_at):
+    return datetime.fromisoformat(created_at.replace("Z", "+00:00")).timestamp()
+
+
+def count_releases(timestamps, now, days=None):
+    """
+    timestamps: 按时间升序排列的 release 创建时间戳
+    二分查找统计截至 now 的 release 总数，以及近 days 天内的数量
+    """
+    total_count = bisect_right(timestamps, now.timestamp())
+    recent_count = 0
+    if days:
+        since = (now - timedelta(days=days)).timestamp()
+        recent_count = total_count - bisect_left(timestamps, since)
+    return total_count, recent_count
+
+
+def fetch_releases_since(owner, repo, since=None, page_state=None):
+    """
+    获取创建时间晚于 since 的 release（since 为空时获取全部）
+    接口按创建时间倒序返回，遇到不晚于 since 的 release 后停止翻页
+    page_state: 分页断点（health.checkpoint.PageState），传入时从上次中断的页继续
+    """
+    state = page_state.state if page_state else {}
+    releases = state.get("releases", [])
     headers = {
         "Accept": "application/vnd.github.v3+json",
         "Authorization": f"token {GITHUB_TOKEN}",
@@ -14,34 +38,46 @@ def fetch_total_releases(owner, repo, days=None):
     url = f"https://api.github.com/repos/{owner}/{repo}/releases"
     params = {
         "per_page": 100,
-        "page": 1,
+        "page": state.get("page", 1),
     }
+    since_ts = to_timestamp(since) if since else None
     while True:
-        r = requests.get(url, headers=headers, params=params)
+        r = requests.get(url, headers=headers, params=params, timeout=30)
         r.raise_for_status()
         data = r.json()
 
         if not data:
             break
-        
-        all_releases.extend(data)
-        params["page"] += 1
 
-    all_releases = [release for release in all_releases if datetime.fromisoformat(release["created_at"].replace("Z", "+00:00")) <= datetime.fromisoformat(get_now_date()).replace(tzinfo=timezone.utc)]
-    total_count = len(all_releases)
+        new_releases = [
+            {
+                "id": release["id"],
+                "tag_name": release["tag_name"],
+                "created_at": release["created_at"],
+                "published_at": release.get("published_at"),
+            }
+            for release in data
+            if since_ts is None or to_timestamp(release["created_at"]) > since_ts
+        ]
+        releases.extend(new_releases)
+        params["page"] += 1
+        if page_state:
+            page_state.save(page=params["page"], releases=releases)
+        if len(new_releases) < len(data):
+            break
 
-    recent_count = 0
+    return releases
 
-    if days:
-        since_date = datetime.fromisoformat(get_now_date()).replace(tzinfo=timezone.utc) - timedelta(days=days)
-        for release in all_releases:
-            created = datetime.fromisoformat(
-                release["created_at"].replace("Z", "+00:00")
-            )
-            if created >= since_date:
-                recent_count += 1
 
-    return total_count, recent_count
+def fetch_total_releases(owner, repo, days=None, page_state=None):
+    """
+    实时获取 release 数量（命令行健康度量使用，服务端使用 update_data 保存的快照）
+    page_state: 分页断点（health.checkpoint.PageState），传入时从上次中断的页继续
+    """
+    releases = fetch_releases_since(owner, repo, page_state=page_state)
+    timestamps = sorted(to_timestamp(release["created_at"]) for release in releases)
+    now = datetime.fromisoformat(get_now_date()).replace(tzinfo=timezone.utc)
+    return count_releases(timestamps, now, days)
 
 
 if __name__ == "__main__":
@@ -54,5 +90,5 @@ if __name__ == "__main__":
     owner = os.getenv("GITHUB_OWNER")
     repo = os.getenv("GITHUB_REPO")
     token = os.getenv("GITHUB_TOKEN")
-    total_count, recent_count = fetch_total_releases(token, owner, repo, 90)
+    total_count, recent_count = fetch_total_releases(owner, repo, 90)
     print(f"total_count:{total_count}, recent_count:{recent_count}")
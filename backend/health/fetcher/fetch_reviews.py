@@ -7,19 +7,20 @@ from tqdm import tqdm
 from urllib3.util.retry import Retry
 
 
-def fetch_total_reviews(token, owner, repo, days=None):
+def fetch_review_windows(token, owner, repo, windows=(None,), page_state=None):
     """
-    days: 统计这些天内的数据
+    单次分页同时统计多个时间窗口内的 PR 数量和 review 数
+    windows: 天数列表，None 表示全部时间；只统计近期窗口时，createdAt 早于最大窗口后提前结束分页
+    page_state: 分页断点（health.checkpoint.PageState），传入时从上次中断的页继续
+    返回 (PR totalCount, {window: (PR数量, review数)})
     """
 
     url = "https://api.github.com/graphql"
     headers = {"Authorization": f"Bearer {token}"}
 
-    if days:
-        date_since = datetime.now(timezone.utc) - timedelta(days=days)
-        since_iso = date_since.isoformat() + "Z"
-    else:
-        since_iso = None
+    now = datetime.now(timezone.utc)
+    window_since = [now - timedelta(days=days) if days else None for days in windows]
+    earliest = None if None in window_since else min(window_since)
 
     # 配置 Session + 重试
     session = requests.Session()
@@ -27,11 +28,13 @@ def fetch_total_reviews(token, owner, repo, days=None):
     adapter = HTTPAdapter(max_retries=retries)
     session.mount("https://", adapter)
 
-    total_pr_count = 0
-    reviews_count = 0
-    has_next_page = True
-    cursor = None
-    recent_pr_count = 0
+    state = page_state.state if page_state else {}
+    total_pr_count = state.get("total_pr_count", 0)
+    pr_counts = state.get("pr_counts", [0] * len(windows))
+    review_counts = state.get("review_counts", [0] * len(windows))
+    has_next_page = state.get("has_next_page", True)
+    cursor = state.get("cursor")
+    processed = state.get("processed", 0)
 
     pbar = tqdm(
         desc=f"Fetching PR Review",
@@ -39,10 +42,11 @@ def fetch_total_reviews(token, owner, repo, days=None):
         bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}]",
         dynamic_ncols=True,
     )
+    if total_pr_count:
+        pbar.total = total_pr_count
+        pbar.update(processed)
 
     while has_next_page:
-        # pr_filter = f', since: "{since_iso}"' if since_iso else ""
-
         query = f"""
         query ($owner: String!, $name: String!, $after: String) {{
           repository(owner: $owner, name: $name) {{
@@ -93,19 +97,43 @@ def fetch_total_reviews(token, owner, repo, days=None):
         has_next_page = page_info.get("hasNextPage", False)
 
         for pr in nodes:
-            if days:
-                created = datetime.fromisoformat(pr["createdAt"].replace("Z", "+00:00"))
-                if created < date_since:
-                    has_next_page = False
-                    break
-            recent_pr_count += 1
-            reviews_count += pr["reviews"]["totalCount"]
+            created = datetime.fromisoformat(pr["createdAt"].replace("Z", "+00:00"))
+            # 按创建时间倒序，早于所有窗口后不再需要后续的页
+            if earliest and created < earliest:
+                has_next_page = False
+                break
+            reviews = pr["reviews"]["totalCount"]
+            for i, since in enumerate(window_since):
+                if since is None or created >= since:
+                    pr_counts[i] += 1
+                    review_counts[i] += reviews
+            processed += 1
             pbar.update(1)
 
         cursor = page_info.get("endCursor", None)
+        if page_state:
+            page_state.save(
+                cursor=cursor,
+                has_next_page=has_next_page,
+                total_pr_count=total_pr_count,
+                pr_counts=pr_counts,
+                review_counts=review_counts,
+                processed=processed,
+            )
 
     pbar.close()
-    return recent_pr_count, reviews_count
+    return total_pr_count, {
+        days: (pr_counts[i], review_counts[i]) for i, days in enumerate(windows)
+    }
+
+
+def fetch_total_reviews(token, owner, repo, days=None, page_state=None):
+    """
+    days: 统计这些天内的数据
+    需要同时统计多个时间窗口时使用 fetch_review_windows，只分页一次
+    """
+    _, counts = fetch_review_windows(token, owner, repo, [days], page_state)
+    return counts[days]
 
 
 if __name__ == "__main__":
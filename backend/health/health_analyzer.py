@@ -1,13 +1,30 @@
 import datetime
 import json
+import os
 
 from utils.manage_data_update_time import get_now_date
-from health.fetcher.fetch_releases import fetch_total_releases
-from health.fetcher.fetch_dependents import fetch_dependents_from_html
+from utils.data_store import load_time_index, date_to_epoch, cached_by_mtime
+from utils.repo_catalog import load_repo_catalog
+from utils.actors import load_actor_table, load_human_event_table
+from health.fetcher.fetch_releases import count_releases, to_timestamp
 
 
 DATA_DIR = "data"
 
+def load_dependents() -> dict:
+    """
+    被依赖数快照，full_name -> {"repositories", "packages"}（按文件修改时间缓存）
+    """
+    path = f"{DATA_DIR}/paddle_dependents.json"
+    if not os.path.exists(path):
+        return {}
+
+    def build():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    return cached_by_mtime(path, "dependents", build)
+
 class HealthAnalyzer:
     """
     分析飞桨项目的健康度
@@ -16,20 +33,22 @@ class HealthAnalyzer:
         """
         初始化
         """
-        owner, name = repo.split("/")
-        # 检查repo是否在飞桨里
-        with open(f"{DATA_DIR}/paddle_repos.json", 'r', encoding='utf-8') as f:
-            paddle_repos = json.load(f)
-        repo_list = [r["full_name"] for r in paddle_repos]
-        if repo not in repo_list:
+        # 检查repo是否在飞桨里（仓库名不区分大小写）
+        catalog = load_repo_catalog()
+        full_name = catalog.resolve(repo)
+        if full_name is None:
             raise ValueError("目前仅支持分析PaddlePaddle和PFCCLab组织下的仓库，请检查仓库名是否正确")
+        owner, name = full_name.split("/")
         nowdate = get_now_date()
         nowdate = datetime.datetime.fromisoformat(nowdate).replace(tzinfo=datetime.timezone.utc)
 
+        self.catalog = catalog
+        self.full_name = full_name
         self.owner = owner
         self.repo_name = name
         self.dir = f"{owner}_{name}"
         self.days = days
+        self.nowdate = nowdate
         self.recent = nowdate - datetime.timedelta(days=days)
         self.scores = {
             "vigor": {
@@ -173,57 +192,53 @@ class HealthAnalyzer:
         分析健康度，返回健康度结果。
         """
 
-        # 读取本地数据
-        with open(f"{DATA_DIR}/paddle_issues/{self.dir}_issues.json", 'r', encoding='utf-8') as f:
-            issues = json.load(f)
-        with open(f"{DATA_DIR}/paddle_prs/{self.dir}_prs.json", 'r', encoding='utf-8') as f:
-            prs = json.load(f)
-        with open(f"{DATA_DIR}/paddle_commits/{self.dir}_commits.json", 'r', encoding='utf-8') as f:
-            commits = json.load(f)
+        # 读取本地数据（按创建时间排序的时间索引）
+        repo = self.full_name
+        issue_index = load_time_index("issues", repo)
+        pr_index = load_time_index("prs", repo)
+        commit_index = load_time_index("commits", repo)
+        issues, prs, commits = issue_index.records, pr_index.records, commit_index.records
+
+        # 按天比较：创建日期不早于近期起始日期，即时间戳不早于起始日期零点
+        recent_ts = date_to_epoch(self.recent.date())
+        recent_issue_list = issue_index.slice(recent_ts)
+        recent_pr_list = pr_index.slice(recent_ts)
+        recent_commit_list = commit_index.slice(recent_ts)
+
+        # 评论、review和贡献者都不计机器人
+        actors = load_actor_table()
 
         #  ---vigor---
         #  1)communication activity
         #    a)number of comments
-        total_issue_comments = sum(len(issue.get("comment_by", [])) for issue in issues)
-        total_pr_comments = sum(len(pr.get("comment_by", [])) for pr in prs)
-        self.scores["vigor"]["communication activity"]["number of comments"]["total"] = total_issue_comments + total_pr_comments
-        recent_issue_comments = 0
-        for issue in issues:
-            recent_issue_comments += sum(1 for comment in issue.get("comment_by", [])
-                if datetime.datetime.fromisoformat(comment[1][:10]).date() >= self.recent.date()
-            )
-        recent_pr_comments = 0
-        for pr in prs:
-            recent_pr_comments += sum(1 for comment in pr.get("comment_by", [])
-                if datetime.datetime.fromisoformat(comment[1][:10]).date() >= self.recent.date()
-            )
+        issue_comments = load_human_event_table("issues", repo, "comment_by")
+        pr_comments = load_human_event_table("prs", repo, "comment_by")
+        self.scores["vigor"]["communication activity"]["number of comments"]["total"] = issue_comments.total + pr_comments.total
+        recent_issue_comments = issue_comments.count(recent_ts)
+        recent_pr_comments = pr_comments.count(recent_ts)
         self.scores["vigor"]["communication activity"]["number of comments"]["recent"] = recent_issue_comments + recent_pr_comments
         #    b)number of issues
         total_issues = len(issues)
         self.scores["vigor"]["communication activity"]["number of issues"]["total"] = total_issues
-        recent_issues = sum(1 for issue in issues if datetime.datetime.fromisoformat(issue.get("created_at", "1970-01-01T00:00:00+00:00")[:10]).date() >= self.recent.date())
+        recent_issues = len(recent_issue_list)
         self.scores["vigor"]["communication activity"]["number of issues"]["recent"] = recent_issues
 
         #  2)development activity
         #    a)core developer activity-number of core developer reviews
-        total_reviews = sum(len(pr.get("review_by", [])) for pr in prs)
-        self.scores["vigor"]["development activity"]["core developer activity"]["number of core developer reviews"]["total"] = total_reviews
-        recent_reviews = 0
-        for pr in prs:
-            recent_reviews += sum(1 for review in pr.get("review_by", [])
-                if datetime.datetime.fromisoformat(review[1][:10]).date() >= self.recent.date()
-            )
+        pr_reviews = load_human_event_table("prs", repo, "review_by")
+        self.scores["vigor"]["development activity"]["core developer activity"]["number of core developer reviews"]["total"] = pr_reviews.total
+        recent_reviews = pr_reviews.count(recent_ts)
         self.scores["vigor"]["development activity"]["core developer activity"]["number of core developer reviews"]["recent"] = recent_reviews
         #    b)overall development activity
         #       i)number of pull requests
         total_prs = len(prs)
         self.scores["vigor"]["development activity"]["overall development activity"]["number of pull requests"]["total"] = total_prs
-        recent_prs = sum(1 for pr in prs if datetime.datetime.fromisoformat(pr.get("created_at", "1970-01-01T00:00:00+00:00")[:10]).date() >= self.recent.date())
+        recent_prs = len(recent_pr_list)
         self.scores["vigor"]["development activity"]["overall development activity"]["number of pull requests"]["recent"] = recent_prs
         #       ii)number of commits
         total_commits = len(commits)
         self.scores["vigor"]["development activity"]["overall development activity"]["number of commits"]["total"] = total_commits
-        recent_commits = sum(1 for commit in commits if datetime.datetime.fromisoformat(commit.get("created_at", "1970-01-01T00:00:00+00:00")[:10]).date() >= self.recent.date())
+        recent_commits = len(recent_commit_list)
         self.scores["vigor"]["development activity"]["overall development activity"]["number of commits"]["recent"] = recent_commits
         #       iii)requirement completion ratio
         requirement_issues = [
@@ -235,30 +250,36 @@ class HealthAnalyzer:
         self.scores["vigor"]["development activity"]["overall development activity"]["requirement completion ratio"]["number of requirement issues"]["total"] = total_requirement_issues
         self.scores["vigor"]["development activity"]["overall development activity"]["requirement completion ratio"]["number of requirement issues closed"]["total"] = total_closed_requirement_issues
         self.scores["vigor"]["development activity"]["overall development activity"]["requirement completion ratio"]["ratio"]["total"] = total_closed_requirement_issues / total_requirement_issues if total_requirement_issues > 0 else 0
-        recent_requirement_issues = sum(1 for issue in requirement_issues if datetime.datetime.fromisoformat(issue.get("created_at", "1970-01-01T00:00:00+00:00")[:10]).date() >= self.recent.date())
-        recent_closed_requirement_issues = sum(1 for issue in requirement_issues if issue.get("state", "") == "closed" and datetime.datetime.fromisoformat(issue.get("created_at", "1970-01-01T00:00:00+00:00")[:10]).date() >= self.recent.date())
+        recent_requirement_list = [
+            issue for issue in recent_issue_list
+            if any("feat" in label for label in issue.get("labels", []))
+        ]
+        recent_requirement_issues = len(recent_requirement_list)
+        recent_closed_requirement_issues = sum(1 for issue in recent_requirement_list if issue.get("state", "") == "closed")
         self.scores["vigor"]["development activity"]["overall development activity"]["requirement completion ratio"]["number of requirement issues"]["recent"] = recent_requirement_issues
         self.scores["vigor"]["development activity"]["overall development activity"]["requirement completion ratio"]["number of requirement issues closed"]["recent"] = recent_closed_requirement_issues
         self.scores["vigor"]["development activity"]["overall development activity"]["requirement completion ratio"]["ratio"]["recent"] = recent_closed_requirement_issues / recent_requirement_issues if recent_requirement_issues > 0 else 0
 
         #  3)release activity
-        total_release_count, recent_release_count = fetch_total_releases(self.owner, self.repo_name, self.days)
+        # release由 update_data 增量保存，按时间升序，二分查找计数
+        release_timestamps = []
+        releases_path = self.catalog.path(repo, "releases")
+        if os.path.exists(releases_path):
+            with open(releases_path, 'r', encoding='utf-8') as f:
+                release_timestamps = [to_timestamp(release["created_at"]) for release in json.load(f)]
+        total_release_count, recent_release_count = count_releases(release_timestamps, self.nowdate, self.days)
         self.scores["vigor"]["release activity"]["number of releases"]["total"] = total_release_count
         self.scores["vigor"]["release activity"]["number of releases"]["recent"] = recent_release_count
 
         #  ---organization---
         #  1)size
         #    a)number of contributors
-        all_contributors = set(commit["author"] for commit in commits)
+        all_contributors = actors.humans(commit["author"] for commit in commits)
         self.scores["organization"]["size"]["number of contributors"]["total"] = len(all_contributors)
-        recent_contributors = set(commit["author"] for commit in commits
-            if datetime.datetime.fromisoformat(commit.get("created_at", "1970-01-01T00:00:00+00:00")[:10]).date() >= self.recent.date()
-        )
+        recent_contributors = actors.humans(commit["author"] for commit in recent_commit_list)
         self.scores["organization"]["size"]["number of contributors"]["recent"] = len(recent_contributors)
         #    b)number of core contributors
-        core_contributors = set(commit["committer"] for commit in commits)
-        core_contributors.discard("web-flow")
-        core_contributors.discard("GitHub")
+        core_contributors = actors.humans(commit["committer"] for commit in commits)
         self.scores["organization"]["size"]["number of core contributors"] = len(core_contributors)
 
         #  2)diversity
@@ -267,7 +288,7 @@ class HealthAnalyzer:
         self.scores["organization"]["diversity"]["experience"]["acceptence rate of pull requests"]["number of merged pull requests"]["total"] = total_merged_prs
         self.scores["organization"]["diversity"]["experience"]["acceptence rate of pull requests"]["number of pull requests"]["total"] = total_prs
         self.scores["organization"]["diversity"]["experience"]["acceptence rate of pull requests"]["ratio"]["total"] = total_merged_prs / total_prs if total_prs > 0 else 0
-        recent_merged_prs = sum(1 for pr in prs if pr.get("merged", False) == True and datetime.datetime.fromisoformat(pr.get("created_at", "1970-01-01T00:00:00+00:00")[:10]).date() >= self.recent.date())
+        recent_merged_prs = sum(1 for pr in recent_pr_list if pr.get("merged", False) == True)
         self.scores["organization"]["diversity"]["experience"]["acceptence rate of pull requests"]["number of merged pull requests"]["recent"] = recent_merged_prs
         self.scores["organization"]["diversity"]["experience"]["acceptence rate of pull requests"]["number of pull requests"]["recent"] = recent_prs
         self.scores["organization"]["diversity"]["experience"]["acceptence rate of pull requests"]["ratio"]["recent"] = recent_merged_prs / recent_prs if recent_prs > 0 else 0
@@ -276,16 +297,15 @@ class HealthAnalyzer:
         self.scores["organization"]["diversity"]["experience"]["close rate of issues"]["number of issues closed"]["total"] = total_closed_issues
         self.scores["organization"]["diversity"]["experience"]["close rate of issues"]["number of issues"]["total"] = total_issues
         self.scores["organization"]["diversity"]["experience"]["close rate of issues"]["ratio"]["total"] = total_closed_issues / total_issues if total_issues > 0 else 0
-        recent_closed_issues = sum(1 for issue in issues if issue.get("state", "") == "closed" and datetime.datetime.fromisoformat(issue.get("created_at", "1970-01-01T00:00:00+00:00")[:10]).date() >= self.recent.date())
+        recent_closed_issues = sum(1 for issue in recent_issue_list if issue.get("state", "") == "closed")
         self.scores["organization"]["diversity"]["experience"]["close rate of issues"]["number of issues closed"]["recent"] = recent_closed_issues
         self.scores["organization"]["diversity"]["experience"]["close rate of issues"]["number of issues"]["recent"] = recent_issues
         self.scores["organization"]["diversity"]["experience"]["close rate of issues"]["ratio"]["recent"] = recent_closed_issues / recent_issues if recent_issues > 0 else 0
 
         #  ---resilience---
         #  1)attraction
-        previous_contributors = set(commit["author"] for commit in commits
-            if datetime.datetime.fromisoformat(commit.get("created_at", "1970-01-01T00:00:00+00:00")[:10]).date() < self.recent.date()
-        )
+        previous_contributors = actors.humans(commit["author"] for commit in commit_index.slice(end=recent_ts))
+        previous_contributors.update(actors.humans(commit["author"] for commit in commit_index.untimed))
         new_contributors = recent_contributors - previous_contributors
         self.scores["resilience"]["attraction"]["new contributor rate"]["number of new contributors"] = len(new_contributors)
         self.scores["resilience"]["attraction"]["new contributor rate"]["number of contributors"] = len(recent_contributors)
@@ -298,16 +318,18 @@ class HealthAnalyzer:
 
         #  ---services---
         #  value-popularity
-        with open(f"{DATA_DIR}/paddle_repos.json", 'r', encoding='utf-8') as f:
-            paddle_repos = json.load(f)
-        repo_info = next((r for r in paddle_repos if r["full_name"] == f"{self.owner}/{self.repo_name}"), None)
+        repo_info = self.catalog.get(repo)
         if repo_info:
             self.scores["services"]["value"]["popularity"]["stars"] = repo_info.get("stargazers_count", 0)
             self.scores["services"]["value"]["popularity"]["forks"] = repo_info.get("forks_count", 0)
             self.scores["services"]["value"]["popularity"]["watches"] = repo_info.get("watchers_count", 0)
 
-        total_dependents_count = fetch_dependents_from_html(self.owner, self.repo_name)
-        self.scores["services"]["value"]["popularity"]["dependents"] = total_dependents_count
+        # 被依赖数由 update_data 按有效期抓取，请求时只读快照
+        dependents = load_dependents().get(repo, {})
+        self.scores["services"]["value"]["popularity"]["dependents"] = {
+            "repositories": dependents.get("repositories", 0),
+            "packages": dependents.get("packages", 0),
+        }
 
         return {
             "date": get_now_date(),
@@ -0,0 +1,362 @@
+import datetime
+import json
+import os
+from itertools import accumulate
+from typing import Iterable, Optional
+
+from utils.manage_data_update_time import get_now_date
+from utils.data_store import EventTable, cached_by_mtime, dataset_path, load_time_index
+from utils.actors import ActorTable, load_actor_table, load_human_event_table
+from utils.repo_catalog import load_repo_catalog
+from health.fetcher.fetch_releases import to_timestamp
+from health.health_table import HEALTH_DAYS, METRIC_SEP
+
+DAY_SECONDS = 24 * 3600
+SERIES_FREQS = ("week", "month")
+MAX_POINTS = 1000
+
+def epoch_day(ts: int) -> int:
+    return ts // DAY_SECONDS
+
+def date_to_day(d: datetime.date) -> int:
+    return (d - datetime.date(1970, 1, 1)).days
+
+class DailyCounter:
+    """
+    按天（UTC epoch 日）聚合的事件数及其前缀和，任意日期区间的事件数 O(1) 得到
+    untimed 为没有时间的事件数，只计入 total
+    """
+    def __init__(self, days: Iterable[int], untimed: int = 0):
+        days = list(days)
+        self.untimed = untimed
+        self.first = min(days) if days else 0
+        counts = [0] * ((max(days) - self.first + 1) if days else 0)
+        for day in days:
+            counts[day - self.first] += 1
+        self.prefix = [0] + list(accumulate(counts))
+
+    def before(self, day: int) -> int:
+        """
+        day 之前（不含）的事件数
+        """
+        return self.prefix[min(max(day - self.first, 0), len(self.prefix) - 1)]
+
+    def count(self, start: int, end: int) -> int:
+        """
+        [start, end) 内的事件数
+        """
+        return max(self.before(end) - self.before(start), 0)
+
+    def after(self, day: int) -> int:
+        """
+        day 及之后的事件数（不设上界）
+        """
+        return self.prefix[-1] - self.before(day)
+
+    @property
+    def total(self) -> int:
+        """
+        所有事件数，包含没有时间的事件
+        """
+        return self.prefix[-1] + self.untimed
+
+class WindowDistinct:
+    """
+    固定长度 window 天的滑动窗口 [d - window, d) 内的不同用户数，对所有 d 预先计算
+    每个用户的每个活跃日 day（上一个活跃日为 prev）恰好使 d ∈ (max(day, prev + window), day + window] 的窗口多一个人，
+    用差分数组累加后前缀和即得
+    """
+    def __init__(self, user_days: dict[str, list[int]], window: int):
+        all_days = [day for days in user_days.values() for day in days]
+        self.first = min(all_days) if all_days else 0
+        size = (max(all_days) - self.first + window + 2) if all_days else 1
+        diff = [0] * (size + 1)
+        for days in user_days.values():
+            prev = None
+            for day in days:
+                lo = day + 1 if prev is None else max(day, prev + window) + 1
+                hi = day + window + 1
+                if lo < hi:
+                    diff[lo - self.first] += 1
+                    diff[hi - self.first] -= 1
+                prev = day
+        self.values = list(accumulate(diff))
+
+    def at(self, day: int) -> int:
+        i = day - self.first
+        return self.values[i] if 0 <= i < len(self.values) else 0
+
+class CommitSeries:
+    """
+    commit数据集的日计数：commit数、作者/核心贡献者（不含机器人）的首次出现日、作者活跃日，
+    以及不设上界时（快照日期）所需的作者最后活跃日和没有时间的commit的作者
+    """
+    def __init__(self, commits: list[dict], actors: ActorTable):
+        self.commits = record_counter(commits)
+        author_days = {}
+        committer_first = {}
+        untimed_authors = set()
+        committers = set()
+        for commit in commits:
+            committer = commit.get("committer")
+            if not actors.is_bot(committer):
+                committers.add(committer)
+            if commit.get("created_ts") is None:
+                if not actors.is_bot(commit["author"]):
+                    untimed_authors.add(commit["author"])
+                continue
+            day = epoch_day(commit["created_ts"])
+            if not actors.is_bot(commit["author"]):
+                author_days.setdefault(commit["author"], []).append(day)
+            if not actors.is_bot(committer) and committer not in committer_first:
+                committer_first[committer] = day
+        # 记录按时间升序，活跃日去重后仍有序
+        self.author_days = {author: list(dict.fromkeys(days)) for author, days in author_days.items()}
+        self.contributor_first = DailyCounter(days[0] for days in self.author_days.values())
+        self.core_first = DailyCounter(committer_first.values())
+        self.core_total = len(committers)
+        # 没有时间的commit的作者总是计为此前的贡献者，其余作者按首次commit日统计新人
+        self.untimed_authors = len(untimed_authors)
+        self.fresh_first = DailyCounter(
+            days[0] for author, days in self.author_days.items() if author not in untimed_authors
+        )
+        self.author_last = DailyCounter(days[-1] for days in self.author_days.values())
+        self.windows = {}
+
+    def recent_contributors(self, window: int) -> WindowDistinct:
+        if window not in self.windows:
+            self.windows[window] = WindowDistinct(self.author_days, window)
+        return self.windows[window]
+
+def record_counter(records: list[dict], predicate=None) -> DailyCounter:
+    selected = [r for r in records if predicate is None or predicate(r)]
+    days = [epoch_day(r["created_ts"]) for r in selected if r.get("created_ts") is not None]
+    return DailyCounter(days, untimed=len(selected) - len(days))
+
+def event_counter(table: EventTable) -> DailyCounter:
+    return DailyCounter((epoch_day(ts) for ts in table.ts), untimed=table.total - len(table.ts))
+
+def is_requirement(issue: dict) -> bool:
+    return any("feat" in label for label in issue.get("labels", []))
+
+def is_closed(issue: dict) -> bool:
+    return issue.get("state", "") == "closed"
+
+def series_cache_name(actors: ActorTable) -> str:
+    # 评论/review和贡献者不计机器人，行为者分类表更新后重新构建
+    return f"daily_series:{actors.version}"
+
+def load_issue_series(repo: str) -> dict:
+    def build():
+        issues = load_time_index("issues", repo).records
+        return {
+            "issues": record_counter(issues),
+            "closed issues": record_counter(issues, is_closed),
+            "requirement issues": record_counter(issues, is_requirement),
+            "closed requirement issues": record_counter(issues, lambda i: is_requirement(i) and is_closed(i)),
+            "comments": event_counter(load_human_event_table("issues", repo, "comment_by")),
+        }
+    return cached_by_mtime(dataset_path("issues", repo), series_cache_name(load_actor_table()), build)
+
+def load_pr_series(repo: str) -> dict:
+    def build():
+        prs = load_time_index("prs", repo).records
+        return {
+            "prs": record_counter(prs),
+            "merged prs": record_counter(prs, lambda pr: pr.get("merged", False) == True),
+            "comments": event_counter(load_human_event_table("prs", repo, "comment_by")),
+            "reviews": event_counter(load_human_event_table("prs", repo, "review_by")),
+        }
+    return cached_by_mtime(dataset_path("prs", repo), series_cache_name(load_actor_table()), build)
+
+def load_commit_series(repo: str) -> CommitSeries:
+    actors = load_actor_table()
+    return cached_by_mtime(
+        dataset_path("commits", repo),
+        series_cache_name(actors),
+        lambda: CommitSeries(load_time_index("commits", repo).records, actors),
+    )
+
+def load_release_series(path: str) -> DailyCounter:
+    if not os.path.exists(path):
+        return DailyCounter([])
+
+    def build():
+        with open(path, 'r', encoding='utf-8') as f:
+            return DailyCounter(epoch_day(int(to_timestamp(release["created_at"]))) for release in json.load(f))
+
+    return cached_by_mtime(path, "daily_series", build)
+
+def series_dates(freq: str, start: datetime.date, end: datetime.date) -> list[datetime.date]:
+    """
+    时间序列的各个取值日期（截至当天零点）：week 为从 end 向前每7天，month 为每月1日，最后一个点为 end
+    """
+    if freq not in SERIES_FREQS:
+        raise ValueError(f"freq 只能为 {', '.join(SERIES_FREQS)}")
+    if start > end:
+        raise ValueError("开始日期不能晚于结束日期")
+    dates = []
+    if freq == "week":
+        d = end
+        while d >= start:
+            dates.append(d)
+            d -= datetime.timedelta(days=7)
+        dates.reverse()
+    else:
+        d = datetime.date(start.year, start.month, 1)
+        if d < start:
+            d = datetime.date(d.year + d.month // 12, d.month % 12 + 1, 1)
+        while d < end:
+            dates.append(d)
+            d = datetime.date(d.year + d.month // 12, d.month % 12 + 1, 1)
+        dates.append(end)
+    if len(dates) > MAX_POINTS:
+        raise ValueError(f"时间序列最多 {MAX_POINTS} 个点，请缩小日期范围")
+    return dates
+
+def ratio(a: int, b: int) -> float:
+    return a / b if b > 0 else 0
+
+def health_series(
+    repo: str,
+    freq: str = "month",
+    days: int = HEALTH_DAYS,
+    start: Optional[datetime.date] = None,
+    end: Optional[datetime.date] = None,
+) -> dict:
+    """
+    仓库健康度指标的时间序列：每个取值日期 d 上，total 为 d 之前的累计值，recent 为 [d - days, d) 内的值（没有时间的记录不计入）；
+    不早于当前数据快照日期的点与 HealthAnalyzer 相同：不设上界（包含增量抓取得到的快照之后的评论等），
+    total 包含没有时间的记录。star 等只有当前快照的指标不包含
+    所有指标都由按天聚合的计数和前缀和得到，每个点 O(1)
+    """
+    catalog = load_repo_catalog()
+    full_name = catalog.resolve(repo)
+    if full_name is None:
+        raise ValueError("目前仅支持分析PaddlePaddle和PFCCLab组织下的仓库，请检查仓库名是否正确")
+    if days <= 0:
+        raise ValueError("days 必须为正数")
+    issues = load_issue_series(full_name)
+    prs = load_pr_series(full_name)
+    commits = load_commit_series(full_name)
+    releases = load_release_series(catalog.path(full_name, "releases"))
+    recent_contributors = commits.recent_contributors(days)
+
+    snapshot_date = datetime.date.fromisoformat(get_now_date()[:10])
+    snapshot_day = date_to_day(snapshot_date)
+    if end is None:
+        end = snapshot_date
+    if start is None:
+        first_days = [c.first for c in (issues["issues"], prs["prs"], commits.commits) if len(c.prefix) > 1]
+        start = datetime.date(1970, 1, 1) + datetime.timedelta(days=min(first_days)) if first_days else end
+    dates = series_dates(freq, start, end)
+
+    def total_recent(counter, d):
+        if d >= snapshot_day:
+            return counter.total, counter.after(d - days)
+        return counter.before(d), counter.count(d - days, d)
+
+    # 指标路径与 health_table.flatten_scores 一致
+    paths = {
+        "comments": ("vigor", "communication activity", "number of comments"),
+        "issues": ("vigor", "communication activity", "number of issues"),
+        "reviews": ("vigor", "development activity", "core developer activity", "number of core developer reviews"),
+        "prs": ("vigor", "development activity", "overall development activity", "number of pull requests"),
+        "commits": ("vigor", "development activity", "overall development activity", "number of commits"),
+        "requirement": ("vigor", "development activity", "overall development activity", "requirement completion ratio"),
+        "releases": ("vigor", "release activity", "number of releases"),
+        "contributors": ("organization", "size", "number of contributors"),
+        "core": ("organization", "size", "number of core contributors"),
+        "acceptance": ("organization", "diversity", "experience", "acceptence rate of pull requests"),
+        "close": ("organization", "diversity", "experience", "close rate of issues"),
+        "attraction": ("resilience", "attraction", "new contributor rate"),
+        "retention": ("resilience", "retention", "contributor retention rate"),
+    }
+    metrics = {}
+
+    def put(key, *names_and_value):
+        *names, value = names_and_value
+        metrics.setdefault(METRIC_SEP.join(paths[key] + tuple(names)), []).append(value)
+
+    for date in dates:
+        d = date_to_day(date)
+        comments = [a + b for a, b in zip(total_recent(issues["comments"], d), total_recent(prs["comments"], d))]
+        issue_counts = total_recent(issues["issues"], d)
+        closed_issues = total_recent(issues["closed issues"], d)
+        requirement = total_recent(issues["requirement issues"], d)
+        closed_requirement = total_recent(issues["closed requirement issues"], d)
+        pr_counts = total_recent(prs["prs"], d)
+        merged_prs = total_recent(prs["merged prs"], d)
+        for i, span in enumerate(("total", "recent")):
+            put("comments", span, comments[i])
+            put("issues", span, issue_counts[i])
+            put("reviews", span, total_recent(prs["reviews"], d)[i])
+            put("prs", span, pr_counts[i])
+            put("commits", span, total_recent(commits.commits, d)[i])
+            put("requirement", "number of requirement issues closed", span, closed_requirement[i])
+            put("requirement", "number of requirement issues", span, requirement[i])
+            put("requirement", "ratio", span, ratio(closed_requirement[i], requirement[i]))
+            # release 与 HealthAnalyzer 一样截至 d（count_releases）
+            put("releases", span, (releases.before(d), releases.count(d - days, d))[i])
+            put("acceptance", "number of merged pull requests", span, merged_prs[i])
+            put("acceptance", "number of pull requests", span, pr_counts[i])
+            put("acceptance", "ratio", span, ratio(merged_prs[i], pr_counts[i]))
+            put("close", "number of issues closed", span, closed_issues[i])
+            put("close", "number of issues", span, issue_counts[i])
+            put("close", "ratio", span, ratio(closed_issues[i], issue_counts[i]))
+        # 贡献者：近期去重人数由滑动窗口预计算，新人为首次commit在窗口内的作者
+        if d >= snapshot_day:
+            # 不设上界：近期为最后活跃日不早于 d - days 的作者，没有时间的commit的作者计为此前的贡献者
+            recent = commits.author_last.after(d - days)
+            previous = commits.untimed_authors + commits.fresh_first.before(d - days)
+            new = commits.fresh_first.after(d - days)
+            total_contributors = commits.untimed_authors + commits.fresh_first.total
+            core = commits.core_total
+        else:
+            recent = recent_contributors.at(d)
+            previous = commits.contributor_first.before(d - days)
+            new = commits.contributor_first.count(d - days, d)
+            total_contributors = commits.contributor_first.before(d)
+            core = commits.core_first.before(d)
+        put("contributors", "total", total_contributors)
+        put("contributors", "recent", recent)
+        put("core", core)
+        put("attraction", "number of new contributors", new)
+        put("attraction", "number of contributors", recent)
+        put("attraction", "ratio", ratio(new, recent))
+        put("retention", "number of retention contributors", recent - new)
+        put("retention", "number of contributors before", previous)
+        put("retention", "ratio", ratio(recent - new, previous))
+
+    return {
+        "repo": full_name,
+        "date": get_now_date(),
+        "freq": freq,
+        "days": days,
+        "dates": [date.isoformat() for date in dates],
+        "metrics": metrics,
+    }
+
+if __name__ == "__main__":
+    # 时间序列与逐个日期运行 HealthAnalyzer 的耗时对比：python -m health.health_series
+    import time
+
+    repo = "PaddlePaddle/Paddle"
+    health_series(repo)  # 构建日计数
+    start = time.time()
+    result = health_series(repo, "week")
+    print(f"{repo}: {len(result['dates'])} 个点，{(time.time() - start) * 1000:.1f} ms")
+
+    # 快照日期的点（最后一个点）与 HealthAnalyzer 的结果一致，star 等只有当前快照的指标除外
+    from health.health_analyzer import HealthAnalyzer
+    from health.health_table import flatten_scores
+
+    popularity = METRIC_SEP.join(("services", "value", "popularity"))
+    expected = {
+        path: value
+        for path, value in flatten_scores(HealthAnalyzer(repo).analyze_health()["scores"]).items()
+        if not path.startswith(popularity)
+    }
+    last = {path: values[-1] for path, values in result["metrics"].items()}
+    assert last == expected, {path: (last.get(path), value) for path, value in expected.items() if last.get(path) != value}
+    print("快照日期的点与 HealthAnalyzer 一致")
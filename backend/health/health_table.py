@@ -0,0 +1,122 @@
+import json
+import logging
+import os
+from typing import Optional
+
+from utils.manage_data_update_time import get_now_date
+from utils.data_store import SnapshotNotBuilt, cached_by_mtime
+from utils.repo_catalog import load_repo_catalog
+from health.health_analyzer import DATA_DIR, HealthAnalyzer
+
+logger = logging.getLogger(__name__)
+
+# 每个数据快照一张全组织健康度表：{"date", "days", "repos": {full_name: scores}}
+HEALTH_TABLE_DIR = f"{DATA_DIR}/paddle_health"
+HEALTH_DAYS = 90
+# 指标路径的分隔符，如 "vigor.communication activity.number of issues.recent"
+METRIC_SEP = "."
+
+def health_table_path(snapshot_date: str, days: int = HEALTH_DAYS) -> str:
+    return f"{HEALTH_TABLE_DIR}/health_{snapshot_date}_{days}d.json"
+
+def build_health_table(days: int = HEALTH_DAYS) -> dict:
+    """
+    计算所有飞桨仓库的健康度，仓库信息和被依赖数只读取一次
+    单个仓库出错（如新加入的仓库还没有数据）时记录日志并跳过，查询该仓库时由 repo_health 实时计算
+    """
+    repos = {}
+    for repo in load_repo_catalog():
+        try:
+            repos[repo] = HealthAnalyzer(repo, days).analyze_health()["scores"]
+        except Exception as e:
+            logger.error(f"Error analyzing health for {repo}: {e}")
+    return {"date": get_now_date(), "days": days, "repos": repos}
+
+def save_health_table(table: dict) -> None:
+    path = health_table_path(table["date"], table["days"])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def load_health_table(days: int = HEALTH_DAYS) -> Optional[dict]:
+    """
+    当前数据快照的健康度表（按文件修改时间缓存，调用方不应修改），还没有生成时返回 None
+    """
+    path = health_table_path(get_now_date(), days)
+    if not os.path.exists(path):
+        return None
+
+    def build():
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    return cached_by_mtime(path, "health_table", build)
+
+def repo_health(repo: str, days: int = HEALTH_DAYS) -> dict:
+    """
+    单个仓库的健康度，优先从健康度表读取，表中没有时实时计算（仓库不在飞桨中时抛出 ValueError）
+    """
+    repo = load_repo_catalog().resolve(repo) or repo
+    table = load_health_table(days)
+    if table is not None and repo in table["repos"]:
+        return {"date": table["date"], "scores": table["repos"][repo]}
+    return HealthAnalyzer(repo, days).analyze_health()
+
+def flatten_scores(scores: dict, prefix: str = "") -> dict:
+    """
+    健康度指标树展开为 {指标路径: 数值}，只保留数值叶子
+    """
+    flat = {}
+    for key, value in scores.items():
+        path = f"{prefix}{METRIC_SEP}{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten_scores(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+def compare_repos(
+    repos: Optional[list[str]] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = True,
+    days: int = HEALTH_DAYS,
+) -> dict:
+    """
+    对比多个仓库（默认全部）的健康度指标，可按某个指标路径排序
+    健康度表由 update_all 或 python -m health.health_table 生成，还没有生成时抛出 SnapshotNotBuilt
+    """
+    table = load_health_table(days)
+    if table is None:
+        raise SnapshotNotBuilt(f"{get_now_date()} 的全组织健康度表还没有生成，请稍后再试")
+    all_scores = table["repos"]
+    if repos:
+        catalog = load_repo_catalog()
+        repos = [catalog.resolve(repo) or repo for repo in repos]
+        missing = [repo for repo in repos if repo not in all_scores]
+        if missing:
+            raise ValueError(f"目前仅支持分析PaddlePaddle和PFCCLab组织下的仓库，请检查仓库名是否正确：{', '.join(missing)}")
+    else:
+        repos = list(all_scores)
+
+    rows = [{"repo": repo, "values": flatten_scores(all_scores[repo])} for repo in repos]
+    metrics = list(rows[0]["values"]) if rows else []
+    if sort_by is not None:
+        if sort_by not in metrics:
+            raise ValueError(f"不支持按 {sort_by} 排序，可选指标：{', '.join(metrics)}")
+        rows.sort(key=lambda row: row["values"][sort_by], reverse=descending)
+    return {"date": table["date"], "days": table["days"], "sort_by": sort_by, "metrics": metrics, "repos": rows}
+
+if __name__ == "__main__":
+    # 生成当前数据快照的健康度表：python -m health.health_table
+    import time
+
+    start = time.time()
+    table = build_health_table()
+    save_health_table(table)
+    print(f"{len(table['repos'])} 个仓库的健康度表已生成，耗时 {time.time() - start:.1f} s")
+    start = time.time()
+    for _ in range(100):
+        result = compare_repos(sort_by="vigor.communication activity.number of issues.recent")
+    print(f"全组织对比查询：{(time.time() - start) * 10:.2f} ms/次")
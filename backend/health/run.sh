@@ -17,7 +17,7 @@ do
     echo "Parameters: ${owners[$i]} ${repos[$i]} ${labels[$i]}"
     echo "=============================="
     
-    python getdata.py "${owners[$i]}"/"${repos[$i]}" --days $days --label "${labels[$i]}"> logs/run_$((i+1)).log 2>&1
+    (cd .. && python -m health.main "${owners[$i]}"/"${repos[$i]}" --days $days --label "${labels[$i]}") > logs/run_$((i+1)).log 2>&1
 
 done
 
@@ -1,45 +1,42 @@
-import numpy as np
-import uuid
-import datetime
+import importlib
+import os
+import threading
+from contextlib import asynccontextmanager
 from datetime import date
-import pandas as pd
-import base64
 from typing import Optional
-import plotly.graph_objects as go
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from skills.developer_analyzer import DeveloperAnalyzer
-from health.health_analyzer import HealthAnalyzer
-from collaboration.governance_analyzer import GovernanceAnalyzer
-
-def clean_data(obj):
-    """
-    递归清理数据，确保所有数据类型都可以被JSON序列化
-    """
-    if isinstance(obj, go.Figure):
-        return clean_data(obj.to_dict()) # plotly图片先转dict，再处理dict中的每一项
-    elif isinstance(obj, bytes):
-        return base64.b64encode(obj).decode()
-    elif isinstance(obj, (np.integer, np.int32, np.int64, np.uint32, np.uint64)):
-        return int(obj)
-    elif isinstance(obj, (np.floating, np.float32, np.float64)):
-        return float(obj)
-    elif isinstance(obj, (np.ndarray,)):
-        return [clean_data(o) for o in obj.tolist()]
-    elif isinstance(obj, (pd.Timestamp, datetime.datetime)):
-        return obj.isoformat()
-    elif isinstance(obj, (pd.Timedelta, datetime.timedelta)):
-        return str(obj)
-    elif isinstance(obj, (dict,)):
-        return {clean_data(k): clean_data(v) for k, v in obj.items()}  # 处理dict中的每一项
-    elif isinstance(obj, (list, tuple, set)):  # 处理list/tuple/set中的每一项
-        return [clean_data(v) for v in obj]
-    else:
-        return obj
-
-app = FastAPI()
+import config  # noqa: F401  启动时即检查 GITHUB_TOKEN
+from skills.wordcloud_cache import wait_wordcloud
+from utils.data_store import SnapshotNotBuilt
+from utils.serialization import ORJSONResponse, dumps
+
+# 各接口的分析模块（及其依赖的 pandas、PyGithub 等）在首次请求时才导入，加快启动和 --reload
+# 设置 PADDLELENS_WARMUP=1 时在启动后由后台线程预先导入，首个请求不必等待
+# 启动导入耗时检查：python -m utils.import_time
+WARMUP_MODULES = (
+    "skills.developer_analyzer",
+    "skills.leaderboard",
+    "health.health_analyzer",
+    "health.health_table",
+    "health.health_series",
+    "collaboration.governance_analyzer",
+    "collaboration.governance_timeline",
+)
+
+def warm_up() -> None:
+    for module in WARMUP_MODULES:
+        importlib.import_module(module)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if os.environ.get("PADDLELENS_WARMUP") == "1":
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 
 # 设置跨域中间件
 app.add_middleware(
@@ -66,18 +63,103 @@ def ignore_favicon():
 # 程序员能力度量
 class UserAnalyzeRequest(BaseModel):
     github_user: str
+    chart_format: str = "spec"  # "spec"：图表规格，由前端组装；"figure"：完整的 plotly 图表
 
 @app.post("/dvpr_skills/")
 def analyze_skills(request_data: UserAnalyzeRequest) -> dict:
     """
     分析开发者技能，返回技能分析结果。
     """
+    from skills.developer_analyzer import DeveloperAnalyzer
+    from skills.profile_store import load_profile, save_profile
+    from utils.manage_data_update_time import get_now_date
+
     username = request_data.github_user
     try:
-        with DeveloperAnalyzer(username) as analyzer:
+        # 优先返回批量预计算的结果（图表规格格式），没有时按需计算并存入
+        if request_data.chart_format == "spec":
+            profile = load_profile(username)
+            if profile is not None:
+                return Response(content=profile, media_type="application/json")
+        data_date = get_now_date()
+        with DeveloperAnalyzer(username, request_data.chart_format) as analyzer:
             result = analyzer.analyze_skills()
-            result = clean_data(result)
-            return JSONResponse(content=result)
+        if request_data.chart_format == "spec":
+            profile = dumps(result)
+            save_profile(username, data_date, profile)
+            return Response(content=profile, media_type="application/json")
+        return ORJSONResponse(content=result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"服务器内部错误：{str(e)}")
+
+@app.get("/wordcloud/{key}.png")
+def wordcloud_image(key: str, request: Request):
+    """
+    领域词云图，按内容哈希缓存，内容不变因此可长期缓存
+    """
+    headers = {"ETag": f'"{key}"', "Cache-Control": "public, max-age=31536000, immutable"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    try:
+        path = wait_wordcloud(key)
+    except (ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"服务器内部错误：{str(e)}")
+    return FileResponse(path, media_type="image/png", headers=headers)
+
+# 开发者排名
+class LeaderboardRequest(BaseModel):
+    metric: str = "problem_solving"  # problem_solving / communication
+    repo: Optional[str] = None  # 指定仓库内的排名
+    domain: Optional[str] = None  # 指定领域内的排名
+    offset: int = 0
+    limit: int = 20
+    min_score: Optional[float] = None
+    max_score: Optional[float] = None
+
+@app.post("/leaderboard/")
+def leaderboard(request_data: LeaderboardRequest) -> dict:
+    """
+    分页返回指标排名，可按仓库或领域、分数区间筛选
+    """
+    from skills.leaderboard import load_leaderboard, scope_name
+
+    try:
+        scope = scope_name(request_data.repo, request_data.domain)
+        result = load_leaderboard().query(
+            request_data.metric, scope, request_data.offset, request_data.limit,
+            request_data.min_score, request_data.max_score,
+        )
+        return ORJSONResponse(content=result)
+    except SnapshotNotBuilt as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"服务器内部错误：{str(e)}")
+
+class UserRankRequest(BaseModel):
+    github_user: str
+    metric: str = "problem_solving"
+    repo: Optional[str] = None
+    domain: Optional[str] = None
+
+@app.post("/leaderboard/rank/")
+def leaderboard_rank(request_data: UserRankRequest) -> dict:
+    """
+    返回开发者在指标排名中的名次和百分位
+    """
+    from skills.leaderboard import load_leaderboard, scope_name
+
+    try:
+        scope = scope_name(request_data.repo, request_data.domain)
+        result = load_leaderboard().user_rank(request_data.metric, request_data.github_user, scope)
+        return ORJSONResponse(content=result)
+    except SnapshotNotBuilt as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -93,12 +175,42 @@ def governance_analysis(request_data: GovernanceAnalyzeRequest) -> dict:
     """
     展示项目治理度，返回治理度分析结果。
     """
+    from collaboration.governance_analyzer import GovernanceAnalyzer
+
     input_date = request_data.input_date
     try:
         analyzer = GovernanceAnalyzer(input_date=input_date)
         result = analyzer.analyze_governance()
-        result = clean_data(result)
-        return JSONResponse(content=result)
+        return ORJSONResponse(content=result)
+    except SnapshotNotBuilt as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"服务器内部错误：{str(e)}")
+
+class GovernanceTimelineRequest(BaseModel):
+    dates: Optional[list[date]] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    step_days: int = 7
+
+@app.post("/governance/timeline/")
+def governance_timeline(request_data: GovernanceTimelineRequest) -> dict:
+    """
+    一次返回多个日期前后的治理度指标：
+    指定 dates 时按给定日期；指定 start_date 和 end_date 时按 step_days 间隔的时间序列；都不指定时为所有规则的发布日期
+    """
+    from collaboration.governance_timeline import analyze_governance_timeline, date_series
+
+    dates = request_data.dates
+    try:
+        if not dates and request_data.start_date and request_data.end_date:
+            dates = date_series(request_data.start_date, request_data.end_date, request_data.step_days)
+        result = analyze_governance_timeline(dates)
+        return ORJSONResponse(content=result)
+    except SnapshotNotBuilt as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -113,12 +225,15 @@ def health_analysis(request_data: RepoAnalyzeRequest) -> dict:
     """
     分析项目健康度，返回健康度分析结果。
     """
+    from health.health_table import repo_health
+
     reponame = request_data.github_repo
     try:
-        analyzer = HealthAnalyzer(reponame)
-        result = analyzer.analyze_health()
-        result = clean_data(result)
-        return JSONResponse(content=result)
+        # 优先读取当前数据快照的全组织健康度表
+        result = repo_health(reponame)
+        return ORJSONResponse(content=result)
+    except SnapshotNotBuilt as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         # 捕获 ValueError 并返回 400 Bad Request
         raise HTTPException(status_code=400, detail=str(e))
@@ -127,6 +242,55 @@ def health_analysis(request_data: RepoAnalyzeRequest) -> dict:
         raise HTTPException(status_code=500, detail=f"服务器内部错误：{str(e)}")
 
 
+class HealthCompareRequest(BaseModel):
+    github_repos: Optional[list[str]] = None  # 为空时对比所有仓库
+    sort_by: Optional[str] = None  # 指标路径，如 "vigor.communication activity.number of issues.recent"
+    descending: bool = True
+
+@app.post("/health/compare/")
+def health_compare(request_data: HealthCompareRequest) -> dict:
+    """
+    一次返回多个仓库展开后的健康度指标，可按某个指标排序
+    """
+    from health.health_table import compare_repos
+
+    try:
+        result = compare_repos(request_data.github_repos, request_data.sort_by, request_data.descending)
+        return ORJSONResponse(content=result)
+    except SnapshotNotBuilt as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"服务器内部错误：{str(e)}")
+
+class HealthSeriesRequest(BaseModel):
+    github_repo: str
+    freq: str = "month"  # week / month
+    days: int = 90  # recent 指标的滑动窗口天数
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+@app.post("/health/series/")
+def health_series(request_data: HealthSeriesRequest) -> dict:
+    """
+    返回仓库健康度指标按周或按月的时间序列，每个指标为与 dates 对齐的数组
+    """
+    from health.health_series import health_series as build_series
+
+    try:
+        result = build_series(
+            request_data.github_repo, request_data.freq, request_data.days,
+            request_data.start_date, request_data.end_date,
+        )
+        return ORJSONResponse(content=result)
+    except SnapshotNotBuilt as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"服务器内部错误：{str(e)}")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,45 @@
+# 图表规格：{"data": [trace, ...], "layout": {...}}，trace 和 layout 的属性名与 plotly 一致，
+# 只包含数据和少量布局提示；layout["template"] 只保存模板名，由前端补全为模板对象后绘制
+
+# spec：返回图表规格（默认）；figure：返回完整的 plotly 图表（旧格式）
+CHART_FORMATS = ("spec", "figure")
+
+def chart(data: list[dict], **layout) -> dict:
+    return {"data": data, "layout": layout}
+
+def to_figure(spec: dict):
+    """
+    图表规格转为 plotly 图表，只在旧格式下使用
+    """
+    import plotly.graph_objects as go  # plotly校验开销较大，只在需要时导入
+
+    return go.Figure(spec)
+
+def convert_charts(result, chart_format: str):
+    """
+    按 chart_format 转换结果中所有 fig_ 开头的图表规格
+    """
+    if chart_format not in CHART_FORMATS:
+        raise ValueError(f"chart_format 只能为 {', '.join(CHART_FORMATS)}")
+    if chart_format == "spec":
+        return result
+    if isinstance(result, dict):
+        return {
+            key: to_figure(value) if key.startswith("fig_") and isinstance(value, dict) else convert_charts(value, chart_format)
+            for key, value in result.items()
+        }
+    return result
+
+if __name__ == "__main__":
+    # 图表规格与完整图表的构建耗时和大小对比：python -m skills.chart_spec
+    import time
+
+    from skills.softskill import plot_activeness
+    from utils.serialization import dumps
+
+    repo_activeness = {f"PaddlePaddle/repo{i}": i / 10 for i in range(5)}
+    for name, build in (("spec", lambda: plot_activeness(repo_activeness)), ("figure", lambda: to_figure(plot_activeness(repo_activeness)))):
+        start = time.time()
+        for _ in range(100):
+            body = dumps(build())
+        print(f"{name}: {(time.time() - start) * 10:.2f} ms/次，{len(body)} bytes")
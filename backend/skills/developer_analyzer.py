@@ -5,11 +5,16 @@ from pathlib import Path
 from uuid import uuid4
 import logging
 from pathlib import Path
+from typing import Optional
 from github import Github
 
 from skills import basic_info, experience, hardskill, softskill
+from skills.chart_spec import CHART_FORMATS, convert_charts
+from skills.profile_store import load_user_info, save_user_info
+from skills.wordcloud_cache import wordcloud_url
 from utils import load_user_data
 from utils.manage_data_update_time import get_now_date
+from utils.repo_catalog import load_repo_catalog
 from get_data.get_user_info import get_user_info
 from config import GITHUB_TOKEN
 
@@ -23,11 +28,17 @@ class DeveloperAnalyzer:
     """
     分析开发者的技能。
     """
-    def __init__(self, username: str):
+    def __init__(self, username: str, chart_format: str = "spec", user_data: Optional[dict] = None):
         """
         初始化分析器，设置cache目录。
+        chart_format: "spec" 返回图表规格，由前端组装图表；"figure" 返回完整的 plotly 图表（旧格式）
+        user_data: 批量计算时预先汇总好的本地记录（见 load_user_data.users_data_in_repos），为空时按用户读取
         """
+        if chart_format not in CHART_FORMATS:
+            raise ValueError(f"chart_format 只能为 {', '.join(CHART_FORMATS)}")
         self.username = username
+        self.chart_format = chart_format
+        self.user_data = user_data
         self.task_id = str(uuid4())
         # self.task_name = username  # ---暂时不使用uuid，方便调试---
         self.task_name = username + "_" + self.task_id
@@ -39,59 +50,65 @@ class DeveloperAnalyzer:
         """
         从 GitHub 和本地获取数据，并存入json
         """
-        gh = Github(GITHUB_TOKEN)
-        # ---从github获取用户基本信息和仓库信息---
-        try:
-            info = get_user_info(gh, self.username)
-        except Exception:
-            raise ValueError(f"Github 用户不存在，请重新输入")
+        # ---从github获取用户基本信息，按数据快照缓存，批量计算时不重复请求---
+        # 用户不存在时抛出 ValueError，其他请求错误（如超出速率限制）直接抛出
+        info = load_user_info(self.username)
+        if info is None:
+            info = get_user_info(Github(GITHUB_TOKEN), self.username)
+            save_user_info(self.username, info)
         with open(self.user_cache_dir / "info.json", 'w', encoding='utf-8') as f:
             json.dump(info, f, ensure_ascii=False, indent=4)
 
+        # ---批量计算时直接使用预先汇总的记录---
+        if self.user_data is not None:
+            for kind in load_user_data.USER_DATA_KINDS:
+                with open(self.user_cache_dir / f"{kind}.json", 'w', encoding='utf-8') as f:
+                    json.dump(self.user_data[kind], f, ensure_ascii=False, indent=4)
+            return
+
         # ---从本地加载paddle相关repo，获取commits, pr, issue, review, comment等信息---
-        with open(f"data/paddle_repos.json", 'r', encoding='utf-8') as f:
-            repos = json.load(f)
+        repos = load_repo_catalog().names
         # commit
         commits = []
         for repo in repos:
-            cmts = load_user_data.user_commits_in_repo(self.username, repo["full_name"])
+            cmts = load_user_data.user_commits_in_repo(self.username, repo)
             commits.extend(cmts)
         with open(self.user_cache_dir / "commits.json", 'w', encoding='utf-8') as f:
             json.dump(commits, f, ensure_ascii=False, indent=4)
         # pr
         prs = []
         for repo in repos:
-            prs_tmp = load_user_data.user_prs_in_repo(self.username, repo["full_name"])
+            prs_tmp = load_user_data.user_prs_in_repo(self.username, repo)
             prs.extend(prs_tmp)
         with open(self.user_cache_dir / "prs.json", 'w', encoding='utf-8') as f:
             json.dump(prs, f, ensure_ascii=False, indent=4)
         # issue
         issues = []
         for repo in repos:
-            issues_tmp = load_user_data.user_issues_in_repo(self.username, repo["full_name"])
+            issues_tmp = load_user_data.user_issues_in_repo(self.username, repo)
             issues.extend(issues_tmp)
         with open(self.user_cache_dir / "issues.json", 'w', encoding='utf-8') as f:
             json.dump(issues, f, ensure_ascii=False, indent=4)
         # review
         review_prs = []
         for repo in repos:
-            reviews_tmp = load_user_data.user_review_prs_in_repo(self.username, repo["full_name"])
+            reviews_tmp = load_user_data.user_review_prs_in_repo(self.username, repo)
             review_prs.extend(reviews_tmp)
         with open(self.user_cache_dir / "review_prs.json", 'w', encoding='utf-8') as f:
             json.dump(review_prs, f, ensure_ascii=False, indent=4)
         # comment
         comment_prs_issues = []
         for repo in repos:
-            comments_tmp = load_user_data.user_comment_prs_issues_in_repo(self.username, repo["full_name"])
+            comments_tmp = load_user_data.user_comment_prs_issues_in_repo(self.username, repo)
             comment_prs_issues.extend(comments_tmp)
         with open(self.user_cache_dir / "comment_prs_issues.json", 'w', encoding='utf-8') as f:
             json.dump(comment_prs_issues, f, ensure_ascii=False, indent=4)
         # merge权限
         merge_repos = []
         for repo in repos:
-            flag = load_user_data.user_merge_permission_in_repo(self.username, repo["full_name"])
+            flag = load_user_data.user_merge_permission_in_repo(self.username, repo)
             if flag:
-                merge_repos.append(repo["full_name"])
+                merge_repos.append(repo)
         # print(f"{username} has merge permission in {len(merge_repos)} repositories: {merge_repos}")
         with open(self.user_cache_dir / "repos_can_merge.json", 'w', encoding='utf-8') as f:
             json.dump(merge_repos, f, ensure_ascii=False, indent=4)
@@ -111,7 +128,7 @@ class DeveloperAnalyzer:
         nowdate = datetime.fromisoformat(nowdate).replace(tzinfo=timezone.utc)
         basic_info_data = basic_info.basic_info(self.task_name)
         experience_data, fig_repo_contrib, fig_recent_contrib = experience.experience(self.task_name, nowdate)
-        fig_lang, fig_domain_bytes, solving_score, fig_solving = hardskill.hardskill(self.task_name, nowdate)
+        fig_lang, domain_wordcloud_key, solving_score, fig_solving = hardskill.hardskill(self.task_name, nowdate)
         fig_consistency, fig_activeness, time_mgmt, comm_score, fig_comm, sample_commits = softskill.softskill(self.task_name)
 
         # 返回结果
@@ -126,7 +143,7 @@ class DeveloperAnalyzer:
             },
             "hardskill": {
                 "fig_lang": fig_lang,
-                "fig_domain_bytes": fig_domain_bytes,
+                "domain_wordcloud": wordcloud_url(domain_wordcloud_key),  # 图片由 /wordcloud/{hash}.png 提供
                 "solving_score": solving_score,
                 "fig_solving": fig_solving
             },
@@ -139,7 +156,7 @@ class DeveloperAnalyzer:
                 "sample_commits": sample_commits
             }
         }
-        return result
+        return convert_charts(result, self.chart_format)
 
     def clean_up(self):
         """
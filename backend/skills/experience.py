@@ -1,19 +1,20 @@
 import json
-import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime, timezone
 from pathlib import Path
 import logging
 
+from skills.chart_spec import chart, to_figure
+
 logging.basicConfig(
     format="%(asctime)s (PID %(process)d) [%(levelname)s] %(filename)s:%(lineno)d %(message)s",
     level=logging.INFO,
 )
 logger = logging.getLogger(__name__)
 
-def plot_repo_contrib(df_repo_contrib: pd.DataFrame) -> go.Figure:
+def plot_repo_contrib(df_repo_contrib: pd.DataFrame) -> dict:
     """
-    绘制贡献总数前5个仓库的统计图
+    贡献总数前5个仓库的统计图
     """
     colors = {
         'commits': "#81C784",
@@ -25,26 +26,28 @@ def plot_repo_contrib(df_repo_contrib: pd.DataFrame) -> go.Figure:
     
     df_repo_contrib = df_repo_contrib.sort_values(by="total", ascending=True)
     df_repo_contrib = df_repo_contrib.drop(columns=['total'])
-    fig = go.Figure()
-    for col in df_repo_contrib.columns:
-        fig.add_trace(go.Bar(
-            y=df_repo_contrib.index,
-            x=df_repo_contrib[col],
+    data = [
+        dict(
+            type="bar",
+            y=df_repo_contrib.index.tolist(),
+            x=df_repo_contrib[col].tolist(),
             name=col,
             orientation='h',
             marker=dict(color=colors[col]),
             legendrank=5 - list(colors.keys()).index(col) + 1
-        ))
-    fig.update_layout(
+        )
+        for col in df_repo_contrib.columns
+    ]
+    return chart(
+        data,
         barmode='stack',
         # title="Top 5 Repository Contributions",
-        xaxis_title="Number of Contributions",
-        xaxis=dict(range=[0, None]),
-        legend_title="Contribution Type",
+        xaxis=dict(range=[0, None], title=dict(text="Number of Contributions")),
         template="plotly_white",
         height=400 + len(df_repo_contrib.index) * 20,  # 高度
         margin=dict(l=100, r=40, t=80, b=60),  # 边距
         legend=dict(
+            title=dict(text="Contribution Type"),
             orientation="h",
             yanchor="bottom",
             y=-0.3,
@@ -52,11 +55,10 @@ def plot_repo_contrib(df_repo_contrib: pd.DataFrame) -> go.Figure:
             x=0.5
         )
     )
-    return fig
 
-def plot_recent_contrib(df_contrib: pd.DataFrame) -> go.Figure:
+def plot_recent_contrib(df_contrib: pd.DataFrame) -> dict:
     """
-    绘制最近一年的贡献图
+    最近一年的贡献图
     """
     colors = {
         'commits': "#81C784",
@@ -66,29 +68,33 @@ def plot_recent_contrib(df_contrib: pd.DataFrame) -> go.Figure:
         'reviews': "#A790F9",
     }
     df_contrib = df_contrib.drop(columns=['total'])
-    fig = go.Figure()
-    for col in df_contrib.columns:
-        fig.add_trace(go.Scatter(
-            x=df_contrib.index,
-            y=df_contrib[col],
+    months = [d.strftime("%Y-%m-%d") for d in df_contrib.index]
+    data = [
+        dict(
+            type="scatter",
+            x=months,
+            y=df_contrib[col].tolist(),
             mode='lines+markers',
             name=col,
             line=dict(color=colors[col]),
             marker=dict(size=6),
             # legendrank=5 - list(colors.keys()).index(col) + 1
-        ))
-    fig.update_layout(
+        )
+        for col in df_contrib.columns
+    ]
+    return chart(
+        data,
         # title="Recent Contributions (Last Year)",
-        xaxis_title="Month",
-        yaxis_title="Number of Contributions",
+        xaxis=dict(title=dict(text="Month")),
         yaxis=dict(
             range=[0, None],    # 从0开始
+            title=dict(text="Number of Contributions"),
         ),
-        legend_title="Contribution Type",
         template="plotly_white",
         height=500,
         margin=dict(l=60, r=40, t=80, b=60),
         legend=dict(
+            title=dict(text="Contribution Type"),
             orientation="h",
             yanchor="bottom",
             y=-0.3,
@@ -96,9 +102,8 @@ def plot_recent_contrib(df_contrib: pd.DataFrame) -> go.Figure:
             x=0.5
         )
     )
-    return fig
 
-def experience(task_name: str, nowdate: datetime) -> tuple[dict, go.Figure, go.Figure]:
+def experience(task_name: str, nowdate: datetime) -> tuple[dict, dict, dict]:
     """
     用户的开发经验
     """
@@ -223,8 +228,8 @@ if __name__ == "__main__":
     experience_data, fig_repo_contrib, fig_recent_contrib = experience(username, datetime(2025, 6, 30, tzinfo=timezone.utc))
     print(f"experience of developer {username}: {experience_data}")
     # 保存绘图
-    fig_repo_contrib.write_html(Path("cache") / username / "repo_contrib.html")
-    fig_recent_contrib.write_html(Path("cache") / username / "recent_contrib.html")
+    to_figure(fig_repo_contrib).write_html(Path("cache") / username / "repo_contrib.html")
+    to_figure(fig_recent_contrib).write_html(Path("cache") / username / "recent_contrib.html")
 
     end_time = datetime.now()
     print(f"Time taken: {end_time - start_time}")
@@ -4,13 +4,13 @@ import math
 import logging
 from datetime import datetime
 from pathlib import Path
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-from wordcloud import WordCloud
 from io import BytesIO
 
 from utils.extension_to_language import extension_to_language
 from utils.get_module_weights import module_weights
+from utils.repo_catalog import load_repo_catalog
+from skills.chart_spec import chart, to_figure
+from skills.wordcloud_cache import request_wordcloud, wait_wordcloud
 
 logging.basicConfig(
     format="%(asctime)s (PID %(process)d) [%(levelname)s] %(filename)s:%(lineno)d %(message)s",
@@ -18,32 +18,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def plot_lang_skills(lang_counts: dict) -> go.Figure:
+def plot_lang_skills(lang_counts: dict) -> dict:
     """
-    绘制编程语言使用能力的条形图
+    编程语言使用能力的条形图
     """
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        x=list(lang_counts.keys() if lang_counts else ['None']),
-        y=list(lang_counts.values() if lang_counts else [0]),
-        marker=dict(color="#75B8D7"),
-        width=[0.4] * len(lang_counts)
-    ))
-    fig.update_layout(
+    return chart(
+        [dict(
+            type="bar",
+            x=list(lang_counts.keys() if lang_counts else ['None']),
+            y=list(lang_counts.values() if lang_counts else [0]),
+            marker=dict(color="#75B8D7"),
+            width=[0.4] * len(lang_counts)
+        )],
         # title=f"Programming Language Skills",
-        xaxis_title="Programming Language",
+        xaxis=dict(title=dict(text="Programming Language")),
         yaxis=dict(
             range=[0, None],    # 从0开始
+            title=dict(text="Language Usage Score"),
         ),
-        yaxis_title="Language Usage Score",
         template="plotly_white"
     )
-    return fig
 
 def plot_domain_skills(domains: dict) -> bytes:
     """
-    绘制领域能力的词云图
+    绘制领域能力的词云图，只在词云进程池中调用
     """
+    import matplotlib.pyplot as plt  # matplotlib/wordcloud 导入较慢，不在接口进程中导入
+    from wordcloud import WordCloud
+
     wordcloud = WordCloud(width=800, height=400, background_color="white").generate_from_frequencies(domains)
     buf = BytesIO()
     plt.figure(figsize=(10, 6))
@@ -56,9 +58,9 @@ def plot_domain_skills(domains: dict) -> bytes:
     buf.seek(0)  # 重置指针
     return buf.read()
 
-def plot_pr_types(pr_type_origin: dict, pr_type_weights: dict) -> go.Figure:
+def plot_pr_types(pr_type_origin: dict, pr_type_weights: dict) -> dict:
     """
-    绘制PR类型的条形图，画在同一张图中
+    PR类型的条形图，画在同一张图中
     """
     x = list(pr_type_origin.keys())
     y_count = list(pr_type_origin.values())
@@ -73,26 +75,29 @@ def plot_pr_types(pr_type_origin: dict, pr_type_weights: dict) -> go.Figure:
         '#e5c494'
     ]
 
-    fig = go.Figure()
-
-    # 第一个图：PR数量
-    fig.add_trace(go.Bar(
-        x=x,
-        y=y_count,
-        name="PR Count",
-        marker_color=colors,
-        visible=True
-    ))
-    # 第二个图：PR权重
-    fig.add_trace(go.Bar(
-        x=x,
-        y=y_score,
-        name="PR Score",
-        marker_color=colors,
-        visible=False
-    ))
+    data = [
+        # 第一个图：PR数量
+        dict(
+            type="bar",
+            x=x,
+            y=y_count,
+            name="PR Count",
+            marker=dict(color=colors),
+            visible=True
+        ),
+        # 第二个图：PR权重
+        dict(
+            type="bar",
+            x=x,
+            y=y_score,
+            name="PR Score",
+            marker=dict(color=colors),
+            visible=False
+        ),
+    ]
     # 两个图用按钮切换
-    fig.update_layout(
+    return chart(
+        data,
         updatemenus=[
             dict(
                 type="buttons",
@@ -114,15 +119,14 @@ def plot_pr_types(pr_type_origin: dict, pr_type_weights: dict) -> go.Figure:
                 ]
             )
         ],
-        xaxis_title="PR Type",
+        xaxis=dict(title=dict(text="PR Type")),
         yaxis=dict(range=[0, None]),
         template='plotly_white',
         height=600
     )
-    return fig
 
 # 编程语言使用能力
-def language_skill(task_name: str, nowdate: datetime) -> go.Figure:
+def language_skill(task_name: str, nowdate: datetime) -> dict:
     """
     统计用户的编程语言使用情况
     """
@@ -159,17 +163,13 @@ def language_skill(task_name: str, nowdate: datetime) -> go.Figure:
     return fig
 
 # 领域能力
-def domain_skill(task_name: str) -> bytes:
+def domain_skill(task_name: str) -> str:
     """
-    统计用户的领域能力
+    统计用户的领域能力，返回词云图的内容哈希
     """
-    # 读取paddle相关repo及其领域
-    with open("data/paddle_repos.json", 'r', encoding='utf-8') as f:
-        paddle_repos = json.load(f)
-    paddle_domains = {}
-    for repo in paddle_repos:
-        paddle_domains[repo['full_name']] = repo.get('topics', []) + repo.get('domain', '').split(', ')
-        
+    # paddle相关repo的领域
+    paddle_domains = load_repo_catalog().domain_tags
+
     # 提取用户贡献过commit的repo
     user_cache_dir = Path("cache") / task_name
     with open(user_cache_dir / "commits.json", 'r', encoding='utf-8') as f:
@@ -182,7 +182,7 @@ def domain_skill(task_name: str) -> bytes:
     # 统计领域
     domains = {}
     for repo in repos:
-        domain = paddle_domains.get(repo, '')
+        domain = paddle_domains.get(repo, [])
         for d in domain:
             if d not in domains:
                 domains[d] = 1
@@ -191,13 +191,37 @@ def domain_skill(task_name: str) -> bytes:
     if not domains:
         domains = {'None': 1}
 
-    # 绘制词云图
-    buf = plot_domain_skills(domains)
-
-    return buf
+    # 绘制词云图：领域相同的用户共用一张图，在进程池中绘制，不阻塞请求
+    return request_wordcloud(domains)
 
 # 问题解决能力
-def problem_solving_skill(task_name: str) -> tuple[float, go.Figure]:
+def pr_weight(pr: dict, m_w_dic: dict) -> float:
+    """
+    单个pr的问题解决权重：项目难度 * 贡献重要度（loc、模块重要度）
+    """
+    # 1.项目难度
+    p_w = math.log10(int(pr['number']) + 1)/10 # 项目大小作为难度指标
+    # 2.贡献重要度
+    # 1）loc
+    loc = math.log10(pr['additions'] + pr['deletions'] + 1)
+    # 2）模块重要度
+    modules = m_w_dic.get(pr['repo'], {})
+    m_w = 0
+    files = pr['files']
+    for file in files:
+        filename = file['filename']
+        parts = filename.split('/')
+        # 只取前两级目录作为模块名 eg: src/module1/file.py -> src/module1
+        if len(parts) > 2:
+            module = '/'.join(parts[:2])
+        else:
+            module = parts[0]
+        weight = modules.get(module, 0)
+        m_w += weight
+    m_w = m_w / len(files) if files else 0  # 平均模块重要度
+    return m_w * p_w * loc
+
+def problem_solving_skill(task_name: str) -> tuple[float, dict]:
     """
     用户的问题解决能力，考虑 1）项目难度 2）贡献重要度 3）贡献类型
     """
@@ -214,42 +238,21 @@ def problem_solving_skill(task_name: str) -> tuple[float, go.Figure]:
     for pr in prs:
         if pr['repo'] not in pr_weights:
             pr_weights[pr['repo']] = {}
-        # 1.项目难度
-        p_w = math.log10(int(pr['number']) + 1)/10 # 项目大小作为难度指标
-        # 2.贡献重要度
-        # 1）loc
-        loc = math.log10(pr['additions'] + pr['deletions'] + 1)
-        # 2）模块重要度
-        repo_full_name = pr['repo']
-        modules = m_w_dic.get(repo_full_name, {})
-        m_w = 0
-        files = pr['files']
-        for file in files:
-            filename = file['filename']
-            parts = filename.split('/')
-            # 只取前两级目录作为模块名 eg: src/module1/file.py -> src/module1
-            if len(parts) > 2:
-                module = '/'.join(parts[:2])
-            else:
-                module = parts[0]
-            weight = modules.get(module, 0)
-            m_w += weight
-        m_w = m_w / len(files) if files else 0  # 平均模块重要度
-        pr_weights[repo_full_name][pr['number']] =  m_w * p_w * loc
+        pr_weights[pr['repo']][pr['number']] = pr_weight(pr, m_w_dic)
     # 3.pr类型
     pr_types = ['Bug fix', 'Documentation', 'Test', 'Build', 'Enhancement', 'New feature', 'Others']
     pr_type_origin = {p: 0 for p in pr_types} # 统计每种类型的pr数量
     pr_type_weights = {ptype: 0 for ptype in pr_types} # 统计每种类型的pr权重总和
     for pr in prs:
         repo_full_name = pr['repo']
-        pr_weight = pr_weights[repo_full_name].get(pr['number'], 0)
+        weight = pr_weights[repo_full_name].get(pr['number'], 0)
         pr_type = pr["type"]
         if pr_type in pr_type_weights:
             pr_type_origin[pr_type] += 1
-            pr_type_weights[pr_type] += pr_weight
+            pr_type_weights[pr_type] += weight
         else:
             pr_type_origin['Others'] += 1
-            pr_type_weights['Others'] += pr_weight
+            pr_type_weights['Others'] += weight
 
     # 最终问题解决能力分数和绘图
     total_score = sum(pr_type_weights.values())
@@ -257,7 +260,7 @@ def problem_solving_skill(task_name: str) -> tuple[float, go.Figure]:
 
     return total_score, fig
 
-def hardskill(task_name: str, nowdate: datetime) -> tuple[go.Figure, bytes, float, go.Figure]:
+def hardskill(task_name: str, nowdate: datetime) -> tuple[dict, str, float, dict]:
     """
     用户的硬技能分析
     """
@@ -266,12 +269,12 @@ def hardskill(task_name: str, nowdate: datetime) -> tuple[go.Figure, bytes, floa
     fig_lang_skill = language_skill(task_name, nowdate)
 
     # 2.领域能力
-    fig_domain_skill_bytes = domain_skill(task_name)
+    domain_wordcloud_key = domain_skill(task_name)
 
     # 3.问题解决能力
     solving_score, fig_solving_skill = problem_solving_skill(task_name)
 
-    return fig_lang_skill, fig_domain_skill_bytes, solving_score, fig_solving_skill
+    return fig_lang_skill, domain_wordcloud_key, solving_score, fig_solving_skill
 
 if __name__ == "__main__":
 
@@ -287,11 +290,10 @@ if __name__ == "__main__":
     # username = 'dune0310421'
     username = 'Aurelius84'
 
-    fig1, fig2_bytes, solving_score, fig3 = hardskill(username, datetime(2025, 6, 30, tzinfo=None))
-    fig1.write_html(Path("cache") / username / "lang_skill.html")
-    with open(Path("cache") / username / "domain_skills.png", 'wb') as f:
-        f.write(fig2_bytes)
-    fig3.write_html(Path("cache") / username / "solving_skill.html")
+    fig1, wordcloud_key, solving_score, fig3 = hardskill(username, datetime(2025, 6, 30, tzinfo=None))
+    to_figure(fig1).write_html(Path("cache") / username / "lang_skill.html")
+    print(f"Domain Skill Wordcloud: {wait_wordcloud(wordcloud_key)}")
+    to_figure(fig3).write_html(Path("cache") / username / "solving_skill.html")
     print(f"Problem Solving Skill Score: {solving_score}")
 
     end_time = datetime.now()
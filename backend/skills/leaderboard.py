@@ -0,0 +1,216 @@
+import json
+import os
+from bisect import bisect_left, bisect_right
+from typing import Optional
+
+from utils.data_store import DATA_DIR, SnapshotNotBuilt, cached_by_mtime
+from utils.repo_catalog import load_repo_catalog
+
+# 所有开发者按指标、按范围（全组织 / 仓库 / 领域）的排名，由 build_rankings 在数据更新后生成
+RANKINGS_FILE = f"{DATA_DIR}/paddle_rankings.json"
+# 排名指标：problem_solving 为已合并pr的问题解决权重之和（同 hardskill.problem_solving_skill），
+# communication 为commit message质量分（同 softskill.communication_skill）
+METRICS = ("problem_solving", "communication")
+# 范围：all 为全组织，repo:{full_name} 为单个仓库，domain:{domain} 为同一领域（见 RepoCatalog.domains）的所有仓库
+ALL_SCOPE = "all"
+PAGE_LIMIT = 100
+
+def scope_name(repo: Optional[str] = None, domain: Optional[str] = None) -> str:
+    if repo and domain:
+        raise ValueError("repo 和 domain 只能指定一个")
+    if repo:
+        return f"repo:{load_repo_catalog().resolve(repo) or repo}"
+    if domain:
+        return f"domain:{domain}"
+    return ALL_SCOPE
+
+def user_scores(user_data: dict, domains: dict[str, list[str]], m_w_dic: dict) -> dict[str, dict[str, float]]:
+    """
+    单个开发者在各范围内的指标分数，{metric: {scope: score}}；只包含有相应贡献的范围
+    """
+    from skills.hardskill import pr_weight
+    from skills.softskill import communication_score
+
+    def scopes(repo):
+        return [ALL_SCOPE, f"repo:{repo}"] + [f"domain:{d}" for d in domains.get(repo, [])]
+
+    # 问题解决：有pr的范围都参与排名，只累计已合并pr的权重
+    solving = {}
+    for pr in user_data["prs"]:
+        weight = pr_weight(pr, m_w_dic) if pr['merged'] == True else 0
+        for scope in scopes(pr['repo']):
+            solving[scope] = solving.get(scope, 0) + weight
+    # 沟通：按范围内已标注的commit计算
+    labels = {}
+    for commit in user_data["commits"]:
+        if commit.get('why_what_label') is None:
+            continue
+        for scope in scopes(commit['repo']):
+            labels.setdefault(scope, []).append(commit['why_what_label'])
+    communication = {scope: communication_score(scope_labels) for scope, scope_labels in labels.items()}
+    return {"problem_solving": solving, "communication": communication}
+
+def build_rankings() -> dict:
+    """
+    一次遍历所有仓库汇总每个开发者（不含机器人）的记录，计算各指标、各范围的分数并排序
+    {"data_date": ..., "rankings": {metric: {scope: [[username, score], ...]}}}，按分数降序、同分按用户名
+    """
+    from utils.actors import ACTOR_BOT, load_actor_table
+    from utils.get_module_weights import module_weights
+    from utils.load_user_data import users_data_in_repos
+    from utils.manage_data_update_time import get_now_date
+
+    catalog = load_repo_catalog()
+    m_w_dic = module_weights()
+    users = users_data_in_repos(catalog.names)
+    actors = load_actor_table()
+
+    rankings = {metric: {} for metric in METRICS}
+    for username, user_data in users.items():
+        if actors.flags(username) & ACTOR_BOT:
+            continue
+        for metric, scores in user_scores(user_data, catalog.domains, m_w_dic).items():
+            for scope, score in scores.items():
+                rankings[metric].setdefault(scope, []).append([username, score])
+    for scopes in rankings.values():
+        for entries in scopes.values():
+            entries.sort(key=lambda entry: (-entry[1], entry[0]))
+    return {"data_date": get_now_date(), "rankings": rankings}
+
+def save_rankings(table: dict) -> None:
+    os.makedirs(os.path.dirname(RANKINGS_FILE), exist_ok=True)
+    tmp_path = f"{RANKINGS_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False)
+    os.replace(tmp_path, RANKINGS_FILE)
+
+class Ranking:
+    """
+    单个指标、单个范围的排名：分数降序排列，名次、百分位和分数区间都由二分查找得到
+    """
+    def __init__(self, entries: list[list]):
+        self.usernames = [entry[0] for entry in entries]
+        self.neg_scores = [-entry[1] for entry in entries]  # 升序，便于二分
+        self.scores = {username: score for username, score in entries}
+
+    def __len__(self) -> int:
+        return len(self.usernames)
+
+    def rank_of_score(self, score: float) -> int:
+        """
+        分数的名次（同分同名次）：分数更高的人数 + 1
+        """
+        return bisect_left(self.neg_scores, -score) + 1
+
+    def items(self, lo: int, hi: int) -> list[dict]:
+        return [
+            {"rank": self.rank_of_score(-self.neg_scores[i]), "username": self.usernames[i], "score": -self.neg_scores[i]}
+            for i in range(lo, hi)
+        ]
+
+    def page(self, offset: int = 0, limit: int = 20) -> list[dict]:
+        """
+        第 offset 名起的 limit 个开发者，top-k 即 page(0, k)
+        """
+        lo = min(max(offset, 0), len(self))
+        return self.items(lo, min(lo + limit, len(self)))
+
+    def score_range(self, min_score: Optional[float] = None, max_score: Optional[float] = None) -> tuple[int, int]:
+        """
+        分数在 [min_score, max_score] 内的开发者在排名中的位置区间 [lo, hi)
+        """
+        lo = 0 if max_score is None else bisect_left(self.neg_scores, -max_score)
+        hi = len(self) if min_score is None else bisect_right(self.neg_scores, -min_score)
+        return lo, max(lo, hi)
+
+    def user_rank(self, username: str) -> Optional[dict]:
+        """
+        开发者的分数、名次和百分位（分数不高于该开发者的人数占比）；不在排名中时返回 None
+        """
+        score = self.scores.get(username)
+        if score is None:
+            return None
+        higher = bisect_left(self.neg_scores, -score)
+        return {
+            "rank": higher + 1,
+            "score": score,
+            "percentile": round((len(self) - higher) / len(self) * 100, 2),
+            "total": len(self),
+        }
+
+class Leaderboard:
+    def __init__(self, table: dict):
+        self.data_date = table["data_date"]
+        self.rankings = {
+            metric: {scope: Ranking(entries) for scope, entries in scopes.items()}
+            for metric, scopes in table["rankings"].items()
+        }
+
+    def ranking(self, metric: str, scope: str = ALL_SCOPE) -> Ranking:
+        if metric not in METRICS:
+            raise ValueError(f"metric 只能为 {', '.join(METRICS)}")
+        if scope not in self.rankings.get(metric, {}):
+            raise ValueError(f"没有 {scope} 的排名数据")
+        return self.rankings[metric][scope]
+
+    def query(
+        self,
+        metric: str,
+        scope: str = ALL_SCOPE,
+        offset: int = 0,
+        limit: int = 20,
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+    ) -> dict:
+        """
+        分页查询排名，可限定分数区间
+        """
+        if not 0 < limit <= PAGE_LIMIT or offset < 0:
+            raise ValueError(f"offset 不能为负，limit 应在 1~{PAGE_LIMIT} 之间")
+        ranking = self.ranking(metric, scope)
+        lo, hi = ranking.score_range(min_score, max_score)
+        start = min(lo + offset, hi)
+        return {
+            "date": self.data_date,
+            "metric": metric,
+            "scope": scope,
+            "total": hi - lo,
+            "items": ranking.items(start, min(start + limit, hi)),
+        }
+
+    def user_rank(self, metric: str, username: str, scope: str = ALL_SCOPE) -> dict:
+        result = self.ranking(metric, scope).user_rank(username)
+        if result is None:
+            raise ValueError(f"{username} 不在 {scope} 的 {metric} 排名中")
+        return {"date": self.data_date, "metric": metric, "scope": scope, "username": username, **result}
+
+def load_leaderboard() -> Leaderboard:
+    """
+    读取排名（按文件修改时间缓存）；排名由 update_all 或 python -m skills.leaderboard 生成，还没有生成时抛出 SnapshotNotBuilt
+    """
+    if not os.path.exists(RANKINGS_FILE):
+        raise SnapshotNotBuilt("开发者排名还没有生成，请稍后再试")
+
+    def build():
+        with open(RANKINGS_FILE, "r", encoding="utf-8") as f:
+            return Leaderboard(json.load(f))
+
+    return cached_by_mtime(RANKINGS_FILE, "leaderboard", build)
+
+if __name__ == "__main__":
+    # 重建排名并查询：python -m skills.leaderboard
+    import time
+
+    start = time.time()
+    save_rankings(build_rankings())
+    print(f"排名已重建，耗时 {time.time() - start:.1f} s")
+    leaderboard = load_leaderboard()
+    for metric in METRICS:
+        ranking = leaderboard.ranking(metric)
+        start = time.time()
+        for _ in range(1000):
+            top = leaderboard.query(metric, limit=10)
+            if len(ranking):
+                leaderboard.user_rank(metric, ranking.usernames[len(ranking) // 2])
+        print(f"{metric}: {len(ranking)} 人，top-10 + 百分位查询 {(time.time() - start):.3f} ms/次")
+        print(top["items"][:3])
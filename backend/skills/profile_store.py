@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Optional
+
+from utils.manage_data_update_time import get_now_date
+
+logger = logging.getLogger(__name__)
+
+# 预先计算的开发者技能分析结果：username（小写） -> 压缩后的JSON（图表规格格式），data_date 为计算时的数据快照日期
+# 同库的 user_infos 表缓存 GitHub 用户基本信息，每个数据快照只请求一次
+PROFILE_DB = "data/paddle_dvpr_profiles.sqlite"
+PROFILE_WORKERS = os.cpu_count() or 1
+# 批量计算时每写入多少条提交一次
+COMMIT_BATCH = 200
+# 批量计算中出错（如 GitHub 请求失败）的开发者重新计算的轮数
+PROFILE_RETRIES = 2
+
+def connect(path: str = PROFILE_DB) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS profiles ("
+        "username TEXT PRIMARY KEY, data_date TEXT NOT NULL, profile BLOB NOT NULL)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS user_infos ("
+        "username TEXT PRIMARY KEY, data_date TEXT NOT NULL, info TEXT NOT NULL)"
+    )
+    return conn
+
+def save_profiles(conn: sqlite3.Connection, rows: Iterable[tuple[str, str, bytes]]) -> None:
+    """
+    写入 (username, data_date, JSON字节串)，已存在时覆盖；GitHub 用户名不区分大小写，按小写存储
+    """
+    conn.executemany(
+        "INSERT OR REPLACE INTO profiles (username, data_date, profile) VALUES (?, ?, ?)",
+        ((username.lower(), data_date, zlib.compress(profile)) for username, data_date, profile in rows),
+    )
+    conn.commit()
+
+def save_profile(username: str, data_date: str, profile: bytes, path: str = PROFILE_DB) -> None:
+    """
+    保存单个开发者的结果，用于缓存按需计算的结果
+    """
+    conn = connect(path)
+    try:
+        save_profiles(conn, [(username, data_date, profile)])
+    finally:
+        conn.close()
+
+def load_profile(username: str, path: str = PROFILE_DB) -> Optional[bytes]:
+    """
+    读取开发者的预计算结果（JSON字节串）；不存在或不是当前数据快照的结果时返回 None
+    """
+    if not os.path.exists(path):
+        return None
+    # 只读连接，各请求线程各自打开
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    try:
+        row = conn.execute(
+            "SELECT profile FROM profiles WHERE username = ? AND data_date = ?",
+            (username.lower(), get_now_date()),
+        ).fetchone()
+    finally:
+        conn.close()
+    return zlib.decompress(row[0]) if row else None
+
+def load_user_info(username: str, path: str = PROFILE_DB) -> Optional[dict]:
+    """
+    读取缓存的 GitHub 用户基本信息；不存在或不是当前数据快照时返回 None
+    """
+    if not os.path.exists(path):
+        return None
+    conn = connect(path)
+    try:
+        row = conn.execute(
+            "SELECT info FROM user_infos WHERE username = ? AND data_date = ?",
+            (username.lower(), get_now_date()),
+        ).fetchone()
+    finally:
+        conn.close()
+    return json.loads(row[0]) if row else None
+
+def save_user_info(username: str, info: dict, path: str = PROFILE_DB) -> None:
+    conn = connect(path)
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO user_infos (username, data_date, info) VALUES (?, ?, ?)",
+            (username.lower(), get_now_date(), json.dumps(info, ensure_ascii=False)),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+def init_worker() -> None:
+    """
+    批量计算的工作进程不再各自启动词云进程池，词云图在首次查看时绘制
+    """
+    from skills import wordcloud_cache
+
+    wordcloud_cache.RENDER_ON_REQUEST = False
+
+def compute_profile(username: str, user_data: dict) -> Optional[tuple[str, str, bytes]]:
+    """
+    在工作进程中计算单个开发者的技能分析结果；GitHub 上不存在的用户返回 None，
+    其他错误（如 GitHub 请求失败）直接抛出，由 build_profiles 重试
+    """
+    from skills.developer_analyzer import DeveloperAnalyzer
+    from utils.serialization import dumps
+
+    data_date = get_now_date()
+    try:
+        with DeveloperAnalyzer(username, user_data=user_data) as analyzer:
+            result = analyzer.analyze_skills()
+    except ValueError as e:
+        logger.warning(f"Skip {username}: {e}")
+        return None
+    return username, data_date, dumps(result)
+
+def build_profiles(usernames: Optional[Iterable[str]] = None, workers: int = PROFILE_WORKERS, path: str = PROFILE_DB) -> int:
+    """
+    批量计算所有开发者（快照中所有commit作者、pr/issue作者、reviewer和评论者，不含机器人）的技能分析结果，
+    多进程并行计算，由主进程写入 PROFILE_DB；已是当前快照的结果跳过，出错的开发者最多重试 PROFILE_RETRIES 轮。
+    应在 update_all 之后运行，返回本次写入的开发者数
+    """
+    from utils.actors import load_actor_table
+    from utils.load_user_data import users_data_in_repos
+    from utils.repo_catalog import load_repo_catalog
+
+    # 一次遍历所有仓库按用户汇总记录，避免每个用户都扫描全部数据
+    users = users_data_in_repos(load_repo_catalog().names)
+    if usernames is not None:
+        users = {username: users[username] for username in usernames if username in users}
+
+    actors = load_actor_table()
+    conn = connect(path)
+    data_date = get_now_date()
+    done = {row[0] for row in conn.execute("SELECT username FROM profiles WHERE data_date = ?", (data_date,))}
+    todo = [username for username in actors.humans(users) if username.lower() not in done]
+    logger.info(f"Building profiles for {len(todo)} developers ({len(done)} up to date)")
+
+    saved = 0
+    try:
+        for attempt in range(PROFILE_RETRIES + 1):
+            if not todo:
+                break
+            if attempt:
+                logger.info(f"Retrying {len(todo)} developers (attempt {attempt})")
+            failed = []
+            rows = []
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+                futures = {executor.submit(compute_profile, username, users[username]): username for username in todo}
+                for future in as_completed(futures):
+                    username = futures[future]
+                    try:
+                        row = future.result()
+                    except Exception as e:
+                        logger.error(f"Error building profile for {username}: {e}")
+                        failed.append(username)
+                        continue
+                    users.pop(username)
+                    if row is not None:
+                        rows.append(row)
+                    if len(rows) >= COMMIT_BATCH:
+                        save_profiles(conn, rows)
+                        saved += len(rows)
+                        rows = []
+            save_profiles(conn, rows)
+            saved += len(rows)
+            todo = failed
+        if todo:
+            logger.error(f"{len(todo)} profiles failed after {PROFILE_RETRIES} retries, run build_profiles again to retry them")
+    finally:
+        conn.close()
+    return saved
+
+if __name__ == "__main__":
+    # 批量计算所有开发者的技能分析结果：python -m skills.profile_store [username ...]
+    import sys
+
+    logging.basicConfig(
+        format="%(asctime)s (PID %(process)d) [%(levelname)s] %(filename)s:%(lineno)d %(message)s",
+        level=logging.INFO,
+    )
+    start = time.time()
+    saved = build_profiles(sys.argv[1:] or None)
+    print(f"{saved} 个开发者的结果已写入 {PROFILE_DB}，耗时 {time.time() - start:.1f} s")
+    username = sys.argv[1] if len(sys.argv) > 1 else None
+    if username:
+        start = time.time()
+        profile = load_profile(username)
+        print(f"查询 {username}：{(time.time() - start) * 1000:.2f} ms，{len(profile or b'')} bytes")
@@ -2,12 +2,10 @@ import os
 import json
 import math
 import logging
-import joblib
-import pandas as pd
-import numpy as np
 from datetime import datetime
 from pathlib import Path
-import plotly.graph_objects as go
+
+from skills.chart_spec import chart, to_figure
 
 logging.basicConfig(
     format="%(asctime)s (PID %(process)d) [%(levelname)s] %(filename)s:%(lineno)d %(message)s",
@@ -15,9 +13,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def plot_consistency(repo_consistency: dict) -> go.Figure:
+def plot_consistency(repo_consistency: dict) -> dict:
     """
-    绘制责任心柱状图
+    责任心柱状图
     """
     repos_sorted = sorted(repo_consistency.items(), key=lambda x: x[1])
     repo_names = [k for k, v in repos_sorted]
@@ -30,26 +28,27 @@ def plot_consistency(repo_consistency: dict) -> go.Figure:
         '#a6d854',
     ]
 
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        y=repo_names,
-        x=month_counts,
-        orientation="h",
-        marker_color=colors,
-    ))
-    fig.update_layout(
-        title="Consistency",
-        xaxis_title="Max Continuous Commit Months",
-        xaxis=dict(range=[0, 1] if max(month_counts) == 0 else [0, None]),
+    return chart(
+        [dict(
+            type="bar",
+            y=repo_names,
+            x=month_counts,
+            orientation="h",
+            marker=dict(color=colors),
+        )],
+        title=dict(text="Consistency"),
+        xaxis=dict(
+            range=[0, 1] if max(month_counts) == 0 else [0, None],
+            title=dict(text="Max Continuous Commit Months"),
+        ),
         template="plotly_white",
         height=400 + len(repo_names) * 30,
         margin=dict(l=150, r=40, t=60, b=40),
     )
-    return fig
 
-def plot_activeness(repo_activeness: dict) -> go.Figure:
+def plot_activeness(repo_activeness: dict) -> dict:
     """
-    绘制活跃度柱状图
+    活跃度柱状图
     """
     repos_sorted = sorted(repo_activeness.items(), key=lambda x: x[1])
     repo_names = [k for k, v in repos_sorted]
@@ -62,26 +61,27 @@ def plot_activeness(repo_activeness: dict) -> go.Figure:
         '#a6d854',
     ]
 
-    fig = go.Figure()
-    fig.add_trace(go.Bar(
-        y=repo_names,
-        x=active_ratios,
-        orientation="h",
-        marker_color=colors,
-    ))
-    fig.update_layout(
-        title="Activeness",
-        xaxis_title="Average Active Months Ratio in a Period (6 Months)",
-        xaxis=dict(range=[0, 1]),
+    return chart(
+        [dict(
+            type="bar",
+            y=repo_names,
+            x=active_ratios,
+            orientation="h",
+            marker=dict(color=colors),
+        )],
+        title=dict(text="Activeness"),
+        xaxis=dict(
+            range=[0, 1],
+            title=dict(text="Average Active Months Ratio in a Period (6 Months)"),
+        ),
         template="plotly_white",
         height=400 + len(repo_names) * 30,
         margin=dict(l=150, r=40, t=60, b=40),
     )
-    return fig
 
-def plot_communication(labels: list[int]) -> go.Figure:
+def plot_communication(labels: list[int]) -> dict:
     """
-    绘制沟通能力饼图
+    沟通能力饼图
     """
     label_map = {
         0: 'no what and why',
@@ -95,25 +95,23 @@ def plot_communication(labels: list[int]) -> go.Figure:
     label_names = [label_map[k] for k in label_count.keys()]
     sizes = [v for v in label_count.values()]
     colors = ['#66c2a5', '#fc8d62', '#8da0cb', '#e78ac3']
-    fig = go.Figure()
-
-    fig.add_trace(go.Pie(
-        labels=label_names,
-        values=sizes,
-        marker_colors=colors,
-        textinfo='label+percent',
-        insidetextorientation='radial'
-    ))
-    fig.update_layout(
+    return chart(
+        [dict(
+            type="pie",
+            labels=label_names,
+            values=sizes,
+            marker=dict(colors=colors),
+            textinfo='label+percent',
+            insidetextorientation='radial'
+        )],
         # title="Communication Skill in Commit Messages",
         template="plotly_white",
         height=400,
         margin=dict(l=40, r=40, t=60, b=40),
     )
-    return fig
 
 # 责任心
-def commitment(task_name: str) -> tuple[go.Figure, go.Figure]:
+def commitment(task_name: str) -> tuple[dict, dict]:
     """
     责任心：用户在每个项目中的最大连续贡献月份数 + 一段时间内的贡献月份比例。
     """
@@ -269,7 +267,20 @@ def time_management(task_name: str) -> dict:
     }
 
 # 沟通能力
-def communication_skill(task_name: str) -> tuple[float, go.Figure, dict]:
+def communication_score(commit_labels: list) -> float:
+    """
+    commit message 质量的百分制分数，保留两位小数
+    """
+    score = 0
+    for label in commit_labels:
+        if label == 3:
+            score += 1
+        elif label == 1 or label == 2:
+            score += 0.8
+    score = score / len(commit_labels)
+    return round(score * 100, 2)  # 转化为百分制，保留两位小数
+
+def communication_skill(task_name: str) -> tuple[float, dict, dict]:
     """
     沟通能力：commit message的质量
     """
@@ -283,14 +294,7 @@ def communication_skill(task_name: str) -> tuple[float, go.Figure, dict]:
     commit_labels = [commit['why_what_label'] for commit in commits]
 
     #计算分数
-    score = 0
-    for label in commit_labels:
-        if label == 3:
-            score += 1
-        elif label == 1 or label == 2:
-            score += 0.8
-    score = score / len(commits)
-    score = round(score * 100, 2)  # 转化为百分制，保留两位小数
+    score = communication_score(commit_labels)
 
     # 绘制饼图
     fig_comm = plot_communication(commit_labels)
@@ -322,7 +326,7 @@ def communication_skill(task_name: str) -> tuple[float, go.Figure, dict]:
     return score, fig_comm, sample_commits
 
 
-def softskill(task_name: str) -> tuple[go.Figure, go.Figure, dict, float, go.Figure, dict]:
+def softskill(task_name: str) -> tuple[dict, dict, dict, float, dict, dict]:
     """
     软技能：责任心、时间管理能力、沟通能力
     """
@@ -352,11 +356,11 @@ if __name__ == "__main__":
     username = 'Aurelius84'
 
     fig1, fig2, time_mgmt, comm_score, fig_comm, sample_commits = softskill(username)
-    fig1.write_html(Path("cache") / username / "consistency.html")
-    fig2.write_html(Path("cache") / username / "activeness.html")
+    to_figure(fig1).write_html(Path("cache") / username / "consistency.html")
+    to_figure(fig2).write_html(Path("cache") / username / "activeness.html")
     print(f"Time Management: {time_mgmt['max_active_month_start']} - {time_mgmt['max_active_month_end']}, Active Projects: {len(time_mgmt['active_projects'])}, Commit Count: {time_mgmt['commit_count']}")
     print(f"Communication Skill Score: {comm_score}")
-    fig_comm.write_html(Path("cache") / username / "communication.html")
+    to_figure(fig_comm).write_html(Path("cache") / username / "communication.html")
 
     end_time = datetime.now()
     print(f"Time taken: {end_time - start_time}")
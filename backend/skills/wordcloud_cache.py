@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+# 按内容哈希缓存的领域词云图：{hash}.png 为图片，{hash}.json 为生成它的领域频次（用于服务重启后补绘）
+WORDCLOUD_CACHE_DIR = Path("cache") / "wordclouds"
+# 绘图参数变化时修改版本号，使旧缓存失效
+WORDCLOUD_VERSION = 1
+WORDCLOUD_WORKERS = int(os.environ.get("WORDCLOUD_WORKERS", 2))
+# 图片接口等待绘制完成的最长时间（秒）
+WORDCLOUD_WAIT_TIMEOUT = 60
+# 为 False 时只保存领域频次，图片接口首次请求时再绘制（批量计算开发者结果时使用）
+RENDER_ON_REQUEST = True
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+_executor = None
+_pending = {}  # hash -> 正在绘制的 Future
+# 保护 _executor 和 _pending；进程池的 submit 不在锁内调用：
+# 进程池损坏时其管理线程持有进程池内部的锁调用完成回调，回调需要获取 _lock
+_lock = threading.Lock()
+
+def wordcloud_key(domains: dict) -> str:
+    """
+    领域频次的内容哈希，与dict顺序无关
+    """
+    payload = json.dumps([WORDCLOUD_VERSION, sorted(domains.items())], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+def wordcloud_path(key: str) -> Path:
+    if not _KEY_PATTERN.match(key):
+        raise ValueError(f"非法的词云图标识：{key}")
+    return WORDCLOUD_CACHE_DIR / f"{key}.png"
+
+def render_wordcloud(key: str, domains: dict) -> None:
+    """
+    在工作进程中绘制词云图并写入缓存
+    """
+    from skills.hardskill import plot_domain_skills  # 工作进程中才需要 matplotlib/wordcloud
+
+    path = wordcloud_path(key)
+    # 先写临时文件再替换，图片接口不会读到半个文件
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(plot_domain_skills(domains))
+    os.replace(tmp_path, path)
+
+def warm_up_worker() -> None:
+    """
+    工作进程启动时预先导入绘图依赖，首张图不必等待导入
+    """
+    import matplotlib.pyplot  # noqa: F401
+    import wordcloud  # noqa: F401
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    调用方需持有 _lock
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=WORDCLOUD_WORKERS, initializer=warm_up_worker)
+    return _executor
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """
+    进程池损坏（如工作进程被杀死）后不再使用，重新创建；损坏的进程池已自行清理，不需要 shutdown。
+    只在提交任务的线程中调用：在进程池管理线程的回调中释放最后一个引用会使其死锁。调用方需持有 _lock
+    """
+    global _executor
+    if _executor is executor:
+        _executor = None
+
+def _submit(key: str, domains: dict) -> Future:
+    """
+    提交绘制任务，同一张图同时只绘制一次，返回绘制完成时完成的 Future
+    """
+    with _lock:
+        future = _pending.get(key)
+        if future is not None:
+            return future
+        # 先登记占位的 Future，同时到达的请求共用同一个任务
+        future = Future()
+        _pending[key] = future
+        executor = get_executor()
+
+    def on_done(task: Future) -> None:
+        # 进程池损坏时不在这里丢弃，下次提交会抛出 BrokenProcessPool 并换新的进程池
+        with _lock:
+            if _pending.get(key) is future:
+                del _pending[key]
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    try:
+        try:
+            task = executor.submit(render_wordcloud, key, domains)
+        except BrokenProcessPool:
+            # 进程池已损坏，换一个新的进程池重试一次
+            with _lock:
+                _discard_executor(executor)
+                executor = get_executor()
+            task = executor.submit(render_wordcloud, key, domains)
+    except Exception as e:
+        with _lock:
+            if _pending.get(key) is future:
+                del _pending[key]
+        future.set_exception(e)
+        return future
+    task.add_done_callback(on_done)
+    return future
+
+def request_wordcloud(domains: dict) -> str:
+    """
+    请求绘制领域词云图，立即返回图片的内容哈希；已缓存时不再绘制
+    """
+    key = wordcloud_key(domains)
+    path = wordcloud_path(key)
+    if path.exists():
+        return key
+    WORDCLOUD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # 与图片一样先写临时文件再替换，补绘时不会读到半个文件
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(domains, f, ensure_ascii=False)
+    os.replace(tmp_path, path.with_suffix(".json"))
+    if RENDER_ON_REQUEST:
+        _submit(key, domains)
+    return key
+
+def wait_wordcloud(key: str, timeout: Optional[float] = WORDCLOUD_WAIT_TIMEOUT) -> Path:
+    """
+    返回词云图的缓存路径，还在绘制时等待完成；缓存被清理时按保存的领域频次补绘
+    不存在时抛出 FileNotFoundError
+    """
+    path = wordcloud_path(key)
+    if path.exists():
+        return path
+    with _lock:
+        future = _pending.get(key)
+    if future is None:
+        domains_path = path.with_suffix(".json")
+        if not domains_path.exists():
+            raise FileNotFoundError(f"词云图不存在：{key}")
+        with open(domains_path, "r", encoding="utf-8") as f:
+            future = _submit(key, json.load(f))
+    future.result(timeout=timeout)
+    return path
+
+def wordcloud_url(key: str) -> str:
+    return f"/wordcloud/{key}.png"
+
+if __name__ == "__main__":
+    # 缓存命中与每次绘制的耗时对比：python -m skills.wordcloud_cache
+    import time
+
+    from skills.hardskill import plot_domain_skills
+
+    domains = {"cv": 3, "nlp": 2, "deep-learning": 5, "paddlepaddle": 4, "ocr": 1}
+    start = time.time()
+    png = plot_domain_skills(domains)
+    print(f"每次绘制：{(time.time() - start) * 1000:.0f} ms，{len(png) / 1024:.0f} KB")
+    start = time.time()
+    path = wait_wordcloud(request_wordcloud(domains))
+    print(f"首次请求（进程池绘制）：{(time.time() - start) * 1000:.0f} ms，{path}")
+    start = time.time()
+    path = wait_wordcloud(request_wordcloud(dict(reversed(domains.items()))))
+    print(f"缓存命中：{(time.time() - start) * 1000:.2f} ms")
@@ -12,11 +12,20 @@ from github import Github
 
 from utils.request_github import request_github
 from utils.content_processor import get_domain, get_pr_type, get_commit_type
-from utils.manage_data_update_time import get_now_date, update_now_date
+from utils.manage_data_update_time import get_now_date, update_now_date, update_commit_heads
+from utils.data_store import save_repo_dataset
+from utils.first_contributions import update_first_contributions
+from utils.identity import update_identities
+from utils.actors import build_actor_table, save_actor_table
+from skills.leaderboard import build_rankings, save_rankings
+from skills.profile_store import build_profiles
 from get_data.get_org_repos import get_org_repos_graphql
 from get_data.get_repo_issues import update_repo_issues_graphql
 from get_data.get_repo_commits import update_repo_commits
 from get_data.get_repo_readme import get_repo_readme
+from health.fetcher.fetch_dependents import fetch_dependents_from_html
+from health.fetcher.fetch_releases import fetch_releases_since, to_timestamp
+from health.health_table import build_health_table, save_health_table
 from config import GITHUB_TOKEN
 
 def update_paddle_repos(until: str) -> None:
@@ -102,8 +111,7 @@ def update_paddle_issues_prs(since: str, until: str) -> None:
                 existing_prs[pr_item["number"]] = pr_item
         # 保存更新后的pr数据
         updated_prs = list(existing_prs.values())
-        with open(pr_file, "w", newline="", encoding="utf-8") as f:
-            json.dump(updated_prs, f, indent=4, ensure_ascii=False)
+        save_repo_dataset("prs", full_name, updated_prs)
 
         # ---更新issue数据---
         issue_file = f"data/paddle_issues/{full_name.replace('/', '_')}_issues.json"
@@ -123,8 +131,10 @@ def update_paddle_issues_prs(since: str, until: str) -> None:
                 existing_issues[issue_item["number"]] = issue_item
         # 保存更新后的issue数据
         updated_issues = list(existing_issues.values())
-        with open(issue_file, "w", newline="", encoding="utf-8") as f:
-            json.dump(updated_issues, f, indent=4, ensure_ascii=False)
+        save_repo_dataset("issues", full_name, updated_issues)
+
+        # ---增量更新首次贡献表---
+        update_first_contributions(full_name, prs=prs, issues=issues)
 
 def update_paddle_commits(since: str, until: str) -> None:
     """
@@ -142,7 +152,7 @@ def update_paddle_commits(since: str, until: str) -> None:
         else:
             existing_commits = []
 
-        results = update_repo_commits(GITHUB_TOKEN, full_name, since, until)
+        results, heads = update_repo_commits(GITHUB_TOKEN, full_name, since, until, existing_commits)
         # 多线程添加commit message type
         with ThreadPoolExecutor(max_workers=9) as executor:
             future_to_commit = {
@@ -159,8 +169,83 @@ def update_paddle_commits(since: str, until: str) -> None:
         existing_shas = {commit['sha'] for commit in existing_commits}
         results = [commit for commit in results if commit['sha'] not in existing_shas]
         existing_commits.extend(results)
-        with open(commits_file, "w", newline="", encoding="utf-8") as f:
-            json.dump(existing_commits, f, indent=4, ensure_ascii=False)
+        save_repo_dataset("commits", full_name, existing_commits)
+        # 先更新全组织的身份映射，再据此维护首次贡献表中的社区开发者
+        update_identities(results)
+        update_first_contributions(full_name, commits=results)
+        # commit保存后再记录本次入库的head，下次只处理之后的新commit
+        if heads:
+            update_commit_heads(full_name, heads)
+
+def update_paddle_releases(until: str) -> None:
+    """
+    增量更新Paddle相关组织的所有仓库的release信息，只获取比已保存的最新release更新的release
+    保存到 data/paddle_releases/{owner}_{repo}_releases.json，按创建时间升序
+    """
+    with open("data/paddle_repos.json", "r", encoding="utf-8") as f:
+        repos = json.load(f)
+    os.makedirs("data/paddle_releases", exist_ok=True)
+    until_ts = datetime.datetime.fromisoformat(until).replace(tzinfo=datetime.timezone.utc).timestamp()
+
+    for repo in tqdm(repos, desc="Fetching releases", dynamic_ncols=True):
+        full_name = repo["full_name"]
+        releases_file = f"data/paddle_releases/{full_name.replace('/', '_')}_releases.json"
+        if os.path.exists(releases_file):
+            with open(releases_file, "r", encoding="utf-8") as f:
+                releases = json.load(f)
+        else:
+            releases = []
+
+        owner, name = full_name.split("/")
+        since = releases[-1]["created_at"] if releases else None
+        try:
+            new_releases = fetch_releases_since(owner, name, since)
+        except Exception as e:
+            logging.warning(f"Failed to fetch releases for {full_name}: {e}")
+            continue
+        # 只保存截至until的release，之后的留到下次更新
+        existing_ids = {release["id"] for release in releases}
+        releases.extend(
+            release for release in new_releases
+            if release["id"] not in existing_ids and to_timestamp(release["created_at"]) <= until_ts
+        )
+        releases.sort(key=lambda release: to_timestamp(release["created_at"]))
+        with open(releases_file, "w", encoding="utf-8") as f:
+            json.dump(releases, f, indent=4, ensure_ascii=False)
+
+# 被依赖数据的有效期（天），过期后才重新抓取
+DEPENDENTS_TTL_DAYS = 7
+
+def update_paddle_dependents(ttl_days: int = DEPENDENTS_TTL_DAYS) -> None:
+    """
+    抓取Paddle相关组织的所有仓库的被依赖数（GitHub dependents页面），保存到 data/paddle_dependents.json
+    每个仓库单独判断有效期，未过期的不重新抓取；抓取失败时保留旧数据
+    """
+    with open("data/paddle_repos.json", "r", encoding="utf-8") as f:
+        repos = json.load(f)
+    dependents_file = "data/paddle_dependents.json"
+    if os.path.exists(dependents_file):
+        with open(dependents_file, "r", encoding="utf-8") as f:
+            dependents = json.load(f)
+    else:
+        dependents = {}
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    for repo in tqdm(repos, desc="Fetching dependents", dynamic_ncols=True):
+        full_name = repo["full_name"]
+        entry = dependents.get(full_name)
+        if entry and now - datetime.datetime.fromisoformat(entry["fetched_at"]) < datetime.timedelta(days=ttl_days):
+            continue
+        owner, name = full_name.split("/")
+        try:
+            counts = fetch_dependents_from_html(owner, name)
+        except Exception as e:
+            logging.warning(f"Failed to fetch dependents for {full_name}: {e}")
+            continue
+        dependents[full_name] = {**counts, "fetched_at": now.isoformat()}
+
+    with open(dependents_file, "w", encoding="utf-8") as f:
+        json.dump(dependents, f, indent=4, ensure_ascii=False)
 
 def update_repos_modules_weights():
     """
@@ -222,6 +307,9 @@ def update_all():
             # ---更新paddle相关的commit信息---
             update_paddle_commits(batch_since, batch_until)
 
+            # ---更新paddle相关的release信息---
+            update_paddle_releases(batch_until)
+
             # ---更新paddle相关的模块重要度信息---
             update_repos_modules_weights()
 
@@ -232,6 +320,21 @@ def update_all():
             logging.error(f"Error updating data from {batch_since} to {batch_until}: {e}")
             time.sleep(max(3700-(time.time() - start_time), 0)) # 避免触发rate limit
 
+    # ---更新paddle相关的被依赖信息（按有效期抓取）---
+    update_paddle_dependents()
+
+    # ---对当前数据快照中的所有 login 分类（机器人/组织成员），后续各分析都据此过滤---
+    save_actor_table(build_actor_table())
+
+    # ---生成当前数据快照的全组织健康度表---
+    save_health_table(build_health_table())
+
+    # ---预先计算所有开发者的技能分析结果（依赖上面更新后的数据）---
+    build_profiles()
+
+    # ---更新开发者各指标的排名---
+    save_rankings(build_rankings())
+
     # # ---更新paddle相关的repo信息---
     # update_paddle_repos(until)
 
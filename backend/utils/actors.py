@@ -0,0 +1,170 @@
+import json
+import os
+import re
+from typing import Iterable, Optional
+
+from utils.data_store import DATA_DIR, EventTable, SnapshotNotBuilt, cached_by_mtime, dataset_path, load_repo_dataset
+from utils.repo_catalog import load_repo_catalog
+
+# 每个数据快照一张行为者分类表：{"patterns": ..., "actors": {login: flags}}
+ACTORS_FILE = f"{DATA_DIR}/paddle_actors.json"
+# 可选的匹配规则配置，格式同 DEFAULT_ACTOR_PATTERNS，修改后需重新构建分类表（python -m utils.actors）
+ACTOR_PATTERNS_FILE = f"{DATA_DIR}/actor_patterns.json"
+
+# 分类为整数位标记，可组合；0 为普通（社区）开发者
+ACTOR_BOT = 1  # 机器人、CI、网页端操作等非人工账号
+ACTOR_ORG_MEMBER = 2  # 组织成员：身份集合中有内部邮箱（见 utils.identity），或匹配 org_member 规则
+
+# login 的匹配规则（正则，不区分大小写）
+DEFAULT_ACTOR_PATTERNS = {
+    "bot": [
+        r"\[bot\]$",
+        r"paddle-bot",
+        r"claassistant",
+        r"^web-flow$",
+        r"^github$",
+        r"^(dependabot|renovate|codecov|pre-commit-ci)",
+    ],
+    "org_member": [],
+}
+# 数据集中出现用户名的列：记录作者、commit作者/提交者、评论者和reviewer
+LOGIN_COLUMNS = {
+    "prs": ("user",),
+    "issues": ("user",),
+    "commits": ("author", "committer"),
+}
+EVENT_LOGIN_COLUMNS = {
+    "prs": ("comment_by", "review_by"),
+    "issues": ("comment_by",),
+}
+
+def load_actor_patterns() -> dict:
+    """
+    读取匹配规则，ACTOR_PATTERNS_FILE 中给出的类别覆盖默认规则
+    """
+    patterns = dict(DEFAULT_ACTOR_PATTERNS)
+    if os.path.exists(ACTOR_PATTERNS_FILE):
+        with open(ACTOR_PATTERNS_FILE, "r", encoding="utf-8") as f:
+            patterns.update(json.load(f))
+    return patterns
+
+def compile_patterns(patterns: list[str]) -> Optional[re.Pattern]:
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE) if patterns else None
+
+class ActorTable:
+    """
+    login -> 分类标记，每个数据快照构建一次；分析时只做dict查找和位运算
+    不在表中的 login（如快照之后出现的）按规则分类并记住，这些 login 没有commit，不会是身份映射中的组织成员
+    """
+    def __init__(self, actors: dict[str, int], patterns: dict, version: float = 0):
+        self.actors = actors
+        self.patterns = patterns
+        self.bot_re = compile_patterns(patterns.get("bot", []))
+        self.org_re = compile_patterns(patterns.get("org_member", []))
+        self.version = version  # 分类表文件的修改时间，用于区分由分类表派生的缓存
+
+    def classify(self, login: str, org_member: bool = False) -> int:
+        flags = 0
+        if self.bot_re is not None and self.bot_re.search(login):
+            flags |= ACTOR_BOT
+        if org_member or (self.org_re is not None and self.org_re.search(login)):
+            flags |= ACTOR_ORG_MEMBER
+        return flags
+
+    def flags(self, login: Optional[str]) -> int:
+        if not login:
+            return 0
+        flags = self.actors.get(login)
+        if flags is None:
+            flags = self.actors[login] = self.classify(login)
+        return flags
+
+    def is_bot(self, login: Optional[str]) -> bool:
+        return self.flags(login) & ACTOR_BOT != 0
+
+    def is_org_member(self, login: Optional[str]) -> bool:
+        return self.flags(login) & ACTOR_ORG_MEMBER != 0
+
+    def humans(self, logins: Iterable[Optional[str]]) -> set:
+        """
+        去掉机器人后的 login 集合
+        """
+        return {login for login in logins if not self.flags(login) & ACTOR_BOT}
+
+def snapshot_logins() -> set[str]:
+    """
+    快照中所有仓库出现过的 login
+    """
+    logins = set()
+    for repo in load_repo_catalog():
+        for kind, columns in LOGIN_COLUMNS.items():
+            try:
+                records = load_repo_dataset(kind, repo)
+            except FileNotFoundError:
+                continue
+            for record in records:
+                logins.update(record.get(column) for column in columns)
+                for column in EVENT_LOGIN_COLUMNS.get(kind, ()):
+                    logins.update(event[0] for event in record.get(column) or [] if event)
+    logins.discard(None)
+    logins.discard("")
+    return logins
+
+def build_actor_table() -> ActorTable:
+    """
+    对快照中所有 login 分类：规则匹配机器人，身份映射判断组织成员
+    """
+    from utils.identity import load_identity_resolver
+
+    resolver = load_identity_resolver()
+    table = ActorTable({}, load_actor_patterns())
+    for login in sorted(snapshot_logins()):
+        identity = resolver.identity(login)
+        org_member = identity is not None and resolver.company[identity]
+        table.actors[login] = table.classify(login, org_member)
+    return table
+
+def save_actor_table(table: ActorTable) -> None:
+    os.makedirs(os.path.dirname(ACTORS_FILE), exist_ok=True)
+    tmp_path = f"{ACTORS_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"patterns": table.patterns, "actors": table.actors}, f, ensure_ascii=False)
+    os.replace(tmp_path, ACTORS_FILE)
+
+def load_actor_table() -> ActorTable:
+    """
+    读取行为者分类表（按文件修改时间缓存，调用方不应修改）
+    分类表由 update_all 或 python -m utils.actors 生成，还没有生成时抛出 SnapshotNotBuilt
+    """
+    if not os.path.exists(ACTORS_FILE):
+        raise SnapshotNotBuilt("行为者分类表还没有生成，请稍后再试")
+
+    def build():
+        with open(ACTORS_FILE, "r", encoding="utf-8") as f:
+            table = json.load(f)
+        return ActorTable(table["actors"], table["patterns"], os.path.getmtime(ACTORS_FILE))
+
+    return cached_by_mtime(ACTORS_FILE, "actors", build)
+
+def load_human_event_table(kind: str, repo_full_name: str, column: str) -> EventTable:
+    """
+    去掉机器人后的评论/review事件表，与 load_event_table 一样按数据文件修改时间缓存，分类表更新后重新构建
+    """
+    actors = load_actor_table()
+    path = dataset_path(kind, repo_full_name)
+    return cached_by_mtime(
+        path,
+        f"{column}:humans:{actors.version}",
+        lambda: EventTable(load_repo_dataset(kind, repo_full_name), column, exclude=actors.is_bot),
+    )
+
+if __name__ == "__main__":
+    # 全量重建行为者分类表：python -m utils.actors
+    import time
+
+    start = time.time()
+    table = build_actor_table()
+    save_actor_table(table)
+    bots = sum(1 for flags in table.actors.values() if flags & ACTOR_BOT)
+    members = sum(1 for flags in table.actors.values() if flags & ACTOR_ORG_MEMBER)
+    print(f"{len(table.actors)} 个 login：{bots} 个机器人，{members} 个组织成员，耗时 {time.time() - start:.1f} s")
@@ -1,5 +1,7 @@
 import re
 import warnings
+from collections import deque
+from functools import lru_cache
 import numpy as np
 import torch
 import transformers as ppb
@@ -25,14 +27,23 @@ def split(path):  # splitting by seperators, i.e. non-alnum
     return tokens
 
 
+# 预编译的正则表达式，避免每条message重复编译
+URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+SVN_URL_PATTERN = re.compile(
+    r'git-svn-id:\s+(?:http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+\s+(?:[a-z]|[0-9])+(?:-(?:[a-z]|[0-9])+){4})')
+VERSION_WITH_SUFFIX_PATTERN = re.compile(r'[vVr]?\d+(?:\.\w+)+(?:-(?:\w)*){1,2}')
+VERSION_PATTERN = re.compile(r'[vVr]?\d+(?:\.\w+)+')
+ISSUE_PATTERN = re.compile(r'#\d*')
+FILE_VERSION_PATTERN = re.compile(r'(?:\d+(?:\.\w+)+)')
+
+
 def find_url(message):
     if 'git-svn-id: ' in message:
         # 对于git-svn-id链接，单独处理
-        pattern = re.compile(
-            r'git-svn-id:\s+(?:http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+\s+(?:[a-z]|[0-9])+(?:-(?:[a-z]|[0-9])+){4})')
+        pattern = SVN_URL_PATTERN
     else:
-        pattern = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
-    urls = re.findall(pattern, message)
+        pattern = URL_PATTERN
+    urls = pattern.findall(message)
     urls = sorted(list(set(urls)), reverse=True)
     for url in urls:
         message = message.replace(url, '<url>')
@@ -40,14 +51,12 @@ def find_url(message):
 
 
 def find_version(message):
-    pattern = re.compile(r'[vVr]?\d+(?:\.\w+)+(?:-(?:\w)*){1,2}')
-    versions = pattern.findall(message)
+    versions = VERSION_WITH_SUFFIX_PATTERN.findall(message)
     versions = sorted(list(set(versions)),reverse=True)
     for version in versions:
         message = message.replace(version, '<version>')
 
-    pattern2 = re.compile(r'[vVr]?\d+(?:\.\w+)+')
-    versions = pattern2.findall(message)
+    versions = VERSION_PATTERN.findall(message)
     # 去除重复pattern
     versions = sorted(list(set(versions)),reverse=True)
     for version in versions:
@@ -55,8 +64,7 @@ def find_version(message):
     return message
 
 def find_issue(message):
-    pattern = re.compile(r'#\d*')
-    versions = pattern.findall(message)
+    versions = ISSUE_PATTERN.findall(message)
     versions = sorted(list(set(versions)),reverse=True)
     for version in versions:
         message = message.replace(version, '<issue_link>')
@@ -111,6 +119,127 @@ def tokenize(identifier):  # camel case splitting
     return new_identifier.split(" ")
 
 
+class FileNameAutomaton:
+    """
+    文件名token的Aho-Corasick自动机，对同一个commit只需扫描一遍message即可得到所有token的出现位置
+    """
+    def __init__(self, patterns):
+        self.patterns = set(patterns)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for pattern in self.patterns:
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.output[state].append(pattern)
+        # 按BFS顺序构造失配指针，并合并后缀状态的输出
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail_state = self.fail[state]
+                while fail_state and ch not in self.goto[fail_state]:
+                    fail_state = self.fail[fail_state]
+                self.fail[next_state] = self.goto[fail_state].get(ch, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def search(self, text):
+        """
+        返回每个模式在text中的所有起始位置（升序，允许重叠），与逐次调用str.find的结果一致
+        """
+        positions = {pattern: [] for pattern in self.patterns}
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern in output[state]:
+                positions[pattern].append(i - len(pattern) + 1)
+        if '' in positions:
+            # 空串在每个位置都能匹配，与 str.find('') 的行为保持一致
+            positions[''] = list(range(len(text) + 1))
+        return positions
+
+
+def strip_file_name(fileName):
+    """
+    获取无后缀的文件名，对于以'.'开头或者包含'.'的文件名，仅去除拓展名 e.g. ".Trivas.yml"->".Trivas"
+    """
+    newFileName = fileName
+    versions = FILE_VERSION_PATTERN.findall(newFileName)
+    for version in versions:
+        if version!=newFileName:
+            newFileName = newFileName.replace(version, '')
+    lastIndex = newFileName[1:].rfind('.')
+    if lastIndex == -1:
+        lastIndex = len(newFileName)-1
+    return newFileName[:lastIndex+1]
+
+
+def find_camel_tokens(message, occurrences, fileNameTokens):
+    """
+    驼峰文件名，对应于msg中分开的连续单词，返回匹配区间 (camelSta, camelEnd)，未找到时返回None
+    只切分出需要比较的前几个单词，避免对每个出现位置都切分整条message
+    """
+    punctuations = [',', '.', '?', '!', ';', ':', '、']
+    lowerTokens = [token.lower() for token in fileNameTokens]
+    tokenCount = len(fileNameTokens)
+    for camelSta in occurrences:
+        remain = len(message) - camelSta
+        if remain <= 0:
+            break
+        # 定位前 tokenCount 个以空格分隔的单词的区间
+        spans = []
+        pos = camelSta
+        more = False
+        while True:
+            space = message.find(' ', pos)
+            if space == -1:
+                spans.append((pos, len(message)))
+                break
+            spans.append((pos, space))
+            pos = space + 1
+            if len(spans) == tokenCount:
+                more = True
+                break
+        # 与 tempMessag.split(' ') 的单词数比较结果一致
+        splitCount = tokenCount + 1 if more else len(spans)
+        if spans[0][1] - spans[0][0] != len(lowerTokens[0]):
+            continue
+        find = True
+        for i in range(0, tokenCount):
+            if i < splitCount:
+                start, end = spans[i]
+                # 删除句号和逗号等标点符号，其他符号不可能对应于驼峰文件名
+                if end - start >= 2 and message[end-1] in punctuations:
+                    end -= 1
+                if end - start != len(lowerTokens[i]) or not message.startswith(lowerTokens[i], start):
+                    find = False
+                    break
+            elif i > splitCount:
+                find = False
+                break
+        if find:
+            lastTokenIndex = message.find(lowerTokens[-1], camelSta)
+            lastTokenIndex = lastTokenIndex - camelSta if lastTokenIndex != -1 else -1
+            prefixLen = min(lastTokenIndex, remain) if lastTokenIndex != -1 else remain - 1
+            camelEnd = prefixLen + len(fileNameTokens[-1]) + camelSta
+            if camelEnd < remain and message[camelSta + camelEnd] in punctuations:
+                camelEnd += 1
+            return camelSta, camelEnd
+    return None
+
+
 def find_file_name2(sample):
     # 以下不处理非驼峰形式的changes file
     filePath = sample[2]
@@ -119,92 +248,57 @@ def find_file_name2(sample):
     replaceTokens = []
     otherMeanWords = ['version','test','assert','junit']
     specialWords = ['changelog','contributing','release','releasenote','readme','releasenotes']
-    punctuations = [',', '.', '?', '!', ';', ':', '、']
 
+    # 先收集所有需要查找的token，再用自动机一次扫描得到出现位置
+    candidates = []
+    patterns = set()
     for file in filePath:
         #   以'/'分割
-        filePathTokens = file.split('/')
-        fileName = filePathTokens[-1]
+        fileName = file.split('/')[-1]
         # 如果文件名以".md"结尾则不进行替换
         if fileName.endswith(".md"):
             continue
-        # 直接包含文件名
-        if fileName.lower() in message:
-            index = message.find(fileName.lower())
-            replaceTokens.append(messageOld[index:index+len(fileName)])
+        newFileName = fileNameGreen = fileNameTokens = None
+        patterns.add(fileName.lower())
         if '.' in fileName:
-            # 获取无后缀的文件名
-            newFileName = fileName
-            pattern = re.compile(r'(?:\d+(?:\.\w+)+)')
-            versions = pattern.findall(newFileName)
-            for version in versions:
-                if version!=newFileName:
-                    newFileName = newFileName.replace(version, '')
-            # 去除后拓展名并全部小写，对于以'.'开头或者包含'.'的文件名，
-            # 仅去除拓展名 e.g. ".Trivas.yml"->".Trivas"
-            lastIndex = newFileName[1:].rfind('.')
-            if lastIndex == -1:
-                lastIndex = len(newFileName)-1
-            newFileName = newFileName[:lastIndex+1]
+            newFileName = strip_file_name(fileName)
             fileNameGreen = newFileName.lower()
-            # 直接包含去掉后缀的文件名
-            if fileNameGreen in specialWords:
+            if fileNameGreen not in specialWords:
+                patterns.add(fileNameGreen)
+            if fileNameGreen not in specialWords and fileNameGreen not in otherMeanWords:
+                fileNameTokens = tokenize(newFileName) if newFileName else []
+                if len(fileNameTokens) >= 2:
+                    patterns.add(fileNameTokens[0].lower())
+        candidates.append((fileName, fileNameGreen, fileNameTokens))
+    positions = FileNameAutomaton(patterns).search(message)
+
+    for fileName, fileNameGreen, fileNameTokens in candidates:
+        # 直接包含文件名
+        occurrences = positions[fileName.lower()]
+        if occurrences:
+            index = occurrences[0]
+            replaceTokens.append(messageOld[index:index+len(fileName)])
+        if fileNameGreen is None:
+            continue
+        # 直接包含去掉后缀的文件名
+        if fileNameGreen in specialWords:
+            continue
+        elif fileNameGreen in otherMeanWords:
+            for index in positions[fileNameGreen]:
+                if index >= 1 and messageOld[index].isupper():
+                    replaceTokens.append(messageOld[index:index+len(fileNameGreen)])
+                    break
+        # msg包含不带拓展名的文件名，e.g. AClass.java in 'xxx AClss/method() xxx'
+        elif positions[fileNameGreen]:
+            index = positions[fileNameGreen][0]
+            replaceTokens.append(messageOld[index:index + len(fileNameGreen)])
+        else:
+            # 驼峰文件名，对应于msg中分开的连续单词
+            if len(fileNameTokens) < 2:
                 continue
-            elif fileNameGreen in otherMeanWords:
-                index = 0
-                while index!=-1:
-                    tempIndex = message[index+1:len(message)].find(fileNameGreen)
-                    if tempIndex ==-1:
-                        break
-                    else:
-                        index =index + 1 + tempIndex
-                        if index!=-1 and messageOld[index].isupper():
-                            replaceTokens.append(messageOld[index:index+len(fileNameGreen)])
-                            break
-            # msg包含不带拓展名的文件名，e.g. AClass.java in 'xxx AClss/method() xxx'
-            elif fileNameGreen in message:
-                index = message.find(fileNameGreen)
-                replaceTokens.append(messageOld[index:index + len(fileNameGreen)])
-            else:
-                # 驼峰文件名，对应于msg中分开的连续单词
-                fileNameTokens = tokenize(newFileName)
-                if len(fileNameTokens) < 2:
-                    continue
-                if fileNameTokens[0].lower() in message:
-                    camelSta = message.find(fileNameTokens[0].lower())
-                    camelEnd = -1
-                    tempMessag = message[camelSta:]
-                    while camelSta >= 0 and len(tempMessag) > 0:
-                        tempMessagTokens = tempMessag.split(' ')
-                        find = True
-                        if tempMessagTokens[0] == fileNameTokens[0].lower():
-                            # 删除句号和逗号等标点符号，其他符号不可能对应于驼峰文件名
-                            for i in range(0, min(len(tempMessagTokens),len(fileNameTokens))):
-                                if len(tempMessagTokens[i])<2:
-                                    continue
-                                if str(tempMessagTokens[i][-1]) in punctuations:
-                                    tempMessagTokens[i] = tempMessagTokens[i][:-1]
-
-                            for i in range(0, len(fileNameTokens)):
-                                if i < len(tempMessagTokens) and tempMessagTokens[i] != fileNameTokens[i].lower():
-                                    find = False
-                                    break
-                                elif i > len(tempMessagTokens):
-                                    find = False
-                                    break
-                            if find:
-                                lastTokenIndex = tempMessag.find(fileNameTokens[-1].lower())
-                                camelEnd = len(tempMessag[:lastTokenIndex]) + len(fileNameTokens[-1])+ camelSta
-                                if camelEnd < len(tempMessag) and tempMessag[camelEnd] in punctuations:
-                                    camelEnd += 1
-                                break
-                        index = message[camelSta + 1:].find(fileNameTokens[0].lower())
-                        if index == -1:
-                            break
-                        camelSta = camelSta + 1 + index
-                        tempMessag = message[camelSta:]
-                    if camelSta!=-1 and camelEnd !=-1:
-                        replaceTokens.append(messageOld[camelSta:camelEnd])
+            span = find_camel_tokens(message, positions[fileNameTokens[0].lower()], fileNameTokens)
+            if span is not None:
+                replaceTokens.append(messageOld[span[0]:span[1]])
     replaceTokens = list(set(replaceTokens))
     return replaceTokens
 
@@ -223,6 +317,8 @@ def replace_file_name(sample):
     # 以'@' 开头的token 一般是annotation，并且通常会出现在patchs里，所以即使和文件名相同也要忽略
     diffMeanPunctuations = ['@']
     for t in replaced_tokens:
+        if not t:
+            continue
         end = 0
         while end<len(message):
             start = str(message).find(t, end, len(message))
@@ -234,27 +330,22 @@ def replace_file_name(sample):
             if not before and not after:
                locations.append([start, end])
 
-    # 合并互相包含的被替换token的区间
-    locations.sort(key=cmp)
-    i=0
-    while i < len(locations)-1:
-        if locations[i][1]>locations[i+1][0]:
-            if locations[i][0]==locations[i+1][0]:
-                if locations[i][1]<locations[i+1][1]:
-                    locations.pop(i)
-                elif locations[i][1]>locations[i+1][1]:
-                    locations.pop(i+1)
-            elif locations[i][0]<locations[i+1][0] and locations[i][1]>=locations[i+1][1]:
-                locations.pop(i+1)
-        else:
-            i+=1
+    # 合并互相包含的被替换token的区间：按起点升序、终点降序排序后一次扫描，
+    # 被前一个保留区间覆盖的区间直接丢弃
+    locations.sort(key=lambda location: (location[0], -location[1]))
+    mergedLocations = []
+    for location in locations:
+        if mergedLocations and location[0] < mergedLocations[-1][1]:
+            continue
+        mergedLocations.append(location)
+    locations = mergedLocations
 
     # '.'和'#' 用于表示class中包含某个方法/字段，或者用于包路径,
     # eg. AClass.getInt()、FrameworkMethod#producesType()、org.junit.runner.Description#getTestClass
     backSymbols = ['.', '/']        #文件名之前的特殊符号
     forwardSymbols = ['.', '#']     #文件名之后的特殊符号
     newLocations = []
-    newMethodeName = []
+    newMethodeName = set()
 
     for location in locations:
         sta = location[0]
@@ -275,7 +366,7 @@ def replace_file_name(sample):
             end = newEnd
             ifMethod = True
         if ifMethod:
-            newMethodeName.append([sta, end])
+            newMethodeName.add((sta, end))
         newLocations.append([sta, end])
 
         if packagePath != '':
@@ -293,14 +384,13 @@ def replace_file_name(sample):
 
 
     newLocations.sort(key=cmp)
-    newMethodeName.sort(key=cmp)
     # replace tokens in message with <file_name>
     end = 0
     new_message = ""
     for location in newLocations:
         start = location[0]
         new_message += message[end:start]
-        if location in newMethodeName:
+        if tuple(location) in newMethodeName:
             new_message += " <method_name> "
         else:
             new_message += " <file_name> "
@@ -327,29 +417,68 @@ def process_commit_messages(commit_messages,commit_files):
             continue
     return commit_messages
 
-def BertEmbedding(labeledDF):
-    # 加载bert模型
-    model_class, tokenizer_class, pretrained_weights = (ppb.BertModel, ppb.BertTokenizer, 'bert-base-uncased')
+@lru_cache(maxsize=1)
+def load_bert(pretrained_weights='bert-base-uncased'):
+    """
+    加载bert模型和分词器，同一进程内只加载一次
+    """
+    model_class, tokenizer_class = (ppb.BertModel, ppb.BertTokenizer)
     # Load pretrained model/tokenizer
     tokenizer = tokenizer_class.from_pretrained(pretrained_weights)
     model = model_class.from_pretrained(pretrained_weights)
+    model.eval()
+    return tokenizer, model
+
+
+def bert_encode(tokenizer, messages):
+    """
+    分词、padding并构造attention mask，返回 (input_ids, attention_mask)
+    """
     # Tokenization
-    tokenized = labeledDF['new_message1'].apply(
-        (lambda x: tokenizer.encode(x, add_special_tokens=True, truncation=True, max_length=150)))
+    tokenized = [tokenizer.encode(x, add_special_tokens=True, truncation=True, max_length=150) for x in messages]
     # padding
     max_len = 0
-    for i in tokenized.values:
+    for i in tokenized:
         if len(i) > max_len:
             max_len = len(i)
-    padded = np.array([i + [0] * (max_len - len(i)) for i in tokenized.values])
+    padded = np.array([i + [0] * (max_len - len(i)) for i in tokenized])
     # masking
     attention_mask = np.where(padded != 0, 1, 0)
+    return padded, attention_mask
 
-    # print("===== getting features ======")
-    # embedding
+
+def bert_features(model, padded, attention_mask):
+    """
+    bert前向计算，将输出的第一层作为句子的特征向量
+    """
     input_ids = torch.tensor(padded)
     attention_mask = torch.tensor(attention_mask)
     with torch.no_grad():
         last_hidden_states = model(input_ids, attention_mask=attention_mask)
-    # 将bert输出的第一层作为句子的特征向量
-    return last_hidden_states[0][:, 0, :].numpy()
\ No newline at end of file
+    return last_hidden_states[0][:, 0, :].numpy()
+
+
+def BertEmbedding(labeledDF):
+    # 加载bert模型
+    tokenizer, model = load_bert()
+    padded, attention_mask = bert_encode(tokenizer, labeledDF['new_message1'].values)
+
+    # print("===== getting features ======")
+    # embedding
+    return bert_features(model, padded, attention_mask)
+
+if __name__ == "__main__":
+    import json
+    import time
+
+    # 在Paddle主仓库修改文件数最多的commit上测试预处理耗时
+    with open("data/paddle_commits/PaddlePaddle_Paddle_commits.json", 'r', encoding='utf-8') as f:
+        commits = json.load(f)
+    commits = sorted(commits, key=lambda c: len(c.get('files', [])), reverse=True)[:200]
+    messages = [commit.get('message', '') for commit in commits]
+    files = [[file['filename'] for file in commit.get('files', [])] for commit in commits]
+
+    start_time = time.perf_counter()
+    process_commit_messages(messages, files)
+    end_time = time.perf_counter()
+    print(f"Processed {len(commits)} largest commits in {end_time - start_time:.3f}s")
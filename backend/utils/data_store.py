@@ -0,0 +1,258 @@
+import json
+import os
+import threading
+from bisect import bisect_left
+from datetime import date, datetime, timezone
+from operator import itemgetter
+from typing import Callable, Optional
+
+DATA_DIR = "data"
+# 稀疏时间索引的步长：每隔多少条记录保存一个时间戳
+INDEX_STRIDE = 64
+
+# 时间字段 -> epoch秒列
+TIME_COLUMNS = {
+    "created_at": "created_ts",
+    "closed_at": "closed_ts",
+}
+# [login, 时间] 列表字段 -> 按下标一一对应的epoch秒列表
+EVENT_COLUMNS = {
+    "comment_by": "comment_ts",
+    "review_by": "review_ts",
+}
+
+_cache = {}  # (path, 名称) -> (mtime, 值)
+_cache_lock = threading.Lock()
+
+class SnapshotNotBuilt(Exception):
+    """
+    当前数据快照的全量派生表（如全组织健康度表）还没有生成。
+    这些表只在数据更新流程（update_all）或各模块的命令行中构建，不在请求中构建，接口返回 503
+    """
+
+def to_epoch(value: Optional[str]) -> Optional[int]:
+    """
+    ISO 8601时间字符串（支持'Z'后缀，无时区时按UTC）转为epoch秒，空值或无法解析时返回None
+    """
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+def date_to_epoch(d: date) -> int:
+    """
+    日期（UTC零点）转为epoch秒，用于按天比较的时间窗口
+    """
+    return int(datetime(d.year, d.month, d.day, tzinfo=timezone.utc).timestamp())
+
+def add_time_columns(record: dict) -> dict:
+    """
+    为一条pr/issue/commit记录添加epoch秒列：created_ts、closed_ts、comment_ts、review_ts
+    """
+    for src, dst in TIME_COLUMNS.items():
+        if src in record:
+            record[dst] = to_epoch(record[src])
+    for src, dst in EVENT_COLUMNS.items():
+        if record.get(src) is not None:
+            record[dst] = [to_epoch(event[1]) if len(event) > 1 else None for event in record[src]]
+    return record
+
+def dataset_path(kind: str, repo_full_name: str) -> str:
+    """
+    kind: "prs" | "issues" | "commits"
+    """
+    return f"{DATA_DIR}/paddle_{kind}/{repo_full_name.replace('/', '_')}_{kind}.json"
+
+def sort_by_created(records: list[dict]) -> list[dict]:
+    """
+    按 created_ts 升序原地排序（稳定排序），没有时间的记录（如已删除的issue）排在最后
+    """
+    records.sort(key=lambda r: (r.get("created_ts") is None, r.get("created_ts") or 0))
+    return records
+
+def cached_by_mtime(path: str, name: str, build: Callable):
+    """
+    按文件修改时间缓存由该文件构建的对象，文件更新后重新构建
+    """
+    mtime = os.path.getmtime(path)
+    with _cache_lock:
+        cached = _cache.get((path, name))
+    if cached and cached[0] == mtime:
+        return cached[1]
+    value = build()
+    with _cache_lock:
+        _cache[(path, name)] = (mtime, value)
+    return value
+
+def load_repo_dataset(kind: str, repo_full_name: str) -> list[dict]:
+    """
+    读取指定仓库的数据集（按 created_ts 升序），旧数据缺少的时间列和排序在读取时补齐
+    按文件修改时间缓存，返回的记录在多个请求间共享，调用方不应修改
+    """
+    path = dataset_path(kind, repo_full_name)
+
+    def build():
+        with open(path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        for record in records:
+            if "created_ts" not in record:
+                add_time_columns(record)
+        # 已排好序时 timsort 只需一次线性检查
+        return sort_by_created(records)
+
+    return cached_by_mtime(path, "records", build)
+
+class TimeIndex:
+    """
+    按 created_ts 升序的记录及其稀疏时间索引：每 INDEX_STRIDE 条记录保存一个时间戳，
+    查询时先在稀疏索引上二分定位块，再在块内二分，时间窗口查询返回连续切片
+    """
+    def __init__(self, records: list[dict], stride: int = INDEX_STRIDE):
+        self.records = records
+        self.stride = stride
+        # 有时间的记录排在前面，size 之后是没有时间的记录
+        self.size = sum(1 for r in records if r.get("created_ts") is not None)
+        self.sparse = [records[i]["created_ts"] for i in range(0, self.size, stride)]
+
+    def position(self, ts: Optional[int]) -> int:
+        """
+        第一条 created_ts >= ts 的记录下标；ts 为 None 表示不设下界
+        """
+        if ts is None:
+            return 0
+        block = bisect_left(self.sparse, ts)
+        lo = max(block - 1, 0) * self.stride
+        hi = min(block * self.stride, self.size)
+        return bisect_left(self.records, ts, lo, hi, key=itemgetter("created_ts"))
+
+    def bounds(self, start: Optional[int] = None, end: Optional[int] = None) -> tuple[int, int]:
+        """
+        左闭右开时间区间 [start, end) 对应的下标范围
+        """
+        lo = self.position(start)
+        hi = self.size if end is None else self.position(end)
+        return lo, max(lo, hi)
+
+    def slice(self, start: Optional[int] = None, end: Optional[int] = None) -> list[dict]:
+        lo, hi = self.bounds(start, end)
+        return self.records[lo:hi]
+
+    def count(self, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        lo, hi = self.bounds(start, end)
+        return hi - lo
+
+    @property
+    def untimed(self) -> list[dict]:
+        return self.records[self.size:]
+
+class EventTable:
+    """
+    评论或review事件表：从记录的 comment_by/review_by 展开，按时间升序的平行列表
+    ts[i]、logins[i]、numbers[i] 为第i个事件的时间、用户和所属pr/issue编号
+    exclude 不为空时跳过其判断为真的用户的事件（如机器人，见 utils.actors）
+    """
+    def __init__(self, records: list[dict], column: str, exclude: Optional[Callable[[str], bool]] = None):
+        ts_column = EVENT_COLUMNS[column]
+        events = []
+        self.total = 0  # 包含没有时间的事件
+        for record in records:
+            column_events = record.get(column) or []
+            column_ts = record.get(ts_column) or []
+            for i, event in enumerate(column_events):
+                login = event[0] if event else None
+                if exclude is not None and exclude(login):
+                    continue
+                self.total += 1
+                ts = column_ts[i] if i < len(column_ts) else None
+                if ts is not None:
+                    events.append((ts, login, record.get("number")))
+        events.sort(key=itemgetter(0))
+        self.ts = [e[0] for e in events]
+        self.logins = [e[1] for e in events]
+        self.numbers = [e[2] for e in events]
+
+    def bounds(self, start: Optional[int] = None, end: Optional[int] = None) -> tuple[int, int]:
+        lo = 0 if start is None else bisect_left(self.ts, start)
+        hi = len(self.ts) if end is None else bisect_left(self.ts, end)
+        return lo, max(lo, hi)
+
+    def count(self, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        lo, hi = self.bounds(start, end)
+        return hi - lo
+
+    def slice(self, start: Optional[int] = None, end: Optional[int] = None) -> list[tuple]:
+        """
+        返回 [start, end) 内的 (时间, 用户, 编号) 列表
+        """
+        lo, hi = self.bounds(start, end)
+        return list(zip(self.ts[lo:hi], self.logins[lo:hi], self.numbers[lo:hi]))
+
+def load_time_index(kind: str, repo_full_name: str) -> TimeIndex:
+    """
+    读取数据集的时间索引，与数据集一样按文件修改时间缓存
+    """
+    path = dataset_path(kind, repo_full_name)
+    return cached_by_mtime(path, "index", lambda: TimeIndex(load_repo_dataset(kind, repo_full_name)))
+
+def load_event_table(kind: str, repo_full_name: str, column: str) -> EventTable:
+    """
+    读取pr/issue数据集的评论（column="comment_by"）或review（column="review_by"）事件表
+    """
+    path = dataset_path(kind, repo_full_name)
+    return cached_by_mtime(path, column, lambda: EventTable(load_repo_dataset(kind, repo_full_name), column))
+
+def save_repo_dataset(kind: str, repo_full_name: str, records: list[dict]) -> None:
+    """
+    保存指定仓库的数据集，写入前重新计算时间列并按 created_ts 升序排列
+    """
+    for record in records:
+        add_time_columns(record)
+    sort_by_created(records)
+    path = dataset_path(kind, repo_full_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        json.dump(records, f, indent=4, ensure_ascii=False)
+
+if __name__ == "__main__":
+    import time
+    from datetime import timedelta
+
+    prs = load_repo_dataset("prs", "PaddlePaddle/Paddle")
+    recent = datetime.now(timezone.utc).date() - timedelta(days=90)
+    recent_ts = date_to_epoch(recent)
+
+    # 原方式：每次比较都解析字符串
+    start = time.time()
+    for _ in range(10):
+        count_str = sum(1 for pr in prs if datetime.fromisoformat(pr["created_at"][:10]).date() >= recent)
+        comments_str = sum(
+            1 for pr in prs for comment in pr.get("comment_by", [])
+            if datetime.fromisoformat(comment[1][:10]).date() >= recent
+        )
+    str_time = (time.time() - start) / 10
+
+    # 新方式：直接比较epoch秒列
+    start = time.time()
+    for _ in range(10):
+        count_ts = sum(1 for pr in prs if (pr["created_ts"] or 0) >= recent_ts)
+        comments_ts = sum(1 for pr in prs for ts in pr.get("comment_ts", []) if ts and ts >= recent_ts)
+    ts_time = (time.time() - start) / 10
+
+    # 索引方式：时间索引和事件表上二分
+    index = load_time_index("prs", "PaddlePaddle/Paddle")
+    comment_table = load_event_table("prs", "PaddlePaddle/Paddle", "comment_by")
+    start = time.time()
+    for _ in range(10):
+        count_idx = index.count(recent_ts)
+        comments_idx = comment_table.count(recent_ts)
+    idx_time = (time.time() - start) / 10
+
+    assert (count_str, comments_str) == (count_ts, comments_ts) == (count_idx, comments_idx)
+    print(f"{len(prs)} PRs, 近90天 {count_ts} 个PR、{comments_ts} 条评论")
+    print(f"解析字符串: {str_time * 1000:.1f} ms，比较epoch列: {ts_time * 1000:.1f} ms，加速 {str_time / ts_time:.1f}x")
+    print(f"索引二分: {idx_time * 1000:.3f} ms")
@@ -3,6 +3,8 @@ import json
 import os
 import logging
 
+from utils.repo_catalog import load_repo_catalog
+
 def extension_to_language() -> dict:
     '''
     获取扩展名到编程语言的映射
@@ -32,9 +34,7 @@ def extension_to_language() -> dict:
     # 筛选所需要的语言
     langs = ["Python", "C++", "Java", "C", "C#", "JavaScript", "Go", "SQL", "Visual Basic .NET", "Fortran"]  # TIOBE Index，2024年12月版本
     # 添加paddle项目中用到的语言
-    with open('data/paddle_repos.json', 'r', encoding='utf-8') as f:
-        repos = json.load(f)
-    for repo in repos:
+    for repo in load_repo_catalog().repos:
         if repo['language'] != None and repo['language'] != 'Jupyter Notebook' and repo['language'] not in langs:
             langs.append(repo['language'])
     # # 添加文档相关语言
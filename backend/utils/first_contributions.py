@@ -0,0 +1,153 @@
+import json
+import os
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+from utils.data_store import DATA_DIR, add_time_columns, cached_by_mtime, load_repo_dataset
+from utils.identity import load_identity_resolver
+
+# 各类首次贡献：类型 -> (数据集, 用户字段)；review 取自 pr 的 review_by
+CONTRIBUTION_KINDS = {
+    "pr": ("prs", "user"),
+    "issue": ("issues", "user"),
+    "commit": ("commits", "author"),
+    "review": ("prs", None),
+}
+
+def first_contributions_path(repo_full_name: str) -> str:
+    return f"{DATA_DIR}/paddle_first_contributions/{repo_full_name.replace('/', '_')}_first_contributions.json"
+
+def merge_first_times(first: dict, kind: str, records: Iterable[dict]) -> None:
+    """
+    用新增或更新的记录更新 first[kind]（login -> 首次贡献epoch秒），只保留更早的时间
+    """
+    times = first.setdefault(kind, {})
+
+    def update(login, ts):
+        if login and ts is not None and (login not in times or ts < times[login]):
+            times[login] = ts
+
+    user_field = CONTRIBUTION_KINDS[kind][1]
+    for record in records:
+        if "error" in record:  # 已删除的issue
+            continue
+        if "created_ts" not in record:
+            add_time_columns(record)
+        if kind == "review":
+            for review, ts in zip(record.get("review_by") or [], record.get("review_ts") or []):
+                update(review[0] if review else None, ts)
+        else:
+            update(record.get(user_field), record.get("created_ts"))
+
+def classify_community_developers(table: dict) -> None:
+    """
+    用全组织的身份映射判断本仓库的commit作者是否为社区开发者
+    """
+    resolver = load_identity_resolver()
+    table["community_developers"] = sorted(resolver.community_developers(table["first"].get("commit", {})))
+
+def build_first_contributions(repo_full_name: str) -> dict:
+    """
+    从本地数据集全量构建首次贡献表
+    """
+    table = {"first": {}, "community_developers": []}
+    datasets = {}
+    for kind, (dataset, _) in CONTRIBUTION_KINDS.items():
+        if dataset not in datasets:
+            try:
+                datasets[dataset] = load_repo_dataset(dataset, repo_full_name)
+            except FileNotFoundError:
+                datasets[dataset] = []
+        merge_first_times(table["first"], kind, datasets[dataset])
+    classify_community_developers(table)
+    return table
+
+def save_first_contributions(repo_full_name: str, table: dict) -> None:
+    path = first_contributions_path(repo_full_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 先写临时文件再替换，读取方不会读到半个文件
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def update_first_contributions(
+    repo_full_name: str,
+    prs: Iterable[dict] = (),
+    issues: Iterable[dict] = (),
+    commits: Optional[Iterable[dict]] = None,
+) -> None:
+    """
+    数据更新后增量维护首次贡献表，应在对应数据集（和身份映射）保存之后调用
+    prs/issues/commits 为本次新增或更新的记录；commit阶段调用时（commits 不为 None）重新判断社区开发者
+    表不存在时从已保存的数据集全量构建
+    """
+    path = first_contributions_path(repo_full_name)
+    if not os.path.exists(path):
+        save_first_contributions(repo_full_name, build_first_contributions(repo_full_name))
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        table = json.load(f)
+    prs = list(prs)
+    merge_first_times(table["first"], "pr", prs)
+    merge_first_times(table["first"], "review", prs)
+    merge_first_times(table["first"], "issue", issues)
+    if commits is not None:
+        merge_first_times(table["first"], "commit", commits)
+        # 其他仓库的新commit也可能合并身份，因此每次commit更新都重新判断
+        classify_community_developers(table)
+    save_first_contributions(repo_full_name, table)
+
+class FirstContributions:
+    """
+    首次贡献表的查询视图：每类贡献按首次时间排序，窗口内的新贡献者由二分查找得到
+    """
+    def __init__(self, table: dict):
+        self.first = table["first"]
+        self.community_developers = set(table["community_developers"])
+        self.sorted = {}
+        for kind, times in self.first.items():
+            items = sorted(times.items(), key=lambda item: item[1])
+            self.sorted[kind] = ([ts for _, ts in items], [login for login, _ in items])
+
+    def first_time(self, kind: str, login: str) -> Optional[int]:
+        return self.first.get(kind, {}).get(login)
+
+    def newcomers(self, kind: str, start: Optional[int] = None, end: Optional[int] = None) -> list[str]:
+        """
+        首次贡献时间在 [start, end) 内的用户
+        """
+        times, logins = self.sorted.get(kind, ([], []))
+        lo = 0 if start is None else bisect_left(times, start)
+        hi = len(times) if end is None else bisect_left(times, end)
+        return logins[lo:hi]
+
+    def is_community_developer(self, login: str) -> bool:
+        return login.strip().lower() in self.community_developers
+
+def load_first_contributions(repo_full_name: str) -> FirstContributions:
+    """
+    读取首次贡献表（按文件修改时间缓存）；还没有生成时先全量构建并保存
+    """
+    path = first_contributions_path(repo_full_name)
+    if not os.path.exists(path):
+        save_first_contributions(repo_full_name, build_first_contributions(repo_full_name))
+
+    def build():
+        with open(path, "r", encoding="utf-8") as f:
+            return FirstContributions(json.load(f))
+
+    return cached_by_mtime(path, "first_contributions", build)
+
+if __name__ == "__main__":
+    # 全量重建所有仓库的首次贡献表：python -m utils.first_contributions
+    import time
+
+    from utils.repo_catalog import load_repo_catalog
+
+    repos = load_repo_catalog().names
+    start = time.time()
+    for repo in repos:
+        save_first_contributions(repo, build_first_contributions(repo))
+    print(f"{len(repos)} 个仓库的首次贡献表已重建，耗时 {time.time() - start:.1f} s")
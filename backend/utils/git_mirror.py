@@ -0,0 +1,114 @@
+import fcntl
+import logging
+import os
+import shutil
+import subprocess
+from contextlib import contextmanager
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# 本地镜像目录，所有commit提取任务共享
+MIRROR_DIR = Path(os.getenv("GIT_MIRROR_DIR", "cache/git_mirrors"))
+
+# 只同步分支和tag，不同步GitHub的 refs/pull/*（Paddle有数万个PR ref）
+FETCH_REFSPECS = [
+    "+refs/heads/*:refs/heads/*",
+    "+refs/tags/*:refs/tags/*",
+]
+
+def run_git(args: list[str], git_dir: Path) -> str:
+    """
+    在镜像仓库中执行git命令，返回stdout
+    """
+    result = subprocess.run(
+        ["git", *args],
+        cwd=git_dir,
+        check=True,
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="ignore",
+    )
+    return result.stdout
+
+def mirror_path(repo_full_name: str, partial: bool = False) -> Path:
+    """
+    仓库镜像的本地路径，blobless镜像与完整镜像分开存放
+    """
+    name = repo_full_name.replace('/', '_')
+    return MIRROR_DIR / (f"{name}.blobless.git" if partial else f"{name}.git")
+
+@contextmanager
+def mirror_lock(repo_full_name: str):
+    """
+    同一仓库的镜像操作加文件锁，防止并发任务同时clone/fetch同一个仓库
+    """
+    MIRROR_DIR.mkdir(parents=True, exist_ok=True)
+    lock_file = MIRROR_DIR / f"{repo_full_name.replace('/', '_')}.lock"
+    with open(lock_file, 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def update_head(git_dir: Path) -> None:
+    """
+    将镜像的HEAD指向远端默认分支
+    """
+    output = run_git(["ls-remote", "--symref", "origin", "HEAD"], git_dir)
+    for line in output.splitlines():
+        if line.startswith("ref: ") and line.endswith("\tHEAD"):
+            head_ref = line[len("ref: "):-len("\tHEAD")]
+            run_git(["symbolic-ref", "HEAD", head_ref], git_dir)
+            return
+
+def init_mirror(repo_full_name: str, git_dir: Path, url: str, partial: bool) -> None:
+    """
+    初始化bare镜像并完成第一次fetch；先写入临时目录，成功后再改名，避免留下不完整的镜像
+    """
+    tmp_dir = git_dir.with_name(git_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    subprocess.run(["git", "init", "--bare", "--quiet", str(tmp_dir)], check=True, capture_output=True)
+    run_git(["remote", "add", "origin", url], tmp_dir)
+    run_git(["config", "--unset-all", "remote.origin.fetch"], tmp_dir)
+    for refspec in FETCH_REFSPECS:
+        run_git(["config", "--add", "remote.origin.fetch", refspec], tmp_dir)
+    if partial:
+        # blobless：只下载commit和tree，文件内容在需要时按需获取
+        run_git(["config", "remote.origin.promisor", "true"], tmp_dir)
+        run_git(["config", "remote.origin.partialclonefilter", "blob:none"], tmp_dir)
+    logger.info(f"Cloning mirror of {repo_full_name} into {git_dir}")
+    run_git(["fetch", "--quiet", "--tags", "origin"] + (["--filter=blob:none"] if partial else []), tmp_dir)
+    update_head(tmp_dir)
+    tmp_dir.rename(git_dir)
+
+def ensure_mirror(repo_full_name: str, partial: bool = False, fetch: bool = True, url: str = None) -> Path:
+    """
+    获取指定仓库的本地镜像：第一次调用时克隆，之后只做增量 git fetch
+    partial=True 时使用blobless镜像（只需要提交元数据的场景）；若已有完整镜像则直接复用完整镜像
+    """
+    url = url or f"https://github.com/{repo_full_name}.git"
+    with mirror_lock(repo_full_name):
+        git_dir = mirror_path(repo_full_name)
+        if partial and not git_dir.exists():
+            git_dir = mirror_path(repo_full_name, partial=True)
+
+        if not git_dir.exists():
+            init_mirror(repo_full_name, git_dir, url, partial)
+        elif fetch:
+            logger.info(f"Fetching updates of {repo_full_name} into {git_dir}")
+            run_git(["fetch", "--quiet", "--prune", "--tags", "origin"], git_dir)
+            update_head(git_dir)
+    return git_dir
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        format="%(asctime)s (PID %(process)d) [%(levelname)s] %(filename)s:%(lineno)d %(message)s",
+        level=logging.INFO,
+    )
+
+    git_dir = ensure_mirror("PFCCLab/PaddleLens", partial=True)
+    print(run_git(["log", "--oneline", "-5"], git_dir))
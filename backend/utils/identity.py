@@ -0,0 +1,193 @@
+import json
+import os
+from typing import Iterable, Optional
+
+from utils.data_store import DATA_DIR, cached_by_mtime, load_repo_dataset
+from utils.repo_catalog import load_repo_catalog
+
+# 所有仓库commit汇总的身份映射，每个元素为一个开发者的 logins/names/emails
+IDENTITY_FILE = f"{DATA_DIR}/paddle_identities.json"
+
+def normalize_email(email):
+    return email.strip().lower()
+
+def normalize_name(name):
+    return name.strip().lower()
+
+def has_two_segments(name):
+    return len(name.strip().split()) >= 2
+
+def is_company_email(email):
+    """
+    百度/飞桨内部邮箱
+    """
+    return "baidu.com" in email or "paddle" in email
+
+class IdentityResolver:
+    """
+    基于并查集的开发者身份合并：同一条commit的login和邮箱属于同一人，
+    两段式姓名（如 "Zhang San"）相同的也视为同一人；每个集合记录是否含有内部邮箱
+    节点为 "login:xxx"、"email:xxx"、"name:xxx" 形式的字符串，支持按commit增量加入
+    """
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+        self.company = {}  # 根节点 -> 集合中是否有内部邮箱
+
+    def _add_node(self, node):
+        if node not in self.parent:
+            self.parent[node] = node
+            self.size[node] = 1
+            self.company[node] = node.startswith("email:") and is_company_email(node[len("email:"):])
+
+    def _find(self, node):
+        # 路径减半
+        while self.parent[node] != node:
+            self.parent[node] = self.parent[self.parent[node]]
+            node = self.parent[node]
+        return node
+
+    def _union(self, a, b):
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size.pop(b)
+        self.company[a] = self.company[a] or self.company.pop(b)
+
+    def add(self, login: Optional[str] = None, name: Optional[str] = None, email: Optional[str] = None):
+        """
+        加入一组属于同一人的 login/姓名/邮箱，姓名只在两段式时参与合并
+        """
+        nodes = []
+        if login:
+            nodes.append(f"login:{normalize_name(login)}")
+        if email:
+            nodes.append(f"email:{normalize_email(email)}")
+        if name and has_two_segments(name):
+            nodes.append(f"name:{normalize_name(name)}")
+        for node in nodes:
+            self._add_node(node)
+        for node in nodes[1:]:
+            self._union(nodes[0], node)
+
+    def add_commits(self, commits: Iterable[dict]) -> "IdentityResolver":
+        for commit in commits:
+            # 与原规则一致：只使用同时有作者和邮箱的commit
+            if not commit.get("author") or not commit.get("author_email"):
+                continue
+            self.add(commit["author"], commit.get("author_name"), commit["author_email"])
+        return self
+
+    def identity(self, login: str) -> Optional[str]:
+        """
+        login 所属身份的代表节点，未出现过时返回 None
+        """
+        node = f"login:{normalize_name(login)}"
+        return self._find(node) if node in self.parent else None
+
+    def same_identity(self, login_a: str, login_b: str) -> bool:
+        identity = self.identity(login_a)
+        return identity is not None and identity == self.identity(login_b)
+
+    def is_community_developer(self, login: str) -> bool:
+        """
+        是否为社区开发者：身份集合中没有内部邮箱
+        """
+        identity = self.identity(login)
+        return identity is not None and not self.company[identity]
+
+    def community_developers(self, logins: Optional[Iterable[str]] = None) -> set[str]:
+        """
+        社区开发者的login（小写），logins 不为空时只在其中判断
+        """
+        if logins is None:
+            nodes = [node for node in self.parent if node.startswith("login:")]
+        else:
+            nodes = [f"login:{normalize_name(login)}" for login in logins if login]
+        return {
+            node[len("login:"):] for node in nodes
+            if node in self.parent and not self.company[self._find(node)]
+        }
+
+    def groups(self) -> list[dict]:
+        """
+        按身份分组的 logins/names/emails，用于保存
+        """
+        groups = {}
+        for node in self.parent:
+            kind, value = node.split(":", 1)
+            group = groups.setdefault(self._find(node), {"logins": [], "names": [], "emails": []})
+            group[f"{kind}s"].append(value)
+        return [{key: sorted(values) for key, values in group.items()} for group in groups.values()]
+
+    @classmethod
+    def from_groups(cls, groups: list[dict]) -> "IdentityResolver":
+        resolver = cls()
+        for group in groups:
+            nodes = (
+                [f"login:{v}" for v in group["logins"]]
+                + [f"email:{v}" for v in group["emails"]]
+                + [f"name:{v}" for v in group["names"]]
+            )
+            for node in nodes:
+                resolver._add_node(node)
+            for node in nodes[1:]:
+                resolver._union(nodes[0], node)
+        return resolver
+
+def save_identity_resolver(resolver: IdentityResolver) -> None:
+    os.makedirs(os.path.dirname(IDENTITY_FILE), exist_ok=True)
+    tmp_path = f"{IDENTITY_FILE}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(resolver.groups(), f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, IDENTITY_FILE)
+
+def build_identity_resolver() -> IdentityResolver:
+    """
+    从所有仓库的commit数据全量构建身份映射
+    """
+    resolver = IdentityResolver()
+    for repo in load_repo_catalog():
+        try:
+            resolver.add_commits(load_repo_dataset("commits", repo))
+        except FileNotFoundError:
+            continue
+    return resolver
+
+def load_identity_resolver() -> IdentityResolver:
+    """
+    读取身份映射（按文件修改时间缓存，调用方不应修改）；还没有生成时先全量构建并保存
+    """
+    if not os.path.exists(IDENTITY_FILE):
+        save_identity_resolver(build_identity_resolver())
+
+    def build():
+        with open(IDENTITY_FILE, "r", encoding="utf-8") as f:
+            return IdentityResolver.from_groups(json.load(f))
+
+    return cached_by_mtime(IDENTITY_FILE, "identities", build)
+
+def update_identities(commits: Iterable[dict]) -> None:
+    """
+    新commit入库后增量更新身份映射
+    """
+    if not os.path.exists(IDENTITY_FILE):
+        # 全量构建时已包含刚保存的commit
+        save_identity_resolver(build_identity_resolver())
+        return
+    with open(IDENTITY_FILE, "r", encoding="utf-8") as f:
+        resolver = IdentityResolver.from_groups(json.load(f))
+    save_identity_resolver(resolver.add_commits(commits))
+
+if __name__ == "__main__":
+    # 全量重建身份映射：python -m utils.identity
+    import time
+
+    start = time.time()
+    resolver = build_identity_resolver()
+    save_identity_resolver(resolver)
+    groups = resolver.groups()
+    print(f"{len(groups)} 个开发者身份，{len(resolver.community_developers())} 个社区开发者login，耗时 {time.time() - start:.1f} s")
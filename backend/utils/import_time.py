@@ -0,0 +1,55 @@
+import re
+import subprocess
+import sys
+
+# 接口进程启动时不应导入的重量级依赖，只在对应接口首次请求、预热或工作进程中导入
+HEAVY_MODULES = (
+    "github",
+    "joblib",
+    "matplotlib",
+    "numpy",
+    "pandas",
+    "plotly",
+    "torch",
+    "transformers",
+    "wordcloud",
+)
+
+# python -X importtime 的输出行：import time: self [us] | cumulative | imported package
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def measure_imports(module: str = "main") -> dict[str, int]:
+    """
+    在子进程中用 python -X importtime 导入 module，返回每个模块的累计导入耗时（微秒）
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败：\n{proc.stderr[-2000:]}")
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+def heavy_imports(cumulative: dict[str, int]) -> list[str]:
+    """
+    导入了的重量级依赖（顶层包名）
+    """
+    return sorted({name.split(".")[0] for name in cumulative} & set(HEAVY_MODULES))
+
+if __name__ == "__main__":
+    # 启动导入耗时检查，导入了重量级依赖时返回非0：python -m utils.import_time [module]
+    module = sys.argv[1] if len(sys.argv) > 1 else "main"
+    cumulative = measure_imports(module)
+    print(f"import {module}: {cumulative.get(module, 0) / 1000:.1f} ms")
+    for name, us in sorted(cumulative.items(), key=lambda item: -item[1])[:15]:
+        print(f"{us / 1000:10.1f} ms  {name}")
+    heavy = heavy_imports(cumulative)
+    if heavy:
+        print(f"启动时导入了重量级依赖：{', '.join(heavy)}")
+        sys.exit(1)
@@ -1,8 +1,12 @@
-import json
-from datetime import datetime, timezone
 import logging
 
 from utils.manage_data_update_time import get_now_date
+from utils.data_store import load_repo_dataset, load_time_index, to_epoch
+
+logger = logging.getLogger(__name__)
+
+# 开发者分析用到的各类记录，与 cache/{task_name}/ 下的文件名一致
+USER_DATA_KINDS = ("commits", "prs", "issues", "review_prs", "comment_prs_issues", "repos_can_merge")
 
 def user_commits_in_repo(username, repo_full_name):
     """
@@ -12,21 +16,15 @@ def user_commits_in_repo(username, repo_full_name):
     repo_owner, repo_name = repo_full_name.split('/')
     commit_list = []
     # 获取paddle相关仓库的commit信息，本地读取
+    now_ts = to_epoch(get_now_date())
     try:
-        with open(f"data/paddle_commits/{repo_owner}_{repo_name}_commits.json", 'r', encoding='utf-8') as f:
-            commits = json.load(f)
+        # 只取快照日期之前的记录，没有时间的记录不在切片内
+        commits = load_time_index("commits", repo_full_name).slice(end=now_ts + 1)
     except Exception as e:
         logger.error(f"Error fetching commits for {repo_full_name}: {e}")
         return commit_list
     
-    nowdate = datetime.fromisoformat(get_now_date()).replace(tzinfo=timezone.utc)
     for commit in commits:
-        try:
-            commit_time = datetime.fromisoformat(commit['created_at'])
-        except ValueError:
-            continue
-        if commit_time > nowdate:
-            continue
         if commit['author'] == username:
             commit_list.append(commit)
     return commit_list
@@ -38,21 +36,15 @@ def user_prs_in_repo(username, repo_full_name):
     # logger.info(f"Fetching prs for {username} in repository {repo_full_name}")
     repo_owner, repo_name = repo_full_name.split('/')
     pr_list = []
+    now_ts = to_epoch(get_now_date())
     try:
-        with open(f"data/paddle_prs/{repo_owner}_{repo_name}_prs.json", 'r', encoding='utf-8') as f:
-            prs = json.load(f)
+        # 只取快照日期之前的记录，没有时间的记录不在切片内
+        prs = load_time_index("prs", repo_full_name).slice(end=now_ts + 1)
     except Exception as e:
         logger.error(f"Error fetching prs for {repo_full_name}: {e}")
         return pr_list
     
-    nowdate = datetime.fromisoformat(get_now_date()).replace(tzinfo=timezone.utc)
     for pr in prs:
-        try:
-            pr_time = datetime.fromisoformat(pr['created_at'])
-        except ValueError:
-            continue
-        if pr_time > nowdate:
-            continue
         if pr['user'] == username:
             pr_list.append(pr)
     return pr_list
@@ -64,23 +56,17 @@ def user_issues_in_repo(username, repo_full_name):
     # logger.info(f"Fetching issues for {username} in repository {repo_full_name}")
     repo_owner, repo_name = repo_full_name.split('/')
     issue_list = []
+    now_ts = to_epoch(get_now_date())
     try:
-        with open(f"data/paddle_issues/{repo_owner}_{repo_name}_issues.json", 'r', encoding='utf-8') as f:
-            issues = json.load(f)
+        # 只取快照日期之前的记录，没有时间的记录不在切片内
+        issues = load_time_index("issues", repo_full_name).slice(end=now_ts + 1)
     except Exception as e:
         logger.error(f"Error fetching issues for {repo_full_name}: {e}")
         return issue_list
     
-    nowdate = datetime.fromisoformat(get_now_date()).replace(tzinfo=timezone.utc)
     for issue in issues:
         if 'error' in issue: # 可能会有deleted issue
             continue
-        try:
-            issue_time = datetime.fromisoformat(issue['created_at'])
-        except ValueError:
-            continue
-        if issue_time > nowdate:
-            continue
         if issue['user'] == username:
             issue_list.append(issue)
     return issue_list
@@ -92,8 +78,7 @@ def user_merge_permission_in_repo(username, repo_full_name):
     flag = False
     try:
         repo_owner, repo_name = repo_full_name.split('/')
-        with open(f"data/paddle_prs/{repo_owner}_{repo_name}_prs.json", 'r', encoding='utf-8') as f:
-            prs = json.load(f)
+        prs = load_repo_dataset("prs", repo_full_name)
     except Exception as e:
         logger.error(f"Error fetching prs for {repo_full_name}: {e}")
         return flag
@@ -113,21 +98,15 @@ def user_review_prs_in_repo(username, repo_full_name):
     # logger.info(f"Fetching reviews for {username} in repository {repo_full_name}")
     repo_owner, repo_name = repo_full_name.split('/')
     review_pr_list = []
+    now_ts = to_epoch(get_now_date())
     try:
-        with open(f"data/paddle_prs/{repo_owner}_{repo_name}_prs.json", 'r', encoding='utf-8') as f:
-            prs = json.load(f)
+        # 只取快照日期之前的记录，没有时间的记录不在切片内
+        prs = load_time_index("prs", repo_full_name).slice(end=now_ts + 1)
     except Exception as e:
         logger.error(f"Error fetching prs for {repo_full_name}: {e}")
         return review_pr_list
 
-    nowdate = datetime.fromisoformat(get_now_date()).replace(tzinfo=timezone.utc)
     for pr in prs:
-        try:
-            pr_time = datetime.fromisoformat(pr['created_at'])
-        except ValueError:
-            continue
-        if pr_time > nowdate:
-            continue
         if 'review_by' not in pr or pr['review_by'] == None:
             continue
         for review in pr['review_by']:
@@ -143,19 +122,12 @@ def user_comment_prs_issues_in_repo(username, repo_full_name):
     # logger.info(f"Fetching comments for {username} in repository {repo_full_name}")
     repo_owner, repo_name = repo_full_name.split('/')
 
-    nowdate = datetime.fromisoformat(get_now_date()).replace(tzinfo=timezone.utc)
+    now_ts = to_epoch(get_now_date())
     comment_prs_issues_list = []
     # pr评论
     try:
-        with open(f"data/paddle_prs/{repo_owner}_{repo_name}_prs.json", 'r', encoding='utf-8') as f:
-            prs = json.load(f)
+        prs = load_time_index("prs", repo_full_name).slice(end=now_ts + 1)
         for pr in prs:
-            try:
-                pr_time = datetime.fromisoformat(pr['created_at'])
-            except ValueError:
-                continue
-            if pr_time > nowdate:
-                continue
             if 'comment_by' in pr and pr['comment_by']:
                 for comment in pr['comment_by']:
                     if comment[0] == username:
@@ -165,17 +137,10 @@ def user_comment_prs_issues_in_repo(username, repo_full_name):
         logger.error(f"Error fetching PR comments for {repo_full_name}: {e}")
     # issue评论
     try:
-        with open(f"data/paddle_issues/{repo_owner}_{repo_name}_issues.json", 'r', encoding='utf-8') as f:
-            issues = json.load(f)
+        issues = load_time_index("issues", repo_full_name).slice(end=now_ts + 1)
         for issue in issues:
             if 'error' in issue: # 可能会有deleted issue
                 continue
-            try:
-                issue_time = datetime.fromisoformat(issue['created_at'])
-            except ValueError:
-                continue
-            if issue_time > nowdate:
-                continue
             if issue['comment_by']:
                 for comment in issue['comment_by']:
                     if comment[0] == username:
@@ -186,6 +151,64 @@ def user_comment_prs_issues_in_repo(username, repo_full_name):
 
     return comment_prs_issues_list
 
+def users_data_in_repos(repo_full_names):
+    """
+    一次遍历所有仓库，按用户汇总 USER_DATA_KINDS 中的各类记录，{username: {kind: [...]}}
+    每类记录的内容和顺序与逐个用户调用上面的 user_*_in_repo 一致，用于批量计算所有开发者
+    """
+    users = {}
+
+    def user_data(username):
+        if username not in users:
+            users[username] = {kind: [] for kind in USER_DATA_KINDS}
+        return users[username]
+
+    def add_once(logins, kind, record):
+        # 同一条记录对同一用户只加入一次
+        for login in dict.fromkeys(login for login in logins if login):
+            user_data(login)[kind].append(record)
+
+    now_ts = to_epoch(get_now_date())
+    for repo_full_name in repo_full_names:
+        try:
+            for commit in load_time_index("commits", repo_full_name).slice(end=now_ts + 1):
+                if commit['author']:
+                    user_data(commit['author'])["commits"].append(commit)
+        except Exception as e:
+            logger.error(f"Error fetching commits for {repo_full_name}: {e}")
+        try:
+            prs = load_time_index("prs", repo_full_name).slice(end=now_ts + 1)
+        except Exception as e:
+            logger.error(f"Error fetching prs for {repo_full_name}: {e}")
+            prs = []
+        for pr in prs:
+            if pr['user']:
+                user_data(pr['user'])["prs"].append(pr)
+            add_once((review[0] for review in pr.get('review_by') or []), "review_prs", pr)
+        # 与 user_comment_prs_issues_in_repo 一致：每个仓库先pr评论、后issue评论
+        for pr in prs:
+            add_once((comment[0] for comment in pr.get('comment_by') or []), "comment_prs_issues", pr)
+        try:
+            issues = load_time_index("issues", repo_full_name).slice(end=now_ts + 1)
+        except Exception as e:
+            logger.error(f"Error fetching issues for {repo_full_name}: {e}")
+            issues = []
+        for issue in issues:
+            if 'error' in issue: # 可能会有deleted issue
+                continue
+            if issue['user']:
+                user_data(issue['user'])["issues"].append(issue)
+            add_once((comment[0] for comment in issue.get('comment_by') or []), "comment_prs_issues", issue)
+        # merge权限使用全部pr，不限快照日期
+        try:
+            merged_by = {pr['merged_by'] for pr in load_repo_dataset("prs", repo_full_name) if pr.get('merged_by')}
+        except Exception as e:
+            logger.error(f"Error fetching prs for {repo_full_name}: {e}")
+            merged_by = set()
+        for username in merged_by:
+            user_data(username)["repos_can_merge"].append(repo_full_name)
+    return users
+
 if __name__ == "__main__":
 
     logging.basicConfig(
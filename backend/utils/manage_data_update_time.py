@@ -1,4 +1,5 @@
 import json
+import os
 
 
 def get_now_date() -> str:
@@ -8,4 +9,26 @@ def get_now_date() -> str:
 
 def update_now_date(new_date: str) -> None:
     with open("data/data_update_time.json", "w", encoding="utf-8") as f:
-        json.dump({"data_update_time": new_date}, f, ensure_ascii=False, indent=4)
\ No newline at end of file
+        json.dump({"data_update_time": new_date}, f, ensure_ascii=False, indent=4)
+
+def get_commit_heads(repo_full_name: str) -> dict:
+    """
+    获取指定仓库各分支最后一次入库的commit sha，{branch: sha}
+    """
+    if not os.path.exists("data/commit_heads.json"):
+        return {}
+    with open("data/commit_heads.json", "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get(repo_full_name, {})
+
+def update_commit_heads(repo_full_name: str, heads: dict) -> None:
+    """
+    记录指定仓库各分支最后一次入库的commit sha，应在commit数据保存之后调用
+    """
+    data = {}
+    if os.path.exists("data/commit_heads.json"):
+        with open("data/commit_heads.json", "r", encoding="utf-8") as f:
+            data = json.load(f)
+    data[repo_full_name] = heads
+    with open("data/commit_heads.json", "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
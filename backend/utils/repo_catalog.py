@@ -0,0 +1,68 @@
+import json
+from typing import Iterator, Optional
+
+from utils.data_store import DATA_DIR, cached_by_mtime, dataset_path
+
+REPOS_FILE = f"{DATA_DIR}/paddle_repos.json"
+DATASET_KINDS = ("prs", "issues", "commits")
+
+def releases_path(repo_full_name: str) -> str:
+    return f"{DATA_DIR}/paddle_releases/{repo_full_name.replace('/', '_')}_releases.json"
+
+class RepoCatalog:
+    """
+    飞桨仓库目录，每个数据快照构建一次，供各分析模块共享（调用方不应修改）：
+    按 full_name 的dict/set查找、小写别名、预先计算的领域列表和各数据文件路径
+    """
+    def __init__(self, repos: list[dict]):
+        self.repos = repos  # paddle_repos.json 原顺序
+        self.by_name = {repo["full_name"]: repo for repo in repos}
+        self.names = list(self.by_name)
+        self.aliases = {name.lower(): name for name in self.names}
+        # 领域标签：topics + domain 字段，与 hardskill.domain_skill 的统计口径一致（可能重复或为空）
+        self.domain_tags = {
+            name: repo.get('topics', []) + repo.get('domain', '').split(', ')
+            for name, repo in self.by_name.items()
+        }
+        # 去重、去空后的领域
+        self.domains = {name: [d for d in dict.fromkeys(tags) if d] for name, tags in self.domain_tags.items()}
+        self.paths = {
+            name: {**{kind: dataset_path(kind, name) for kind in DATASET_KINDS}, "releases": releases_path(name)}
+            for name in self.names
+        }
+
+    def __contains__(self, full_name: str) -> bool:
+        return full_name in self.by_name
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get(self, full_name: str) -> Optional[dict]:
+        return self.by_name.get(full_name)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """
+        仓库名（不区分大小写）对应的 full_name，不在飞桨中时返回 None
+        """
+        if name in self.by_name:
+            return name
+        return self.aliases.get(name.strip().lower())
+
+    def path(self, full_name: str, kind: str) -> str:
+        """
+        kind: "prs" | "issues" | "commits" | "releases"
+        """
+        return self.paths[full_name][kind]
+
+def load_repo_catalog() -> RepoCatalog:
+    """
+    读取飞桨仓库目录（按文件修改时间缓存，数据更新后重新构建）
+    """
+    def build():
+        with open(REPOS_FILE, "r", encoding="utf-8") as f:
+            return RepoCatalog(json.load(f))
+
+    return cached_by_mtime(REPOS_FILE, "repo_catalog", build)
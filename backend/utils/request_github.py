@@ -8,25 +8,33 @@ T = TypeVar("T")
 logger = logging.getLogger(__name__)
 
 def request_github(
-        gh: Github, gh_func: Callable[..., T], params: Tuple = (), default: Any = None
+        gh: Github, gh_func: Callable[..., T], params: Tuple = (), default: Any = None, raise_errors: bool = False
 ) -> Optional[T]:
     """
     This is a wrapper to ensure that any rate-consuming interactions with GitHub
       have proper exception handling.
+    raise_errors: re-raise the last exception once retries are exhausted, so that callers
+      can tell a missing object (default is returned) from a failed request.
     """
+    error = None
     for _ in range(0, 3):  # Max retry 3 times
         try:
             data = gh_func(*params)
             return data
         except RateLimitExceededException as ex:
+            error = ex
             logger.info("{}: {}".format(type(ex), ex))
             sleep_time = gh.rate_limiting_resettime - time.time() + 10
             logger.info("Rate limit reached, wait for {} seconds...".format(sleep_time))
             time.sleep(max(1.0, sleep_time))
         except UnknownObjectException as ex:
+            error = None
             logger.error("{}: {}".format(type(ex), ex))
             break
         except Exception as ex:
+            error = ex
             logger.error("{}: {}".format(type(ex), ex))
             time.sleep(5)
+    if raise_errors and error is not None:
+        raise error
     return default
\ No newline at end of file
@@ -0,0 +1,140 @@
+import base64
+import datetime
+
+import orjson
+from fastapi.responses import Response
+
+# int/float/bool/date等内置类型的dict键转为字符串；numpy数组和标量由orjson直接序列化
+# orjson 不支持 numpy 标量、pd.Timestamp 等类型的键，遇到时由 normalize_keys 转换后重新序列化
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+def default(obj):
+    """
+    orjson 无法直接序列化的类型，orjson 只在遇到这些对象时回调
+    """
+    # plotly 图表及其组件
+    if hasattr(obj, "to_plotly_json"):
+        return obj.to_plotly_json()
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode()
+    # pd.Timedelta 是 timedelta 的子类
+    if isinstance(obj, datetime.timedelta):
+        return str(obj)
+    # pd.Timestamp 是 datetime 的子类
+    if isinstance(obj, datetime.datetime):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    # 非连续或object类型的numpy数组、numpy标量、pandas Series
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def normalize_key(key):
+    """
+    与原 main.clean_data 一致：numpy 标量转为 Python 数值，时间转为ISO字符串
+    """
+    # pd.Timestamp 是 datetime 的子类
+    if isinstance(key, (datetime.datetime, datetime.date)):
+        return key.isoformat()
+    if isinstance(key, datetime.timedelta):
+        return str(key)
+    # numpy 标量
+    if hasattr(key, "item"):
+        return key.item()
+    return key
+
+def normalize_keys(obj):
+    """
+    递归转换dict键，只遍历dict/list/tuple，其他对象仍交给 default
+    """
+    if isinstance(obj, dict):
+        return {normalize_key(k): normalize_keys(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [normalize_keys(v) for v in obj]
+    return obj
+
+def dumps(obj) -> bytes:
+    """
+    一次遍历直接序列化为JSON字节串；含有 orjson 不支持的dict键时转换键后再序列化一次
+    """
+    try:
+        return orjson.dumps(obj, default=default, option=ORJSON_OPTIONS)
+    except TypeError:
+        return orjson.dumps(normalize_keys(obj), default=default, option=ORJSON_OPTIONS)
+
+class ORJSONResponse(Response):
+    """
+    使用 dumps 序列化的JSON响应，可以直接返回包含plotly图表、numpy/pandas对象的结果
+    """
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+if __name__ == "__main__":
+    # 与原 clean_data + JSONResponse 的基准对比：python -m utils.serialization
+    import json
+    import time
+
+    import numpy as np
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    def clean_data(obj):
+        """
+        原 main.clean_data
+        """
+        if isinstance(obj, go.Figure):
+            return clean_data(obj.to_dict())
+        elif isinstance(obj, bytes):
+            return base64.b64encode(obj).decode()
+        elif isinstance(obj, (np.integer, np.int32, np.int64, np.uint32, np.uint64)):
+            return int(obj)
+        elif isinstance(obj, (np.floating, np.float32, np.float64)):
+            return float(obj)
+        elif isinstance(obj, (np.ndarray,)):
+            return [clean_data(o) for o in obj.tolist()]
+        elif isinstance(obj, (pd.Timestamp, datetime.datetime)):
+            return obj.isoformat()
+        elif isinstance(obj, (pd.Timedelta, datetime.timedelta)):
+            return str(obj)
+        elif isinstance(obj, (dict,)):
+            return {clean_data(k): clean_data(v) for k, v in obj.items()}
+        elif isinstance(obj, (list, tuple, set)):
+            return [clean_data(v) for v in obj]
+        else:
+            return obj
+
+    def legacy_dumps(obj):
+        # 与 starlette JSONResponse.render 相同的参数
+        return json.dumps(
+            clean_data(obj), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+
+    # 模拟图表较多的 /dvpr_skills/ 结果
+    rng = np.random.default_rng(0)
+    result = {
+        "user": "someone",
+        "scores": {f"skill_{i}": np.float64(rng.random()) for i in range(50)},
+        "counts": np.arange(1000, dtype=np.int64),
+        "updated_at": pd.Timestamp("2025-10-24T00:00:00Z"),
+        "figures": [
+            go.Figure(go.Scatter(x=np.arange(5000), y=rng.random(5000), name=f"trace {i}"))
+            for i in range(8)
+        ],
+        "wordcloud": bytes(rng.integers(0, 255, 200_000, dtype=np.uint8)),
+    }
+    # numpy 整数、pd.Timestamp 作为dict键
+    keyed = {
+        "by_year": {np.int64(2024): 3, 2025: np.int64(4)},
+        "by_day": [{pd.Timestamp("2025-10-24"): 1.5, "total": 2}],
+    }
+    assert json.loads(legacy_dumps(keyed)) == json.loads(dumps(keyed)), dumps(keyed)
+
+    assert json.loads(legacy_dumps(result)) == json.loads(dumps(result))
+    for name, func in (("clean_data + json", legacy_dumps), ("orjson", dumps)):
+        start = time.time()
+        for _ in range(10):
+            body = func(result)
+        print(f"{name}: {(time.time() - start) * 100:.1f} ms/次，{len(body) / 1024:.0f} KB")
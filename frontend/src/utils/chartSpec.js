@@ -0,0 +1,36 @@
+// 后端默认返回图表规格 {data, layout}，layout.template 只有模板名，这里补全为 Plotly 模板对象
+// 旧格式（chart_format: 'figure'）的 layout.template 已是对象，原样使用
+
+const axisStyle = {
+  gridcolor: '#EBF0F8',
+  linecolor: '#EBF0F8',
+  zerolinecolor: '#EBF0F8',
+  zerolinewidth: 2,
+  ticks: '',
+  automargin: true,
+  title: { standoff: 15 }
+}
+
+// plotly.py 内置 plotly_white 模板中实际影响这些图的部分
+const TEMPLATES = {
+  plotly_white: {
+    layout: {
+      colorway: ['#636efa', '#EF553B', '#00cc96', '#ab63fa', '#FFA15A', '#19d3f3', '#FF6692', '#B6E880', '#FF97FF', '#FECB52'],
+      font: { color: '#2a3f5f' },
+      hovermode: 'closest',
+      paper_bgcolor: 'white',
+      plot_bgcolor: 'white',
+      title: { x: 0.05 },
+      xaxis: axisStyle,
+      yaxis: axisStyle
+    }
+  }
+}
+
+export function chartLayout(layout) {
+  if (!layout) return {}
+  if (typeof layout.template === 'string') {
+    return { ...layout, template: TEMPLATES[layout.template] || {} }
+  }
+  return layout
+}